@@ -0,0 +1,404 @@
+########## IMPORTS ##########
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from contextlib import closing
+import numpy as np
+
+# the game modules import each other by name (as when run from src/main)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_DIR = os.path.join(BENCH_DIR, '..', 'main')
+sys.path.insert(0, MAIN_DIR)
+
+import headless
+from board import Board, countNeighbours
+from metrics import boardMetrics
+from scores import SCORE_STORES, SqliteScoreStore
+
+########## SETTINGS ##########
+# tracked results the checks compare against
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+# slowdown of the best time over the baseline's that counts as a regression (the best of the
+# repetitions is the measure least disturbed by other processes)
+TOLERANCE = 1.5
+# differences below this many milliseconds are timer noise, never regressions
+NOISE_MS = 0.05
+# file system bound benchmarks (fsync, rename, SQLite commits) do not follow the CPU calibration:
+# their median is compared with the baseline's, with a wider tolerance and margin of their own, and
+# a slower CPU only widens their limit (a faster one never tightens it)
+IO_TOLERANCE = 2.0
+IO_NOISE_MS = 1.0
+
+# board sizes and bomb densities of the board benchmarks
+SIZES = [(9, 9), (16, 30), (100, 100), (1000, 1000)]
+DENSITIES = [0.12, 0.21]
+# densities of the open boards the flood fill benchmarks reveal
+OPEN_DENSITIES = [0.02, 0.1]
+# boards measured in one batch by the batch metrics benchmarks (rows, cols, bombs)
+METRICS_BATCHES = [(9, 9, 10), (16, 30, 99)]
+METRICS_BATCH_SIZE = 1000
+# boards of the widget benchmarks by renderer (rows, cols, bombs)
+WIDGET_BOARDS = {
+    "labels" : [(9, 9, 10), (16, 30, 99), (50, 50, 400)],
+    "canvas" : [(16, 30, 99), (200, 200, 8000)]
+}
+# number of stored scores of the high score benchmarks
+SCORE_COUNTS = [100, 10000]
+
+# program of the startup benchmarks: a fresh interpreter imports the game and builds its first
+# frame, then (when ready is set) the board
+STARTUP_CODE = """
+import sys
+sys.path[:0] = [{bench_dir!r}, {main_dir!r}]
+import headless
+if {stub} :
+    stack, root = headless.stubTk()
+else :
+    import tkinter
+    root = tkinter.Tk()
+from minesweeper import Minesweeper
+game = Minesweeper(root)
+root.update_idletasks()
+if {ready} :
+    game.loadGame()
+"""
+
+########## BENCHMARK REGISTRY ##########
+# name -> (setup, run, number, widgets, io): setup(rng) builds the untimed input of a repetition,
+# run(state) is timed number times in a row on it, widgets tells if its widget calls are counted
+# and io if it is bound by the file system rather than the CPU
+BENCHMARKS = {}
+
+def addBenchmark(name, setup, run, number=1, widgets=False, io=False) :
+    '''
+    Registers a benchmark.
+    '''
+    BENCHMARKS[name] = (setup, run, number, widgets, io)
+
+def addBoardBenchmarks() :
+    '''
+    Registers the board generation and flood fill benchmarks.
+    '''
+    for rows, cols in SIZES :
+        # keep every measure around a few milliseconds
+        number = max(1, 100000 // (rows * cols))
+
+        for density in DENSITIES :
+            bombs = int(rows * cols * density)
+            addBenchmark(f"build_grid/{rows}x{cols}/{density}",
+                         lambda rng, rows=rows, cols=cols, bombs=bombs : Board(rows, cols, bombs, rng=rng),
+                         lambda board : board.buildGrid(board.grid_rows // 2, board.grid_cols // 2), number)
+            addBenchmark(f"count_neighbours/{rows}x{cols}/{density}",
+                         lambda rng, rows=rows, cols=cols, density=density : rng.random((rows, cols)) < density,
+                         countNeighbours, number)
+            addBenchmark(f"board_metrics/{rows}x{cols}/{density}",
+                         lambda rng, rows=rows, cols=cols, density=density : rng.random((rows, cols)) < density,
+                         boardMetrics, max(1, number // 10))
+
+        for density in OPEN_DENSITIES :
+            bombs = int(rows * cols * density)
+            addBenchmark(f"reveal/{rows}x{cols}/{density}",
+                         lambda rng, rows=rows, cols=cols, bombs=bombs : openBoard(rng, rows, cols, bombs),
+                         lambda board : board.uncoverCell(board.grid_rows // 2, board.grid_cols // 2))
+
+    # boards measured together, as the batch simulator does
+    for rows, cols, bombs in METRICS_BATCHES :
+        addBenchmark(f"board_metrics/batch/{METRICS_BATCH_SIZE}x{rows}x{cols}",
+                     lambda rng, rows=rows, cols=cols, bombs=bombs : rng.random((METRICS_BATCH_SIZE, rows, cols)) < bombs / (rows * cols),
+                     boardMetrics)
+
+def openBoard(rng, rows, cols, bombs) :
+    '''
+    Returns a board with its bombs placed around a first click in its center.
+    '''
+    board = Board(rows, cols, bombs, rng=rng)
+    board.placeMines(rows // 2, cols // 2)
+    return board
+
+def addWidgetBenchmarks(session) :
+    '''
+    Registers the benchmarks of the GUI: building the covers, resetting a game and
+    switching themes on a game in progress.
+    '''
+    for renderer, boards in WIDGET_BOARDS.items() :
+        for rows, cols, bombs in boards :
+            board = f"{rows}x{cols}"
+            setup = lambda rng, renderer=renderer, rows=rows, cols=cols, bombs=bombs : session.startGame(renderer, rows, cols, bombs, rng)
+            addBenchmark(f"build_covers/{renderer}/{board}", setup,
+                         lambda game : session.flush(game.renderer.buildCovers()), widgets=True)
+            addBenchmark(f"game_reset/{renderer}/{board}", setup,
+                         lambda game : session.flush(game.gameReset()), widgets=True)
+            addBenchmark(f"refresh_ui/{renderer}/{board}", setup,
+                         lambda game : session.flush(game.setTheme("dark" if game.theme_name == "light" else "light")), widgets=True)
+
+def addStartupBenchmarks(session) :
+    '''
+    Registers the startup benchmarks, run in a new process on the same kind of Tk root as the
+    session: until the first frame is built (the heavy modules are not imported yet), and until
+    the board is ready.
+    '''
+    for stage in ("first_frame", "ready") :
+        code = STARTUP_CODE.format(bench_dir=BENCH_DIR, main_dir=MAIN_DIR, stub=session.mode == "stub", ready=stage == "ready")
+        addBenchmark(f"startup/{stage}", lambda rng : None,
+                     lambda state, code=code : subprocess.run([sys.executable, "-c", code], check=True))
+
+def addScoreBenchmarks(directory) :
+    '''
+    Registers the high score benchmarks: loading a page of a leaderboard with a fresh store
+    (as a new game does) and saving a score, for every store.
+    '''
+    for backend, (file_name, store) in SCORE_STORES.items() :
+        for count in SCORE_COUNTS :
+            filled = os.path.join(directory, f"{count}-{file_name}")
+            setup = lambda rng, store=store, filled=filled, count=count : copyScores(rng, store, filled, count)
+            addBenchmark(f"scores/{backend}/load/{count}", setup,
+                         lambda store : type(store)(store.path).page("expert", 0, 15), io=True)
+            addBenchmark(f"scores/{backend}/save/{count}", setup,
+                         lambda store : store.addScore("expert", {"name" : "bench", "time" : 50.5, "date" : "2026-01-01"}), io=True)
+
+def copyScores(rng, store, filled, count) :
+    '''
+    Returns a store on a fresh copy of a leaderboard of count seeded scores.
+    '''
+    if not os.path.exists(filled) :
+        entries = [{"name" : f"player{time_ms % 50}", "time" : time_ms / 1000, "date" : "2026-01-01"}
+                   for time_ms in sorted(rng.integers(10000, 999000, size=count).tolist())]
+        # written in one batch (adding the scores one by one rewrites a JSON file every time)
+        scores = store(filled)
+        if isinstance(scores, SqliteScoreStore) :
+            with closing(scores.connect()) as db, db :
+                db.executemany("INSERT INTO scores (key, name, time, date) VALUES ('expert', ?, ?, ?)",
+                               [(entry["name"], entry["time"], entry["date"]) for entry in entries])
+                scores.buildRanks(db)
+        else :
+            with open(filled, 'w') as file :
+                json.dump({"expert" : entries}, file)
+
+    base, extension = os.path.splitext(filled)
+    path = f"{base}-copy{extension}"
+    shutil.copyfile(filled, path)
+    return store(path)
+
+########## GUI SESSION ##########
+class GuiSession :
+    '''
+    Games the widget benchmarks run on (one per renderer), on a real Tk root (under X or
+    Xvfb) or, without a display, on the headless stand-in, which counts widget calls.
+    '''
+    def __init__(self, mode, directory) :
+        '''
+        Takes the Tk mode ("auto", "real" or "stub") and a directory for the game files.
+        '''
+        self.directory = directory
+        self.games = {}
+        self.stack = None
+        self.root = None
+
+        if mode != "stub" :
+            import tkinter
+            try :
+                self.root = tkinter.Tk()
+            except tkinter.TclError :
+                if mode == "real" :
+                    raise
+        if self.root is None :
+            self.stack, self.root = headless.stubTk()
+            self.mode = "stub"
+        else :
+            self.mode = "real"
+
+    def startGame(self, renderer, rows, cols, bombs, rng) :
+        '''
+        Returns the renderer's game set to a board configuration, with a first cell uncovered.
+        '''
+        from archive import Archive
+        from minesweeper import Minesweeper
+        from scores import JsonScoreStore
+
+        game = self.games.get(renderer)
+        if game is None :
+            game = Minesweeper(self.root, renderer=renderer)
+            game.loadGame()
+            # keep the game files out of the resources
+            game.replays_file = os.path.join(self.directory, "replays.bin")
+            game.score_store = JsonScoreStore(os.path.join(self.directory, "highscores.json"))
+            game.archive = Archive(os.path.join(self.directory, "archive"))
+            self.games[renderer] = game
+
+        game.setDifficulty("custom", rows, cols, bombs)
+        game.board.rng = rng
+        game.uncoverCell(None, rows // 2, cols // 2)
+        self.flush()
+        return game
+
+    def flush(self, result=None) :
+        '''
+        Lets a real Tk root apply the pending redraws (part of the measured cost).
+        '''
+        if self.mode == "real" :
+            self.root.update_idletasks()
+        return result
+
+    def getCalls(self) :
+        '''
+        Returns the number of widget calls made so far (None on a real Tk root).
+        '''
+        return headless.StubWidget.calls if self.mode == "stub" else None
+
+    def close(self) :
+        '''
+        Shuts the games and the Tk root (or the stand-in) down.
+        '''
+        for game in self.games.values() :
+            game.shutdown()
+        if self.stack is not None :
+            self.stack.close()
+        else :
+            self.root.destroy()
+
+########## MEASURES ##########
+def measure(name, seed, repeat, session) :
+    '''
+    Runs a benchmark repeat times and returns its median and best times in milliseconds
+    (per run), the calibration it is compared with and, for widget benchmarks on the headless
+    stand-in, the widget calls of a run.
+    '''
+    setup, run, number, widgets, io = BENCHMARKS[name]
+    calibration = calibrate()
+    counted = widgets and session.getCalls() is not None
+    times = []
+    calls = None
+
+    for repetition in range(repeat) :
+        # the same seed always gives every repetition of a benchmark the same input
+        rng = np.random.default_rng([seed, zlib.crc32(name.encode()), repetition])
+        state = setup(rng)
+
+        start_calls = session.getCalls() if counted else None
+        start = time.perf_counter()
+        for _ in range(number) :
+            run(state)
+        times.append((time.perf_counter() - start) * 1000 / number)
+        if counted :
+            calls = (session.getCalls() - start_calls) // number
+
+    return {"median_ms" : round(statistics.median(times), 4), "min_ms" : round(min(times), 4), "calls" : calls,
+            "calibration_ms" : calibration, "io" : io}
+
+def calibrate(repeat=3) :
+    '''
+    Returns the best time in milliseconds of a fixed pure Python workload. Every benchmark is
+    calibrated right before it runs and compared relative to it, so a baseline recorded on a
+    faster (or less busy) machine still applies.
+    '''
+    times = []
+    for _ in range(repeat) :
+        start = time.perf_counter()
+        table = {}
+        for i in range(200000) :
+            table[i % 1000] = table.get(i % 1000, 0) + i
+        times.append((time.perf_counter() - start) * 1000)
+    return round(min(times), 4)
+
+def findRegressions(results, baseline, tolerance) :
+    '''
+    Returns a description of every result whose best time is slower (beyond the tolerance),
+    or which makes more widget calls, than its baseline. Baseline times are first scaled by
+    the speed of this machine relative to the baseline's (from their calibrations). File system
+    bound benchmarks compare their median time instead, within IO_TOLERANCE and IO_NOISE_MS, and
+    are only scaled when this machine is slower.
+    '''
+    regressions = []
+    for name, result in results.items() :
+        reference = baseline.get(name)
+        if reference is None :
+            continue
+        if result.get("io") :
+            expected = reference["median_ms"] * max(1.0, result["calibration_ms"] / reference["calibration_ms"])
+            if result["median_ms"] > expected * IO_TOLERANCE + IO_NOISE_MS :
+                regressions.append(f"{name}: median {result['median_ms']:.4f} ms (baseline {expected:.4f} ms)")
+        else :
+            expected = reference["min_ms"] * result["calibration_ms"] / reference["calibration_ms"]
+            limit = max(expected * tolerance, expected + NOISE_MS)
+            if result["min_ms"] > limit :
+                regressions.append(f"{name}: best {result['min_ms']:.4f} ms (baseline {expected:.4f} ms on this machine)")
+        if None not in (result["calls"], reference["calls"]) and result["calls"] > reference["calls"] :
+            regressions.append(f"{name}: {result['calls']} widget calls (baseline {reference['calls']})")
+    return regressions
+
+########## MAIN FUNCTION ##########
+def main() :
+    # parse command line options
+    parser = argparse.ArgumentParser(description="Benchmark the board, reveal, rendering, startup and high score hot paths.")
+    parser.add_argument("--filter", default="", help="only run the benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions of every benchmark (their median and best times are kept)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the benchmark inputs")
+    parser.add_argument("--tk", choices=["auto", "real", "stub"], default="auto",
+                        help="run the widget benchmarks on a real Tk root, the headless stand-in, or whichever is available")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--save", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit with an error if a result regressed from the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="slowdown over the baseline allowed by --check")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="minesweeper-bench-")
+    session = GuiSession(args.tk, directory)
+    addBoardBenchmarks()
+    addWidgetBenchmarks(session)
+    addStartupBenchmarks(session)
+    addScoreBenchmarks(directory)
+
+    results = {}
+    try :
+        for name in BENCHMARKS :
+            if args.filter not in name :
+                continue
+            results[name] = measure(name, args.seed, args.repeat, session)
+            calls = results[name]["calls"]
+            print(f"{name:<40} {results[name]['median_ms']:>10.4f} ms  (best {results[name]['min_ms']:.4f} ms)"
+                  + (f"  {calls} widget calls" if calls is not None else ""))
+    finally :
+        session.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        "meta" : {"python" : platform.python_version(), "numpy" : np.__version__, "machine" : platform.machine(),
+                  "tk" : session.mode, "seed" : args.seed, "repeat" : args.repeat},
+        "results" : results
+    }
+    if args.output :
+        with open(args.output, 'w') as file :
+            json.dump(report, file, indent=2)
+
+    baseline = {"meta" : {}, "results" : {}}
+    if os.path.exists(BASELINE_FILE) :
+        with open(BASELINE_FILE, 'r') as file :
+            baseline = json.load(file)
+
+    if args.check :
+        # widget call counts only compare between runs on the same kind of root
+        same_tk = baseline["meta"].get("tk") == session.mode
+        reference = {name : dict(result, calls=result["calls"] if same_tk else None) for name, result in baseline["results"].items()}
+        regressions = findRegressions(results, reference, args.tolerance)
+        for regression in regressions :
+            print(f"REGRESSION {regression}")
+        if regressions :
+            sys.exit(1)
+        print(f"no regression over {len(set(results) & set(reference))} baseline results")
+
+    if args.save :
+        baseline["meta"] = report["meta"]
+        baseline["results"].update(results)
+        with open(BASELINE_FILE, 'w') as file :
+            json.dump(baseline, file, indent=2, sort_keys=True)
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,97 @@
+########## IMPORTS ##########
+import itertools
+import sys
+import tkinter
+import types
+from contextlib import ExitStack
+from unittest import mock
+
+########## HEADLESS TK STAND-IN ##########
+# results of the widget methods whose return value the game uses (other winfo methods return 0,
+# anything else None)
+RESULTS = {
+       "winfo_rgb" : (0, 0, 0),
+    "winfo_fpixels" : 96.0,
+            "cget" : "",
+}
+
+class StubWidget :
+    '''
+    Stand-in for every Tk widget, font and image when no display is available. Nothing is
+    drawn: every constructor and method call is counted instead, which stands for one Tcl
+    round-trip of the real widget.
+    '''
+    # calls made since the last reset (shared by every stub)
+    calls = 0
+    # ids of the canvas items and scheduled callbacks
+    ids = itertools.count(1)
+
+    def __init__(self, *args, **kwargs) :
+        StubWidget.calls += 1
+
+    def __getattr__(self, name) :
+        def method(*args, **kwargs) :
+            StubWidget.calls += 1
+            if name.startswith("create_") or name == "after" :
+                return next(StubWidget.ids)
+            # sizes and positions are 0
+            return RESULTS.get(name, 0 if name.startswith("winfo_") else None)
+        return method
+
+class StubVariable(StubWidget) :
+    '''
+    Stand-in for the Tk variables (keeps its value).
+    '''
+    def __init__(self, master=None, value="") :
+        super().__init__()
+        self.value = value
+
+    def get(self) :
+        return self.value
+
+    def set(self, value) :
+        self.value = value
+
+class StubScrollbar(StubWidget) :
+    '''
+    Stand-in for scrollbars (the game checks for them by type).
+    '''
+
+class StubTclError(Exception) :
+    '''
+    Stand-in for tkinter.TclError.
+    '''
+
+def stubModule() :
+    '''
+    Returns a stand-in for the tkinter module.
+    '''
+    module = types.SimpleNamespace(Scrollbar=StubScrollbar, StringVar=StubVariable, TclError=StubTclError)
+    for name in ("Tk", "Frame", "Label", "Button", "Canvas", "Entry", "Listbox", "Menu", "OptionMenu", "PhotoImage", "Text", "Toplevel") :
+        setattr(module, name, StubWidget)
+    return module
+
+def stubTk() :
+    '''
+    Replaces Tk in the GUI modules (which must be importable) with the stand-in. Returns
+    a context manager restoring them, and the stand-in root window.
+    '''
+    import assets
+    import minesweeper
+    import renderers
+
+    stack = ExitStack()
+    tk = stubModule()
+    stack.enter_context(mock.patch.object(minesweeper, "tk", tk))
+    stack.enter_context(mock.patch.object(renderers, "tk", tk))
+    stack.enter_context(mock.patch.object(assets, "tk", tk))
+    stack.enter_context(mock.patch.object(minesweeper, "Font", StubWidget))
+    stack.enter_context(mock.patch.object(minesweeper, "messagebox", StubWidget()))
+    # the game imports the dialogs and PIL's Tk bridge on first use: the stand-ins are found
+    # there without importing the real modules (so startup measures are not skewed)
+    stack.enter_context(mock.patch.object(tkinter, "simpledialog", StubWidget(), create=True))
+    image_tk = types.SimpleNamespace(PhotoImage=StubWidget)
+    stack.enter_context(mock.patch.dict(sys.modules, {"PIL.ImageTk" : image_tk}))
+    if "PIL" in sys.modules :
+        stack.enter_context(mock.patch.object(sys.modules["PIL"], "ImageTk", image_tk, create=True))
+    return stack, StubWidget()
@@ -0,0 +1,258 @@
+########## IMPORTS ##########
+import argparse
+import json
+import os
+import numpy as np
+from locks import locked
+from difficulty import DIFFICULTIES
+
+########## ARCHIVE LAYOUT ##########
+# one append-only raw file per column (fixed-size little-endian values, one per game)
+COLUMNS = {
+    "config" : "<u2",   # board configuration code (see the index)
+      "time" : "<u4",   # game duration in milliseconds
+       "won" : "u1",    # 1 for a win, 0 for a loss
+       "3bv" : "<u4",   # 3BV of the board
+    "clicks" : "<u4",   # number of recorded actions
+     "human" : "u1",    # 1 for games played in the GUI, 0 for simulated games
+      "date" : "<i4",   # days since 1970-01-01
+    "replay" : "<i8"    # byte offset of the game in the replay file (-1 if not recorded)
+}
+
+# default archive directory (next to the high scores)
+ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), '..', 'resources', 'archive')
+
+def today() :
+    '''
+    Returns the current date in days since 1970-01-01.
+    '''
+    return int(np.datetime64("today", "D").astype(np.int64))
+
+def monthKey(day) :
+    '''
+    Returns the "YYYY-MM" month of a date given in days since 1970-01-01.
+    '''
+    return str(np.datetime64(int(day), "D").astype("datetime64[M]"))
+
+def monthBounds(month) :
+    '''
+    Returns the first day of a "YYYY-MM" month and the first day of the next month
+    (in days since 1970-01-01).
+    '''
+    start = np.datetime64(month, "M")
+    return int(start.astype("datetime64[D]").astype(np.int64)), int((start + 1).astype("datetime64[D]").astype(np.int64))
+
+class Archive :
+    '''
+    Columnar archive of game records. Every column is a raw append-only file read through
+    a read-only memory map, so queries run on zero-copy NumPy views instead of parsing the
+    whole history.
+
+    A small JSON index holds the number of committed records, the table of board
+    configurations (rows, cols, bombs) the config column refers to, and the range of
+    records holding every month. Records are only counted once their columns are synced to disk and
+    the index is rewritten, so a partially written append is ignored (and overwritten by the next one). Appends hold an exclusive lock on
+    the directory and start from the index on disk, so several games can share an archive.
+    '''
+    def __init__(self, path=ARCHIVE_DIR) :
+        '''
+        Opens (or creates) the archive in a directory.
+        '''
+        self.path = path
+        self.index_file = os.path.join(path, "index.json")
+        self.lock_file = os.path.join(path, "archive.lock")
+        # memory maps of the columns (invalidated by appends)
+        self.maps = {}
+        self.load()
+
+    def load(self) :
+        '''
+        Reads the index (the records committed so far by every process).
+        '''
+        self.index = {"count" : 0, "configs" : [], "months" : {}}
+        if os.path.exists(self.index_file) :
+            with open(self.index_file, 'r') as file :
+                self.index = json.load(file)
+        self.maps.clear()
+
+    def __len__(self) :
+        return self.index["count"]
+
+    def columnFile(self, name) :
+        '''
+        Returns the path of a column file.
+        '''
+        return os.path.join(self.path, f"{name}.bin")
+
+    ########## WRITING ##########
+    def configCode(self, rows, cols, bombs, create=False) :
+        '''
+        Returns the code of a board configuration (None if it has never been archived,
+        unless create is set).
+        '''
+        config = [rows, cols, bombs]
+        if config in self.index["configs"] :
+            return self.index["configs"].index(config)
+        if not create :
+            return None
+        self.index["configs"].append(config)
+        return len(self.index["configs"]) - 1
+
+    def append(self, rows, cols, bombs, time, won, value, clicks, human=True, date=None, replay=-1) :
+        '''
+        Archives a single game.
+        '''
+        self.extend(rows, cols, bombs, {"time" : [time], "won" : [won], "3bv" : [value],
+                                        "clicks" : [clicks], "human" : [human],
+                                        "date" : [today() if date is None else date], "replay" : [replay]})
+
+    def extend(self, rows, cols, bombs, records) :
+        '''
+        Archives a batch of games played on one board configuration. records maps every
+        column but "config" to a sequence of values.
+        '''
+        size = len(records["time"])
+        if not size :
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        with locked(self.lock_file) :
+            # append after the records other processes committed since the index was read
+            self.load()
+            self.write(rows, cols, bombs, records)
+
+    def write(self, rows, cols, bombs, records) :
+        '''
+        Appends a batch of games after the committed records and commits them (see extend,
+        which holds the lock).
+        '''
+        count = len(self)
+        size = len(records["time"])
+        columns = dict(records)
+        columns["config"] = np.full(shape=size, fill_value=self.configCode(rows, cols, bombs, create=True))
+        for name, dtype in COLUMNS.items() :
+            data = np.asarray(columns[name], dtype=dtype)
+            file_name = self.columnFile(name)
+            with open(file_name, 'r+b' if os.path.exists(file_name) else 'wb') as file :
+                # drop any uncommitted tail before appending
+                file.seek(count * data.itemsize)
+                file.truncate()
+                file.write(data.tobytes())
+                # the records must be on disk before the index counts them
+                file.flush()
+                os.fsync(file.fileno())
+
+        # widen the record range of every month in the batch
+        dates = np.asarray(records["date"], dtype=np.int64)
+        for day in np.unique(dates).tolist() :
+            rows_of_day = np.flatnonzero(dates == day)
+            first, end = count + int(rows_of_day[0]), count + int(rows_of_day[-1]) + 1
+            span = self.index["months"].setdefault(monthKey(day), [first, end])
+            span[:] = [min(span[0], first), max(span[1], end)]
+
+        # commit the records
+        self.index["count"] = count + size
+        temp_file = self.index_file + ".tmp"
+        with open(temp_file, 'w') as file :
+            json.dump(self.index, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file, self.index_file)
+        self.maps.clear()
+
+    ########## READING ##########
+    def column(self, name) :
+        '''
+        Returns a read-only zero-copy view of a column (committed records only).
+        '''
+        if name not in self.maps :
+            if len(self) :
+                self.maps[name] = np.memmap(self.columnFile(name), dtype=COLUMNS[name], mode='r', shape=(len(self),))
+            else :
+                self.maps[name] = np.zeros(shape=0, dtype=COLUMNS[name])
+        return self.maps[name]
+
+    def monthRange(self, month) :
+        '''
+        Returns the slice of records holding a "YYYY-MM" month (other months may be mixed in).
+        '''
+        return slice(*self.index["months"].get(month, (0, 0)))
+
+    def select(self, rows=None, cols=None, bombs=None, month=None, won=None, human=None) :
+        '''
+        Returns the record numbers matching a board configuration, a "YYYY-MM" month, a result
+        and whether the games were played in the GUI. Only the columns (and months) needed are read.
+        '''
+        span = self.monthRange(month) if month is not None else slice(0, len(self))
+        mask = np.ones(shape=span.stop - span.start, dtype=bool)
+
+        if rows is not None :
+            code = self.configCode(rows, cols, bombs)
+            if code is None :
+                return np.zeros(shape=0, dtype=np.int64)
+            mask &= self.column("config")[span] == code
+        if month is not None :
+            # the index gives the month's records, dates confirm them
+            first, last = monthBounds(month)
+            dates = self.column("date")[span]
+            mask &= (dates >= first) & (dates < last)
+        if won is not None :
+            mask &= self.column("won")[span] == won
+        if human is not None :
+            mask &= self.column("human")[span] == human
+
+        return span.start + np.flatnonzero(mask)
+
+    def bestTimes(self, rows, cols, bombs, month=None, limit=10) :
+        '''
+        Returns the record numbers of the fastest wins played in the GUI on a board
+        configuration, fastest first.
+        '''
+        selected = self.select(rows, cols, bombs, month=month, won=1, human=1)
+        times = self.column("time")[selected]
+        best = np.argsort(times, kind="stable")[:limit]
+        return selected[best]
+
+    def winRateByDensity(self) :
+        '''
+        Returns {bomb density : (games, wins)} over the whole archive.
+        '''
+        configs = self.index["configs"]
+        codes = self.column("config")
+        games = np.bincount(codes, minlength=len(configs))
+        wins = np.bincount(codes, weights=self.column("won"), minlength=len(configs))
+
+        result = {}
+        for (rows, cols, bombs), played, won in zip(configs, games.tolist(), wins.tolist()) :
+            density = round(bombs / (rows * cols), 3)
+            total_played, total_won = result.get(density, (0, 0))
+            result[density] = (total_played + played, total_won + int(won))
+        return dict(sorted(result.items()))
+
+########## MAIN FUNCTION ##########
+def main() :
+    # parse command line options
+    parser = argparse.ArgumentParser(description="Query the archive of played Minesweeper games.")
+    parser.add_argument("--path", default=ARCHIVE_DIR, help="archive directory")
+    parser.add_argument("--best", choices=list(DIFFICULTIES), help="list the best times of a difficulty")
+    parser.add_argument("--month", help="restrict --best to a month (YYYY-MM)")
+    parser.add_argument("--limit", type=int, default=10, help="number of best times to list")
+    parser.add_argument("--density", action="store_true", help="print the win rate by bomb density")
+    args = parser.parse_args()
+
+    archive = Archive(args.path)
+    print(f"{len(archive)} games archived")
+
+    if args.best :
+        settings = DIFFICULTIES[args.best]
+        best = archive.bestTimes(settings["rows"], settings["cols"], settings["bombs"], args.month, args.limit)
+        for place, row in enumerate(best.tolist(), 1) :
+            print(f"{place:>3}. {archive.column('time')[row] / 1000:8.3f}s  "
+                  f"3BV {archive.column('3bv')[row]:>4}  {np.datetime64(int(archive.column('date')[row]), 'D')}")
+
+    if args.density :
+        for density, (games, wins) in archive.winRateByDensity().items() :
+            print(f"density {density:.3f}  {games:>10} games  win rate {100 * wins / max(games, 1):6.2f}%")
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,90 @@
+########## IMPORTS ##########
+import os
+import tkinter as tk
+
+########## IMAGE ASSETS ##########
+# default resource directory
+RESOURCES_DIR = os.path.join(os.path.dirname(__file__), '..', 'resources')
+
+# reset button faces (image file, offset of the face on the button in unscaled pixels)
+FACES = {
+    "default" : ("smile.png", 0),
+    "pressed" : ("smile.png", 1),   # pushed towards the bottom right corner
+         "oh" : ("oh.png", 0),      # mouse button held down on the mine field
+        "win" : ("win.png", 0),
+       "lose" : ("lose.png", 0)
+}
+
+def screenScale(widget) :
+    '''
+    Returns the HiDPI scale factor of a widget's screen (1.0 up to 96 dpi).
+    '''
+    return max(1.0, widget.winfo_fpixels('1i') / 96)
+
+class ImageCache :
+    '''
+    Cache of the images shown in the window. Every image file is decoded once, and every
+    face is resized and drawn on its button color once per size and theme, so showing a
+    face never reads the disk or calls PIL again. PIL itself is only imported with the
+    first face, after the window has been painted.
+    '''
+    def __init__(self, master, size=31, padding=3, scale=None, path=RESOURCES_DIR) :
+        '''
+        Takes the Tk root, the size of the faces and of the padding around them (before scaling)
+        and the HiDPI scale factor (detected from the screen by default).
+        '''
+        self.master = master
+        self.scale = screenScale(master) if scale is None else scale
+        self.size = round(size * self.scale)
+        self.padding = round(padding * self.scale)
+        self.path = path
+        # decoded images keyed by file name
+        self.sources = {}
+        # PhotoImages keyed by (face, size, background color)
+        self.images = {}
+        # blank image shown until the faces are loaded
+        self.placeholder = None
+
+    def getSource(self, file_name) :
+        '''
+        Returns a decoded image file.
+        '''
+        if file_name not in self.sources :
+            from PIL import Image
+            with Image.open(os.path.join(self.path, file_name)) as img :
+                self.sources[file_name] = img.convert("RGBA")
+        return self.sources[file_name]
+
+    def getFace(self, name, background) :
+        '''
+        Returns the PhotoImage of a reset button face drawn on a theme's button color.
+        '''
+        key = (name, self.size, background)
+        if key not in self.images :
+            from PIL import Image, ImageTk
+            file_name, offset = FACES[name]
+            img = self.getSource(file_name).resize(size=(self.size, self.size), resample=Image.LANCZOS)
+            # add padding (in the button color, so the face edges blend into the button)
+            red, green, blue = (value // 257 for value in self.master.winfo_rgb(background))
+            side = self.size + 2 * self.padding
+            new_img = Image.new(mode="RGBA", size=(side, side), color=(red, green, blue, 255))
+            shift = self.padding + round(offset * self.scale)
+            new_img.alpha_composite(img, dest=(shift, shift))
+            self.images[key] = ImageTk.PhotoImage(new_img, master=self.master)
+        return self.images[key]
+
+    def getPlaceholder(self) :
+        '''
+        Returns a blank (transparent) image of the size of the faces, drawn by Tk alone.
+        '''
+        if self.placeholder is None :
+            side = self.size + 2 * self.padding
+            self.placeholder = tk.PhotoImage(master=self.master, width=side, height=side)
+        return self.placeholder
+
+    def preload(self, background) :
+        '''
+        Prepares every face for a theme's button color.
+        '''
+        for name in FACES :
+            self.getFace(name, background)
@@ -0,0 +1,367 @@
+import numpy as np
+
+# bit layout of a cell in Board.cells
+COUNT = 0x0F     # number of neighbouring bombs (0-8)
+MINE = 0x10      # cell contains a bomb
+UNCOVERED = 0x20 # cell has been uncovered
+FLAGGED = 0x40   # cell is flagged
+
+def countNeighbours(mask) :
+    '''
+    Returns, for every cell, the number of its eight neighbours set in a boolean mask
+    (or in every mask of a stack, along the last two axes).
+    Computed as a single 3x3 neighbourhood sum over a zero-padded copy of the mask
+    (a horizontal 3-sum followed by a vertical 3-sum, minus the cell itself).
+    '''
+    *stack, rows, cols = mask.shape
+    padded = np.zeros(shape=(*stack, rows + 2, cols + 2), dtype=np.uint8)
+    padded[..., 1:-1, 1:-1] = mask
+
+    # sum each row of three, then each column of three row sums
+    row_sums = padded[..., :, :-2] + padded[..., :, 1:-1] + padded[..., :, 2:]
+    counts = row_sums[..., :-2, :] + row_sums[..., 1:-1, :] + row_sums[..., 2:, :]
+    counts -= padded[..., 1:-1, 1:-1]
+
+    return counts
+
+def newSeed() :
+    '''
+    Returns a fresh random board seed (a 63-bit integer).
+    '''
+    return int(np.random.default_rng().integers(1 << 63))
+
+class Board :
+    '''
+    Headless minesweeper board. Holds the mine field and the player's progress
+    on plain arrays so the game can be played without any GUI.
+
+    The whole state of the mine field is a single uint8 buffer (one byte per cell):
+    the low four bits hold the clue and the MINE, UNCOVERED and FLAGGED bits hold the
+    rest, so membership checks are O(1) and copying a board is one buffer copy.
+
+    Bombs are placed lazily, on the first reveal, away from the revealed cell and its
+    neighbours: the first click is always safe and a reset costs no generation at all.
+    A board created from an integer seed draws its bombs from its own generator, so the
+    seed and the first revealed cell reproduce it exactly (see codes.encodeBoard).
+    '''
+    __slots__ = ("grid_rows", "grid_cols", "bomb_count", "seed", "rng", "cells", "placed", "start",
+                 "uncovered_count", "flag_placements", "won", "lost", "detonated")
+
+    def __init__(self, rows=9, cols=9, bomb_count=10, rng=None) :
+        '''
+        Creates a board with the given dimensions and number of bombs. Pass an integer seed
+        (a fresh one is drawn by default) or a shared np.random.Generator as rng.
+        '''
+        # grid dimensions
+        self.grid_rows = rows
+        self.grid_cols = cols
+        # number of bombs on the grid
+        self.bomb_count = bomb_count
+        # seed of the board's own generator (None when it shares a generator)
+        if rng is None :
+            rng = newSeed()
+        self.seed = int(rng) if isinstance(rng, (int, np.integer)) else None
+        # random number generator used to place bombs
+        self.rng = np.random.default_rng(rng)
+
+        # create a fresh mine field
+        self.reset()
+
+    @classmethod
+    def fromMines(cls, mines, rng=None) :
+        '''
+        Creates a board with the bombs of a boolean (rows, cols) mask instead of random ones.
+        '''
+        board = cls.__new__(cls)
+        board.grid_rows, board.grid_cols = mines.shape
+        board.bomb_count = int(np.count_nonzero(mines))
+        board.seed = None
+        board.rng = np.random.default_rng(rng)
+        board.reset(mines)
+
+        return board
+
+    def reset(self, mines=None) :
+        '''
+        Clears all progress. A new set of bombs is placed on the next reveal, unless the
+        bombs of a boolean mask are given.
+        '''
+        if mines is None and not 0 <= self.bomb_count < self.grid_rows * self.grid_cols :
+            raise ValueError(f"cannot place {self.bomb_count} bombs on a {self.grid_rows}x{self.grid_cols} grid")
+
+        # number of uncovered cells and placed flags
+        self.uncovered_count = 0
+        self.flag_placements = 0
+        # game status
+        self.won = False
+        self.lost = False
+        # coordinates of the bomb that ended the game (if any)
+        self.detonated = None
+        # cell the bombs were placed around, or else the first cell uncovered (if any)
+        self.start = None
+
+        # empty mine field until the first reveal (or the given bombs and their clues)
+        if mines is None :
+            self.cells = np.zeros(shape=(self.grid_rows, self.grid_cols), dtype=np.uint8)
+            self.placed = False
+        else :
+            self.cells = Board.packCells(mines)
+            self.placed = True
+
+    def copy(self) :
+        '''
+        Returns an independent copy of the board (the random number generator is shared).
+        '''
+        board = Board.__new__(Board)
+        for name in Board.__slots__ :
+            setattr(board, name, getattr(self, name))
+        board.cells = self.cells.copy()
+
+        return board
+
+    ########## BOARD GENERATION ##########
+    def buildGrid(self, row=None, col=None) :
+        '''
+        Randomly places hidden bombs in the mine field, away from the given cell and its
+        neighbours (or only away from the cell itself when the board is too crowded).
+        All bomb positions are drawn in a single sample without replacement and every clue
+        is computed in one pass.
+        '''
+        # cells that must stay free of bombs
+        excluded = np.zeros(shape=self.grid_rows * self.grid_cols, dtype=bool)
+        if row is not None :
+            area = [(row, col)] + self.neighbours(row, col)
+            if excluded.size - len(area) < self.bomb_count :
+                area = [(row, col)]
+            excluded[[r * self.grid_cols + c for r, c in area]] = True
+
+        candidates = np.flatnonzero(~excluded)
+        if not 0 <= self.bomb_count <= candidates.size :
+            raise ValueError(f"cannot place {self.bomb_count} bombs on a {self.grid_rows}x{self.grid_cols} grid")
+
+        # pick every bomb position at once
+        mines = np.zeros(shape=self.grid_rows * self.grid_cols, dtype=bool)
+        mines[self.rng.choice(candidates, size=self.bomb_count, replace=False)] = True
+
+        return Board.packCells(mines.reshape(self.grid_rows, self.grid_cols))
+
+    def placeMines(self, row=None, col=None) :
+        '''
+        Places the bombs, keeping the given cell (and, room permitting, its neighbours) free.
+        The cell buffer is updated in place so flags and views over it stay valid.
+        '''
+        self.cells |= self.buildGrid(row, col)
+        self.placed = True
+        if row is not None :
+            self.start = (row, col)
+
+    @staticmethod
+    def packCells(mines) :
+        '''
+        Returns the cell buffer (clues and MINE bits) of a boolean mine mask.
+        '''
+        cells = countNeighbours(mines)
+        cells[mines] |= MINE
+
+        return cells
+
+    ########## BOARD VIEWS ##########
+    @property
+    def grid(self) :
+        '''
+        Returns the grid of integers (number of adjacent bombs, -1 signifies a bomb).
+        Every cell is 0 until the bombs are placed.
+        '''
+        grid = (self.cells & COUNT).astype(np.int8)
+        grid[self.mines] = -1
+
+        return grid
+
+    @property
+    def mines(self) :
+        '''
+        Returns a boolean mask of the bombs.
+        '''
+        return (self.cells & MINE) != 0
+
+    @property
+    def uncovered(self) :
+        '''
+        Returns a boolean mask of the uncovered cells.
+        '''
+        return (self.cells & UNCOVERED) != 0
+
+    @property
+    def flagged(self) :
+        '''
+        Returns a boolean mask of the flagged cells.
+        '''
+        return (self.cells & FLAGGED) != 0
+
+    @property
+    def bomb_locations(self) :
+        '''
+        Returns the list of placed bomb coordinates.
+        '''
+        return [(int(r), int(c)) for r, c in np.argwhere(self.mines)]
+
+    def getContent(self, row, col) :
+        '''
+        Returns the number of bombs surrounding a cell, or -1 if the cell contains a bomb.
+        '''
+        cell = int(self.cells[row, col])
+        return -1 if cell & MINE else cell & COUNT
+
+    def isUncovered(self, row, col) :
+        '''
+        Returns True if the cell has been uncovered.
+        '''
+        return bool(self.cells[row, col] & UNCOVERED)
+
+    def isFlagged(self, row, col) :
+        '''
+        Returns True if the cell is flagged.
+        '''
+        return bool(self.cells[row, col] & FLAGGED)
+
+    def neighbours(self, row, col) :
+        '''
+        Returns the coordinates of the cells surrounding a cell.
+        '''
+        return [(r, c)
+                for r in range(max(0, row - 1), min(self.grid_rows - 1, row + 1) + 1)
+                for c in range(max(0, col - 1), min(self.grid_cols - 1, col + 1) + 1)
+                if (r, c) != (row, col)]
+
+    ########## PLAYER ACTIONS ##########
+    def uncoverCell(self, row, col) :
+        '''
+        Uncovers a cell. Returns the list of newly uncovered cells, which includes
+        every cell opened by a flood fill when the cell has no neighbouring bombs.
+        '''
+        cell = int(self.cells[row, col])
+        # ignore finished games, flagged cells and cells that are already uncovered
+        if self.isOver() or cell & (FLAGGED | UNCOVERED) :
+            return []
+
+        # the first reveal places the bombs around it
+        if not self.placed :
+            self.placeMines(row, col)
+            cell = int(self.cells[row, col])
+        if self.start is None :
+            self.start = (row, col)
+
+        # cell contains a bomb
+        if cell & MINE :
+            self.cells[row, col] |= UNCOVERED
+            self.detonated = (row, col)
+            self.lost = True
+            return [(row, col)]
+
+        # uncover the cell and any surrounding 0s
+        revealed = self.floodFill(row, col)
+        self.uncovered_count += len(revealed)
+
+        # end game if all non-bomb cells are uncovered
+        if self.uncovered_count >= (self.grid_rows * self.grid_cols) - self.bomb_count :
+            self.won = True
+
+        return revealed
+
+    def floodFill(self, row, col) :
+        '''
+        Uncovers a safe cell and, if it contains a 0, the whole open area around it.
+        The open area is found with an iterative scanline fill over horizontal runs of 0s
+        (no recursion), and every uncovered cell is returned at once so the GUI can
+        redraw them in one batch.
+        '''
+        # clues do not spread
+        if self.cells[row, col] & COUNT :
+            self.cells[row, col] |= UNCOVERED
+            return [(row, col)]
+
+        rows, cols = self.grid_rows, self.grid_cols
+        # 0s the fill may spread through (flags stop it)
+        open_cells = (self.cells & (COUNT | MINE | FLAGGED)) == 0
+
+        # label every horizontal run of open 0s (0 -> not open)
+        starts = open_cells.copy()
+        starts[:, 1:] &= ~open_cells[:, :-1]
+        ends = open_cells.copy()
+        ends[:, :-1] &= ~open_cells[:, 1:]
+        run_ids = np.cumsum(starts, axis=None).reshape(rows, cols) * open_cells
+        run_starts = np.flatnonzero(starts)
+        run_ends = np.flatnonzero(ends)
+
+        # visit every run connected to the clicked run
+        visited = np.zeros(shape=len(run_starts) + 1, dtype=bool)
+        stack = [int(run_ids[row, col])]
+        visited[stack[0]] = True
+        while stack :
+            run = stack.pop()
+            r, first = divmod(int(run_starts[run - 1]), cols)
+            last = int(run_ends[run - 1]) - r * cols
+            # runs above and below touching this run (diagonals included)
+            for nr in (r - 1, r + 1) :
+                if not 0 <= nr < rows :
+                    continue
+                for neighbour in set(run_ids[nr, max(0, first - 1):min(cols, last + 2)].tolist()) :
+                    if neighbour and not visited[neighbour] :
+                        visited[neighbour] = True
+                        stack.append(neighbour)
+
+        # uncover the open area and the clues bordering it
+        area = visited[run_ids]
+        reveal = (area | (countNeighbours(area) > 0)) & ((self.cells & (UNCOVERED | FLAGGED)) == 0)
+        self.cells[reveal] |= UNCOVERED
+
+        rs, cs = np.nonzero(reveal)
+        return list(zip(rs.tolist(), cs.tolist()))
+
+    def toggleFlag(self, row, col) :
+        '''
+        Places or removes a flag on a covered cell. Returns True if the cell is now flagged.
+        '''
+        if self.isOver() or self.isUncovered(row, col) :
+            return self.isFlagged(row, col)
+
+        self.cells[row, col] ^= FLAGGED
+        flagged = self.isFlagged(row, col)
+        self.flag_placements += 1 if flagged else -1
+
+        return flagged
+
+    def chordCell(self, row, col) :
+        '''
+        Uncovers every unflagged neighbour of an uncovered clue whose number of
+        neighbouring flags matches its clue. Returns the list of newly uncovered cells.
+        '''
+        if self.isOver() or not self.isUncovered(row, col) or self.getContent(row, col) <= 0 :
+            return []
+
+        neighbours = self.neighbours(row, col)
+        # the clue must be satisfied by the surrounding flags
+        if sum(1 for r, c in neighbours if self.isFlagged(r, c)) != self.getContent(row, col) :
+            return []
+
+        revealed = []
+        for r, c in neighbours :
+            revealed.extend(self.uncoverCell(r, c))
+            # keep the detonated bomb in the result but stop uncovering
+            if self.lost :
+                break
+
+        return revealed
+
+    ########## GAME STATUS ##########
+    def isOver(self) :
+        '''
+        Returns True if the game has been won or lost.
+        '''
+        return self.won or self.lost
+
+    def remainingFlags(self) :
+        '''
+        Returns the number of bombs not accounted for by a flag.
+        '''
+        return self.bomb_count - self.flag_placements
@@ -0,0 +1,51 @@
+########## IMPORTS ##########
+import time
+
+########## GAME CLOCK ##########
+class GameClock :
+    '''
+    Measures the duration of a game with time.perf_counter. The measure does not depend on
+    how often (or how late) the display is refreshed, so a busy event loop never changes a
+    player's time.
+    '''
+    def __init__(self) :
+        # start and end of the game (None until it starts / while it runs)
+        self.started = None
+        self.stopped = None
+
+    def start(self) :
+        '''
+        Starts the clock (once per game).
+        '''
+        if self.started is None :
+            self.started = time.perf_counter()
+
+    def stop(self) :
+        '''
+        Stops the clock, keeping the measured duration.
+        '''
+        if self.isRunning() :
+            self.stopped = time.perf_counter()
+
+    def reset(self) :
+        '''
+        Clears the clock for a new game.
+        '''
+        self.started = None
+        self.stopped = None
+
+    def isRunning(self) :
+        '''
+        Returns True if the clock has been started and not stopped.
+        '''
+        return self.started is not None and self.stopped is None
+
+    def getElapsed(self) :
+        '''
+        Returns the milliseconds elapsed since the start (until the stop once stopped),
+        or None if the clock has not been started.
+        '''
+        if self.started is None :
+            return None
+        end = time.perf_counter() if self.stopped is None else self.stopped
+        return int((end - self.started) * 1000)
@@ -0,0 +1,98 @@
+########## IMPORTS ##########
+import base64
+import binascii
+import struct
+import zlib
+import numpy as np
+from board import Board, MINE
+from difficulty import MAX_ROWS, MAX_COLS
+
+########## CODE FORMAT ##########
+# a board code is the URL-safe base64 (without padding) of one of two records:
+#   seed code:   kind | rows | cols | bombs | seed | start cell
+#   layout code: kind | rows | cols | start cell | zlib-compressed bomb mask (one bit per cell)
+SEED_CODE = struct.Struct("<BHHIQHH")
+LAYOUT_CODE = struct.Struct("<BHHHH")
+SEED = 1
+LAYOUT = 2
+# start cell coordinates of a board shared before any cell was uncovered
+NO_START = 0xFFFF
+
+def checkSize(rows, cols) :
+    '''
+    Raises a ValueError for a board size outside the limits of user-defined boards (checked
+    before anything is allocated, so a code cannot ask for a huge board).
+    '''
+    if not (1 <= rows <= MAX_ROWS and 1 <= cols <= MAX_COLS) :
+        raise ValueError(f"the grid must be between 1x1 and {MAX_ROWS}x{MAX_COLS}")
+
+def seededMines(rows, cols, bombs, seed, start) :
+    '''
+    Returns the bomb mask a board created from a seed gets when its first reveal is the start cell.
+    '''
+    return (Board(rows, cols, bombs, rng=seed).buildGrid(*start) & MINE) != 0
+
+def encodeBoard(board) :
+    '''
+    Returns the shareable code of a board whose bombs are placed. Boards dealt from a seed get
+    a short code (their seed and start cell, which reproduce them as long as NumPy's generator
+    draws the same numbers); any other board, or a board whose generator has moved on, gets the
+    code of its compressed bomb layout, which reproduces it on any version.
+    '''
+    if not board.placed :
+        raise ValueError("the bombs are only placed on the first reveal")
+    rows, cols = board.grid_rows, board.grid_cols
+    start = board.start
+
+    if board.seed is not None and start is not None and board.seed < 1 << 64 :
+        if np.array_equal(seededMines(rows, cols, board.bomb_count, board.seed, start), board.mines) :
+            data = SEED_CODE.pack(SEED, rows, cols, board.bomb_count, board.seed, *start)
+            return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+    start = start or (NO_START, NO_START)
+    data = LAYOUT_CODE.pack(LAYOUT, rows, cols, *start) + zlib.compress(np.packbits(board.mines, axis=None).tobytes(), 9)
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+def decodeBoard(code) :
+    '''
+    Returns the board of a code, with its bombs placed, and its start cell (None if the board
+    was shared before any cell was uncovered). Raises a ValueError for an invalid code.
+    '''
+    code = code.strip()
+    try :
+        data = base64.urlsafe_b64decode(code + "=" * (-len(code) % 4))
+    except (binascii.Error, ValueError) :
+        raise ValueError("not a board code")
+
+    if data[:1] == bytes([SEED]) and len(data) == SEED_CODE.size :
+        kind, rows, cols, bombs, seed, *start = SEED_CODE.unpack(data)
+        checkSize(rows, cols)
+        if not (1 <= bombs < rows * cols and start[0] < rows and start[1] < cols) :
+            raise ValueError("invalid number of bombs or start cell")
+        board = Board(rows, cols, bombs, rng=seed)
+        board.placeMines(*start)
+        return board, tuple(start)
+
+    if data[:1] == bytes([LAYOUT]) and len(data) > LAYOUT_CODE.size :
+        kind, rows, cols, *start = LAYOUT_CODE.unpack_from(data)
+        checkSize(rows, cols)
+        mask_size = (rows * cols + 7) // 8
+        # never inflate more than the mask of the board (one byte more tells a layout too long)
+        inflater = zlib.decompressobj()
+        try :
+            bits = inflater.decompress(data[LAYOUT_CODE.size:], mask_size + 1)
+        except zlib.error :
+            raise ValueError("corrupted bomb layout")
+        if len(bits) != mask_size or not inflater.eof :
+            raise ValueError("the bomb layout does not match the board size")
+        bits = np.frombuffer(bits, dtype=np.uint8)
+        mines = np.unpackbits(bits, count=rows * cols).astype(bool).reshape(rows, cols)
+        if mines.all() or not mines.any() :
+            raise ValueError("a board needs at least one bomb and one cell without a bomb")
+        if tuple(start) == (NO_START, NO_START) :
+            return Board.fromMines(mines), None
+        if not (start[0] < rows and start[1] < cols) or mines[start[0], start[1]] :
+            raise ValueError("invalid start cell")
+        return Board.fromMines(mines), tuple(start)
+
+    raise ValueError("not a board code")
@@ -0,0 +1,47 @@
+########## DIFFICULTY REGISTRY ##########
+# preset board configurations (rows x cols, number of bombs)
+DIFFICULTIES = {
+      "easy" : {"rows" : 9, "cols" : 9, "bombs" : 10},
+      "hard" : {"rows" : 16, "cols" : 16, "bombs" : 40},
+    "expert" : {"rows" : 16, "cols" : 30, "bombs" : 99}
+}
+
+# limits for user-defined boards
+MAX_ROWS = 1000
+MAX_COLS = 1000
+
+def getSettings(difficulty, rows=None, cols=None, bombs=None) :
+    '''
+    Returns the board configuration of a preset difficulty, or validates and returns
+    a custom configuration when the difficulty is "custom".
+    '''
+    if difficulty != "custom" :
+        return dict(DIFFICULTIES[difficulty])
+
+    if not (1 <= rows <= MAX_ROWS and 1 <= cols <= MAX_COLS) :
+        raise ValueError(f"the grid must be between 1x1 and {MAX_ROWS}x{MAX_COLS}")
+    # leave at least one safe cell
+    if not 1 <= bombs < rows * cols :
+        raise ValueError(f"a {rows}x{cols} grid needs between 1 and {rows * cols - 1} bombs")
+
+    return {"rows" : rows, "cols" : cols, "bombs" : bombs}
+
+def scoreKey(rows, cols, bombs) :
+    '''
+    Returns the key high scores are stored under for a board configuration.
+    Boards matching a preset use its name, other boards their dimensions and number of bombs.
+    '''
+    settings = {"rows" : rows, "cols" : cols, "bombs" : bombs}
+    for name, preset in DIFFICULTIES.items() :
+        if preset == settings :
+            return name
+    return f"custom-{rows}x{cols}-{bombs}"
+
+def scoreTitle(key) :
+    '''
+    Returns the display title of a high score key.
+    '''
+    if key in DIFFICULTIES :
+        return f"{key.upper()} MODE"
+    size, bombs = key.split("-")[1:]
+    return f"CUSTOM {size} ({bombs} BOMBS)"
@@ -0,0 +1,150 @@
+########## IMPORTS ##########
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from board import Board
+from solver import Solver
+
+########## NO-GUESS BOARDS ##########
+def isSolvable(board, start) :
+    '''
+    Plays a board from its start cell with the solver and returns True if it can be
+    cleared by deduction alone, without a single guess.
+    '''
+    solver = Solver(board)
+    solver.update(board.uncoverCell(*start))
+    known_mines = 0
+
+    while not board.isOver() :
+        safe, mines = solver.findMoves()
+        # stuck: the next move would be a guess
+        if not safe and len(mines) == known_mines :
+            return False
+        known_mines = len(mines)
+
+        revealed = []
+        for row, col in safe :
+            revealed.extend(board.uncoverCell(row, col))
+        solver.update(revealed)
+
+    return board.won
+
+def generateNoGuess(settings, seed=None, attempts=10000) :
+    '''
+    Generates random boards until one can be solved without guessing from its start cell.
+    Returns the boolean bomb mask and the (row, col) start cell, or None if no such board
+    was found within the given number of attempts.
+    '''
+    rng = np.random.default_rng(seed)
+    board = Board(settings["rows"], settings["cols"], settings["bombs"], rng=rng)
+
+    for attempt in range(attempts) :
+        if attempt :
+            board.reset()
+        # place the bombs away from a random start cell (so it opens an area when there is room)
+        start = divmod(int(rng.integers(board.grid_rows * board.grid_cols)), board.grid_cols)
+        board.placeMines(*start)
+        if isSolvable(board.copy(), start) :
+            return board.mines, start
+
+    return None
+
+########## BACKGROUND BOARD POOL ##########
+class BoardPool :
+    '''
+    Keeps a queue of verified no-guess boards for every board configuration asked for.
+    Boards are generated and verified by a background process pool, so taking one never
+    blocks the caller: pop returns None when no board is ready yet.
+    '''
+    # boards kept in preparation per board configuration
+    size = 3
+
+    def __init__(self, workers=None) :
+        '''
+        Starts the process pool. By default one core is left free for the GUI.
+        '''
+        if workers is None :
+            workers = max(1, (os.cpu_count() or 1) - 1)
+        self.workers = workers
+        self.executor = self.startExecutor()
+        # pending and finished generations keyed by (rows, cols, bombs)
+        self.queues = {}
+        # configurations no board could be generated for
+        self.failed = set()
+        # source of a fresh seed for every generation
+        self.seeds = np.random.SeedSequence()
+
+    def startExecutor(self) :
+        '''
+        Returns a new process pool.
+        '''
+        # spawned workers do not inherit the parent's Tk state
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    @staticmethod
+    def getKey(settings) :
+        '''
+        Returns the queue key of a board configuration.
+        '''
+        return settings["rows"], settings["cols"], settings["bombs"]
+
+    def fill(self, settings) :
+        '''
+        Tops up the queue of a board configuration.
+        '''
+        key = self.getKey(settings)
+        if key in self.failed :
+            return
+
+        queue = self.queues.setdefault(key, deque())
+        while len(queue) < self.size :
+            queue.append(self.submit(settings))
+
+    def submit(self, settings) :
+        '''
+        Starts generating a board in the process pool and returns its future. A pool broken by
+        a worker that died is replaced first.
+        '''
+        try :
+            return self.executor.submit(generateNoGuess, dict(settings), self.seeds.spawn(1)[0])
+        except BrokenProcessPool :
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self.startExecutor()
+            return self.executor.submit(generateNoGuess, dict(settings), self.seeds.spawn(1)[0])
+
+    def pop(self, settings) :
+        '''
+        Returns a ready (board, start cell) pair for a board configuration, or None if none is
+        ready yet. The queue is topped up either way. A generation that failed in the pool
+        (for example because its worker died) is done again here and replaced in the queue.
+        '''
+        key = self.getKey(settings)
+        queue = self.queues.get(key, deque())
+
+        prepared = None
+        for future in [future for future in queue if future.done()] :
+            queue.remove(future)
+            try :
+                result = future.result()
+            except Exception :
+                result = generateNoGuess(dict(settings), self.seeds.spawn(1)[0])
+                queue.append(self.submit(settings))
+            # the configuration is too dense to be solved without guessing
+            if result is None :
+                self.failed.add(key)
+                continue
+            mines, start = result
+            prepared = (Board.fromMines(mines), start)
+            break
+
+        self.fill(settings)
+        return prepared
+
+    def shutdown(self) :
+        '''
+        Stops the process pool without waiting for pending boards.
+        '''
+        self.executor.shutdown(wait=False, cancel_futures=True)
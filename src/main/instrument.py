@@ -0,0 +1,260 @@
+########## IMPORTS ##########
+import bisect
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+
+########## SETTINGS ##########
+# environment variables turning the instrumentation on without main.py flags
+INSTRUMENT_ENV = "MINESWEEPER_INSTRUMENT"   # "1" (summary on stderr) or a JSON report file
+PROFILE_ENV = "MINESWEEPER_PROFILE"         # cProfile stats file
+FLAMEGRAPH_ENV = "MINESWEEPER_FLAMEGRAPH"   # collapsed stacks file
+
+# game methods timed per action (the duration of the paused ones is left out of the actions
+# they run in, so a high score dialog does not count as a slow reveal)
+ACTIONS = {
+     "uncoverCell" : "reveal",
+         "addFlag" : "flag",
+      "removeFlag" : "flag",
+       "chordCell" : "chord",
+       "gameReset" : "reset",
+        "setTheme" : "theme",
+  "checkHighScore" : "high score dialog",
+  "showHighScores" : "high score dialog",
+}
+PAUSED = {"high score dialog"}
+# score store methods timed as high score I/O
+SCORE_METHODS = ("keys", "count", "page", "rank", "addScore")
+
+# upper bounds of the latency histogram buckets in milliseconds (the last one is open)
+BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+# interval of the event loop heartbeat and of the stack samples in milliseconds
+HEARTBEAT_MS = 50
+SAMPLE_MS = 5
+
+########## TK OPERATIONS ##########
+class CountingTk :
+    '''
+    Wraps the Tcl interpreter of a Tk root and counts every Tcl command the widgets run
+    (by widget subcommand, e.g. "configure", or by command, e.g. "label" or "image").
+    Widgets created afterwards share the wrapper through their master.
+    '''
+    def __init__(self, tk) :
+        self.tk = tk
+        self.operations = Counter()
+
+    def call(self, *args) :
+        '''
+        Counts and runs a Tcl command.
+        '''
+        command = args[0] if len(args) == 1 and isinstance(args[0], tuple) else args
+        if command :
+            name = str(command[0])
+            # widget commands are named after the widget path
+            if name.startswith(".") and len(command) > 1 :
+                name = str(command[1])
+            self.operations[name] += 1
+        return self.tk.call(*args)
+
+    def __getattr__(self, name) :
+        return getattr(self.tk, name)
+
+########## FLAMEGRAPH SAMPLER ##########
+class StackSampler :
+    '''
+    Samples the stack of the main thread from a background thread and counts the samples
+    by stack, in the collapsed format flamegraph.pl and speedscope read.
+    '''
+    def __init__(self, interval=SAMPLE_MS) :
+        self.interval = interval / 1000
+        self.stacks = Counter()
+        self.thread_id = threading.main_thread().ident
+        self.running = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) :
+        '''
+        Starts sampling in a daemon thread.
+        '''
+        self.running = True
+        self.thread.start()
+
+    def stop(self) :
+        '''
+        Stops sampling.
+        '''
+        self.running = False
+        self.thread.join()
+
+    def run(self) :
+        '''
+        Sampling loop: records the main thread's stack (outermost frame first) every interval.
+        '''
+        while self.running :
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None :
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack :
+                self.stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def save(self, path) :
+        '''
+        Writes the collapsed stacks ("frame;frame;frame count" lines).
+        '''
+        with open(path, 'w') as file :
+            for stack, count in self.stacks.most_common() :
+                file.write(f"{stack} {count}\n")
+
+########## INSTRUMENTATION ##########
+class Instrumentation :
+    '''
+    Opt-in measures of a game session: latency of every player action and of the high score
+    I/O, Tcl commands run by the widgets, how long the event loop stays blocked, and optionally
+    a cProfile dump or sampled flamegraph stacks. The game code has no measuring hooks: the
+    methods are only wrapped once this is attached, so a normal game pays no cost.
+    '''
+    def __init__(self, root, profile=None, flamegraph=None) :
+        '''
+        Starts measuring on a Tk root (before the game creates its widgets).
+        '''
+        self.root = root
+        # latency samples in milliseconds by action
+        self.samples = {}
+        # time left out of the running actions (one running total per action in progress)
+        self.excluded = []
+        # event loop stalls: heartbeat delays beyond their interval, in milliseconds
+        self.stalls = array('d')
+        self.heartbeat = None
+
+        self.tk = CountingTk(root.tk)
+        root.tk = self.tk
+
+        self.profile_file = profile
+        self.profiler = None
+        if profile :
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.flamegraph_file = flamegraph
+        self.sampler = None
+        if flamegraph :
+            self.sampler = StackSampler()
+            self.sampler.start()
+
+        self.beat(time.perf_counter())
+
+    def record(self, action, milliseconds) :
+        '''
+        Adds a latency sample to an action.
+        '''
+        self.samples.setdefault(action, array('d')).append(milliseconds)
+
+    def timed(self, action, method) :
+        '''
+        Returns a method wrapped to record its latency under an action.
+        '''
+        paused = action in PAUSED
+
+        def wrapper(*args, **kwargs) :
+            self.excluded.append(0.0)
+            start = time.perf_counter()
+            try :
+                return method(*args, **kwargs)
+            finally :
+                elapsed = (time.perf_counter() - start) * 1000
+                excluded = self.excluded.pop()
+                self.record(action, elapsed - excluded)
+                # leave this call out of the actions it ran in (or only what it left out itself)
+                if self.excluded :
+                    self.excluded[-1] += elapsed if paused else excluded
+
+        return wrapper
+
+    def attach(self, game_class, score_stores) :
+        '''
+        Times the player actions of the game class and the high score I/O of the score store
+        classes. Call it before the game is created, so every widget binding uses the timed methods.
+        '''
+        for name, action in ACTIONS.items() :
+            setattr(game_class, name, self.timed(action, getattr(game_class, name)))
+        for file_name, store in score_stores.values() :
+            for name in SCORE_METHODS :
+                setattr(store, name, self.timed("high score I/O", getattr(store, name)))
+
+    def beat(self, expected) :
+        '''
+        Event loop heartbeat. Records how late it runs (the time the loop was blocked).
+        '''
+        now = time.perf_counter()
+        self.stalls.append(max(0.0, (now - expected) * 1000))
+        self.heartbeat = self.root.after(HEARTBEAT_MS, self.beat, now + HEARTBEAT_MS / 1000)
+
+    ########## REPORTS ##########
+    @staticmethod
+    def summarize(samples) :
+        '''
+        Returns the statistics and the histogram of a list of milliseconds.
+        '''
+        ordered = sorted(samples)
+        histogram = [0] * (len(BUCKETS) + 1)
+        for value in ordered :
+            histogram[bisect.bisect_left(BUCKETS, value)] += 1
+        return {"count" : len(ordered), "total_ms" : round(sum(ordered), 3),
+                "p50_ms" : round(ordered[len(ordered) // 2], 3),
+                "p95_ms" : round(ordered[min(len(ordered) - 1, len(ordered) * 95 // 100)], 3),
+                "max_ms" : round(ordered[-1], 3), "histogram" : histogram}
+
+    def getReport(self) :
+        '''
+        Returns every measure as a JSON-serializable dict.
+        '''
+        return {
+            "buckets_ms" : BUCKETS,
+            "actions" : {action : self.summarize(samples) for action, samples in sorted(self.samples.items())},
+            "event_loop" : self.summarize(self.stalls) if self.stalls else None,
+            "blocked_ms" : round(sum(stall for stall in self.stalls if stall > HEARTBEAT_MS), 3),
+            "tk_operations" : dict(self.tk.operations.most_common())
+        }
+
+    def printReport(self, report, file=sys.stderr) :
+        '''
+        Prints a readable summary of a report.
+        '''
+        print("action                  count     p50 ms     p95 ms     max ms   histogram (" +
+              " ".join(f"<{bound}" for bound in BUCKETS) + " more)", file=file)
+        rows = dict(report["actions"])
+        if report["event_loop"] is not None :
+            rows["event loop delay"] = report["event_loop"]
+        for action, stats in rows.items() :
+            print(f"{action:<20} {stats['count']:>8} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+                  f"{stats['max_ms']:>10.3f}   {' '.join(map(str, stats['histogram']))}", file=file)
+        print(f"event loop blocked for {report['blocked_ms']:.1f} ms in total (stalls over {HEARTBEAT_MS} ms)", file=file)
+        print(f"{sum(report['tk_operations'].values())} Tcl commands run by the widgets, most frequent: " +
+              ", ".join(f"{name} {count}" for name, count in list(report["tk_operations"].items())[:10]), file=file)
+
+    def finish(self, output=None) :
+        '''
+        Stops measuring and writes the reports: the summary on stderr (or a JSON report when
+        output is a file name), the cProfile stats and the flamegraph stacks.
+        '''
+        if self.profiler is not None :
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_file)
+        if self.sampler is not None :
+            self.sampler.stop()
+            self.sampler.save(self.flamegraph_file)
+
+        report = self.getReport()
+        if output and output != "1" :
+            with open(output, 'w') as file :
+                json.dump(report, file, indent=2)
+        else :
+            self.printReport(report)
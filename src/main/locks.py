@@ -0,0 +1,29 @@
+########## IMPORTS ##########
+from contextlib import contextmanager
+try :
+    import fcntl
+except ImportError : # Windows
+    fcntl = None
+    import msvcrt
+
+########## FILE LOCKS ##########
+@contextmanager
+def locked(path) :
+    '''
+    Holds an exclusive lock on a lock file (created if needed), shared by every process
+    locking the same path.
+    '''
+    with open(path, 'a+') as lock :
+        if fcntl is not None :
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        else :
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try :
+            yield
+        finally :
+            if fcntl is not None :
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+            else :
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
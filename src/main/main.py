@@ -1,16 +1,87 @@
 ########## IMPORTS ##########
+import time
+# start of the startup measures (the game modules are imported afterwards)
+START = time.perf_counter()
+import argparse
+import os
+import sys
 from tkinter import Tk
+from instrument import Instrumentation, INSTRUMENT_ENV, PROFILE_ENV, FLAMEGRAPH_ENV
 from minesweeper import Minesweeper
+from renderers import RENDERERS
+from scores import SCORE_STORES
 ########## MAIN FUNCTION ##########
 def main() :
+    # parse command line options
+    parser = argparse.ArgumentParser(description="Minesweeper")
+    parser.add_argument("--renderer", choices=sorted(RENDERERS), default="labels",
+                        help="draw the mine field with label widgets (default) or a single canvas")
+    parser.add_argument("--scores", choices=sorted(SCORE_STORES), default="json",
+                        help="keep high scores in a JSON file (default) or a SQLite database")
+    parser.add_argument("--scale", type=float,
+                        help="scale images by this HiDPI factor (detected from the screen by default)")
+    parser.add_argument("--seed", type=int,
+                        help="session seed: the boards of every game are drawn from it, so the same seed deals the same boards")
+    parser.add_argument("--instrument", nargs="?", const="1", default=os.environ.get(INSTRUMENT_ENV),
+                        help="measure action latencies, Tk operations and event loop stalls, and print them on exit "
+                             f"(or write them to the given JSON file; also set by {INSTRUMENT_ENV})")
+    parser.add_argument("--profile", default=os.environ.get(PROFILE_ENV),
+                        help=f"write cProfile stats to this file on exit (also set by {PROFILE_ENV})")
+    parser.add_argument("--flamegraph", default=os.environ.get(FLAMEGRAPH_ENV),
+                        help=f"write sampled stacks in the collapsed flamegraph format to this file on exit (also set by {FLAMEGRAPH_ENV})")
+    parser.add_argument("--startup", action="store_true",
+                        help="print the milliseconds until the window is first painted and until the board is ready, then quit")
+    parser.add_argument("--startup-target", type=float,
+                        help="with --startup, exit with an error if the first paint takes longer than this many milliseconds")
+    args = parser.parse_args()
+
     # create window
     root = Tk()
+    # opt-in measures (started before the widgets are created so their Tk operations are counted)
+    instrumentation = None
+    if args.instrument or args.profile or args.flamegraph :
+        instrumentation = Instrumentation(root, profile=args.profile, flamegraph=args.flamegraph)
+        instrumentation.attach(Minesweeper, SCORE_STORES)
     # create game instance
-    game = Minesweeper(root)
+    game = Minesweeper(root, renderer=args.renderer, scores=args.scores, scale=args.scale, seed=args.seed)
     # make window non-resizeable
     root.resizable(False, False)
+    # measure the startup instead of playing
+    startup = {}
+    if args.startup :
+        def onPaint(event) :
+            startup.setdefault("first_paint_ms", (time.perf_counter() - START) * 1000)
+
+        def onReady(event) :
+            startup["ready_ms"] = (time.perf_counter() - START) * 1000
+            root.quit()
+
+        # every widget of the window shares the root's bindings
+        root.bind(sequence="<Expose>", func=onPaint, add="+")
+        root.bind(sequence="<<GameReady>>", func=onReady)
     # run game
     root.mainloop()
+    # stop background work
+    game.shutdown()
+    # report the measures
+    if instrumentation is not None :
+        instrumentation.finish(args.instrument)
+    if args.startup :
+        reportStartup(startup, args.startup_target)
+
+def reportStartup(startup, target=None) :
+    '''
+    Prints the startup measures, and exits with an error if the first paint missed the target.
+    '''
+    if "ready_ms" not in startup :
+        print("the window was closed before the board was ready", file=sys.stderr)
+        sys.exit(1)
+    # the board is built without a paint when the window is never shown
+    first_paint = startup.get("first_paint_ms", startup["ready_ms"])
+    print(f"first paint {first_paint:.1f} ms, board ready {startup['ready_ms']:.1f} ms")
+    if target is not None and first_paint > target :
+        print(f"first paint over the {target:.1f} ms target", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__" :
     main()
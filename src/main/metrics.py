@@ -0,0 +1,122 @@
+import numpy as np
+from board import countNeighbours
+
+########## OPENING LABELLING ##########
+def labelOpenings(zeros) :
+    '''
+    Labels the openings (8-connected regions of 0s) of a boolean mask of 0 cells, or of every
+    mask of a (boards, rows, cols) stack (regions never cross from one board to the next).
+    Returns an int array of the mask's shape holding, on every 0 cell, the flat index of the
+    first cell of its opening (-1 elsewhere), and the number of openings of every board.
+
+    Array-based union-find: each round hooks the root of every edge between two 0s onto the
+    smaller of its two roots, then compresses all paths by pointer jumping, until no edge
+    joins two different roots (a few rounds, each a handful of whole-array operations).
+    '''
+    stack = zeros.reshape((-1,) + zeros.shape[-2:])
+    boards, rows, cols = stack.shape
+    index = np.arange(stack.size).reshape(stack.shape)
+
+    # edges between neighbouring 0s (right, down, down-right and down-left neighbours)
+    neighbours = [(np.s_[:, :, :-1], np.s_[:, :, 1:]), (np.s_[:, :-1, :], np.s_[:, 1:, :]),
+                  (np.s_[:, :-1, :-1], np.s_[:, 1:, 1:]), (np.s_[:, :-1, 1:], np.s_[:, 1:, :-1])]
+    first, second = [], []
+    for a, b in neighbours :
+        joined = stack[a] & stack[b]
+        first.append(index[a][joined])
+        second.append(index[b][joined])
+    first, second = np.concatenate(first), np.concatenate(second)
+
+    parent = np.arange(stack.size)
+    while first.size :
+        roots_first, roots_second = parent[first], parent[second]
+        # edges inside an opening already joined are done with
+        apart = roots_first != roots_second
+        first, second = first[apart], second[apart]
+        roots_first, roots_second = roots_first[apart], roots_second[apart]
+        if not first.size :
+            break
+        # the larger root of every edge hooks onto the smallest root it is joined to
+        np.minimum.at(parent, np.maximum(roots_first, roots_second), np.minimum(roots_first, roots_second))
+        # point every cell straight at its root
+        while True :
+            grand = parent[parent]
+            if np.array_equal(grand, parent) :
+                break
+            parent = grand
+
+    flat = stack.reshape(-1)
+    labels = np.where(flat, parent, -1)
+    # an opening is counted on its root (the one cell that is its own parent)
+    roots = flat & (parent == np.arange(stack.size))
+    counts = np.count_nonzero(roots.reshape(boards, -1), axis=1)
+
+    return labels.reshape(zeros.shape), counts if zeros.ndim == 3 else int(counts[0])
+
+def countOpenings(zeros) :
+    '''
+    Returns the number of openings (8-connected regions of 0s) in a boolean mask of 0 cells.
+    '''
+    return labelOpenings(zeros)[1]
+
+########## BOARD DIFFICULTY METRICS ##########
+def boardMetrics(mines) :
+    '''
+    Returns the difficulty metrics of a mine field, or of every mine field of a
+    (boards, rows, cols) stack at once (as arrays, one value per board):
+      - "openings": regions of 0s, each cleared by a single click
+      - "isolated": clues that do not border an opening, each needing its own click
+      - "3bv": the minimum number of left-clicks needed to clear the board (openings + isolated)
+    Measuring boards in stacks shares the NumPy overhead, which dominates on small boards.
+    '''
+    zeros = ~mines & (countNeighbours(mines) == 0)
+    # cells uncovered by clicking the openings
+    opened = zeros | (countNeighbours(zeros) > 0)
+    isolated = np.count_nonzero(~mines & ~opened, axis=(-2, -1))
+    openings = countOpenings(zeros)
+    if mines.ndim == 2 :
+        isolated = int(isolated)
+
+    return {"3bv" : openings + isolated, "openings" : openings, "isolated" : isolated}
+
+def boardValue(mines) :
+    '''
+    Returns the 3BV of a mine field: the minimum number of left-clicks needed to clear it
+    (one per opening plus one per clue that does not border an opening).
+    '''
+    return boardMetrics(mines)["3bv"]
+
+def playerSpeed(value, clicks, milliseconds) :
+    '''
+    Returns the speed of a finished game: 3BV and clicks per second, and the efficiency (3BV
+    per click, 1.0 when no click was wasted). Values that cannot be measured are None.
+    '''
+    seconds = milliseconds / 1000
+    return {"3bv_per_second" : value / seconds if seconds > 0 else None,
+            "clicks_per_second" : clicks / seconds if seconds > 0 else None,
+            "efficiency" : value / clicks if clicks else None}
+
+class MetricsCache :
+    '''
+    Metrics of the boards measured lately, keyed by their bomb layout. A board is fully
+    determined by its seed, so a board dealt again from the same seed (or watched again
+    in a replay) is never measured twice.
+    '''
+    def __init__(self, size=256) :
+        '''
+        Keeps the metrics of up to size boards (the oldest are dropped first).
+        '''
+        self.size = size
+        # metrics keyed by (shape, packed bomb mask)
+        self.metrics = {}
+
+    def get(self, mines) :
+        '''
+        Returns the metrics of a mine field (see boardMetrics).
+        '''
+        key = (mines.shape, np.packbits(mines, axis=None).tobytes())
+        if key not in self.metrics :
+            if len(self.metrics) >= self.size :
+                del self.metrics[next(iter(self.metrics))]
+            self.metrics[key] = boardMetrics(mines)
+        return self.metrics[key]
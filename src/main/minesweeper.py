@@ -1,23 +1,35 @@
 import tkinter as tk
 from tkinter.font import Font
-from tkinter import simpledialog
 from tkinter import messagebox
-from PIL import Image
-from PIL import ImageTk
-import json
 import os
+import random
 import sys
-import numpy as np
-from datetime import datetime
+from assets import ImageCache
+from clock import GameClock
+from difficulty import DIFFICULTIES, getSettings, scoreKey, scoreTitle
+from renderers import RENDERERS
+from scores import SCORE_STORES
+from themes import loadThemes, buildPalette
+# the modules that need numpy, PIL or multiprocessing (board, replay, solver, generator, metrics,
+# archive) and the dialogs are imported where they are first used, after the window is painted
+
+# milliseconds after which the board is built even if the window was never shown
+LOAD_TIMEOUT = 1000
 
 class Minesweeper :
-    def __init__(self, master=None) :
+    def __init__(self, master=None, renderer="labels", scores="json", scale=None, seed=None) :
         '''
         Main method. Initializes the game with the default settings.
+        The mine field is drawn with the chosen renderer ("labels" or "canvas"), high scores
+        are kept in the chosen store ("json" or "sqlite"), images are scaled by the given
+        HiDPI factor (detected from the screen by default) and the seed of every game is drawn
+        from the given session seed (a random one by default).
         '''
         # SET DEFAULT ATTRIBUTE SETTINGS #
         # gui root
         self.master = master
+        # board and images loaded (see loadGame)
+        self.loaded = False
         # game status (default -> False)
         self.won = False
         # game difficulty (default -> beginner)
@@ -27,24 +39,46 @@ class Minesweeper :
         self.grid_cols = 9
         # number of bombs on the grid (default -> 10)
         self.bomb_count = 10
-        # root geometry (default -> 330x405)
-        self.gmtry = "330x405"
-        # dark mode setting (default -> False)
-        self.dark_mode = False
+        # color theme (default -> light)
+        self.theme_name = "light"
+        # probability heatmap setting (default -> False)
+        self.show_heatmap = False
+        # no guessing setting (default -> False)
+        self.no_guess = False
+        # source of the seed of every new board (the same session seed deals the same boards)
+        self.seeds = random.Random(seed)
 
         # TRACK GAME PROGRESS #
-        # array of uncovered grid cells
-        self.uncovered = []
-        # array of placed bomb coordinates
-        self.bomb_locations = []
-        # number of placed flags
-        self.flag_placements = 0
-        # initialize counter (without starting it)
-        self.counter = None
+        # game clock (started by the first action, measured in milliseconds)
+        self.clock = GameClock()
+        # pending refresh of the timer display (None when the clock is not shown running)
+        self.timer_tick = None
 
         # HANDLE HIGH SCORES #
-        self.high_scores_file = os.path.join(os.path.dirname(__file__), '..', 'resources', 'highscores.json')
-        self.high_scores = self.getHighScores()
+        file_name, self.score_store_class = SCORE_STORES[scores]
+        self.high_scores_file = os.path.join(os.path.dirname(__file__), '..', 'resources', file_name)
+        # opened with the scores dialog or the first win (see getScoreStore)
+        self.score_store = None
+        # leaderboard places that ask for the player's name
+        self.top_scores = 10
+        # scores shown per leaderboard page
+        self.scores_page_size = 15
+        # name recorded with scores outside of the top places
+        self.player_name = "Player"
+
+        # HANDLE REPLAYS #
+        self.replays_file = os.path.join(os.path.dirname(__file__), '..', 'resources', 'replays.bin')
+        # playback speed multiplier (default -> real time)
+        self.replay_speed = 1.0
+        # pending playback step (None when no replay is playing)
+        self.playback = None
+
+        # HANDLE GAME RECORDS #
+        # difficulty metrics of the boards played (created when the first game ends, see getBoardMetrics)
+        self.metrics_cache = None
+        self.archive_dir = os.path.join(os.path.dirname(__file__), '..', 'resources', 'archive')
+        # opened when the first game ends (see archiveGame)
+        self.archive = None
 
         # HASHMAPS #
         # Add dark mode color schemes
@@ -55,6 +89,8 @@ class Minesweeper :
               "bg_cell_uncovered" : "gray",
          "bg_bomb_cell_uncovered" : "red",
                     "bg_bomb_win" : "green",
+                   "bg_hint_safe" : "palegreen",
+                   "bg_hint_mine" : "lightcoral",
                      "bg_counter" : "black",
                      "fg_counter" : "red",
                       "bg_button" : "darkgray",
@@ -82,6 +118,8 @@ class Minesweeper :
               "bg_cell_uncovered" : "#505050",
          "bg_bomb_cell_uncovered" : "tomato",
                     "bg_bomb_win" : "limegreen",
+                   "bg_hint_safe" : "#3c6e3c",
+                   "bg_hint_mine" : "#7a3b3b",
                      "bg_counter" : "#1a1a1a",
                      "fg_counter" : "#00ff00",
                       "bg_button" : "#404040",
@@ -101,6 +139,15 @@ class Minesweeper :
                               "8" : "whitesmoke"
         }
 
+        # built-in color schemes and the user themes (JSON files in resources/themes)
+        self.themes = {"light" : self.light_theme, "dark" : self.dark_theme}
+        try :
+            self.themes = loadThemes(self.themes)
+        except (OSError, ValueError) as e :
+            messagebox.showerror("Error", f"Unable to load themes: {e}")
+        # cell colors of every theme used (see themes.buildPalette)
+        self.palettes = {}
+
         self.font_dict = {
             "counter" : Font(self.master, family='OCR A Extended', name='OCR A Extended', size=17, weight='bold'),
                "cell" : Font(self.master, size=15),
@@ -108,18 +155,29 @@ class Minesweeper :
              "scores" : Font(self.master, size=10)
         }
 
-        self.img_dict = {
-            "default" : "smile.png",
-               "lose" : "lose.png"
-        }
+        # reset button faces (decoded and resized once the window is painted, see assets.FACES)
+        self.images = ImageCache(self.master, scale=scale)
+        # face shown on the reset button
+        self.face = "default"
+        # whether the window title shows the speed of the last game
+        self.speed_shown = False
 
         # BUILD GAME #
-        # create grid of integers
-        self.grid = self.buildGrid()
+        # headless board (mine field and game progress), built once the window is painted (see loadGame)
+        self.board = None
+        # hint solver (created on the first hint or heatmap of a game)
+        self.solver = None
+        # recorder of the current game (None once it is saved or while a replay plays)
+        self.recorder = None
+        # background generator of no-guess boards (started with the no guessing mode)
+        self.board_pool = None
+        # mine field renderer
+        self.renderer = RENDERERS[renderer](self)
+        # root geometry (computed from the renderer's cell size)
+        self.gmtry = self.getGeometry()
 
         # build window
         self.buildWindow()
-        self.buildCovers()
 
     ########## BASIC WINDOW SETUP ##########
     def buildWindow(self) :
@@ -142,11 +200,40 @@ class Minesweeper :
         # create and add menu
         self.buildMenu()
 
+        # build the board once the first frame is on screen (or after a timeout if it never shows)
+        self.paint_binding = self.main_frame.bind(sequence="<Expose>", func=self.onFirstPaint)
+        self.master.after(LOAD_TIMEOUT, self.loadGame)
+
+    def onFirstPaint(self, event) :
+        '''
+        Expose binding for the main frame. Loads the game once the window has been drawn.
+        '''
+        self.main_frame.unbind("<Expose>", self.paint_binding)
+        # after the redraws of the other widgets, which are pending as well
+        self.master.after_idle(self.loadGame)
+
+    def loadGame(self) :
+        '''
+        Loads what the first frame does not need: the board, its cell covers and the reset button
+        faces. Runs once, then generates the <<GameReady>> virtual event on the root.
+        '''
+        if self.loaded :
+            return
+        self.loaded = True
+        # finish drawing the window before the heavy modules are imported
+        self.master.update_idletasks()
+
+        # a reset on the way (e.g. a difficulty chosen meanwhile) has built the board already
+        if self.board is None :
+            self.gameReset()
+        self.images.preload(self.getTheme()["bg_button"])
+        self.master.event_generate("<<GameReady>>")
+
     def buildInfoFrame(self) :
         '''
         Creates the frame for the reset button, timer, and flag counter.
         '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
+        theme = self.getTheme()
         
         # add info frame to main frame
         self.info_frame = tk.Frame(master=self.main_frame, relief="ridge", borderwidth=7, pady=5, bg=theme["bg_frame"])
@@ -166,262 +253,149 @@ class Minesweeper :
         self.timer.pack_propagate(False) # non-resizeable
         self.timer.pack()
 
-        # add reset button to info frame
-        img = self.getButtonImage()
-        self.reset_button = tk.Button(master=self.info_frame, image=img, bd=1, bg=theme["bg_button"], command=self.gameReset)
-        self.reset_button.image = img # prevent garbage collection of image
+        # add reset button to info frame (blank until the faces are loaded)
+        self.reset_button = tk.Button(master=self.info_frame, image=self.images.getPlaceholder(), bd=1, bg=theme["bg_button"],
+                                      activebackground=theme["bg_button"], command=self.gameReset)
         self.reset_button.pack()
+        # pressed face while the button is held down
+        self.reset_button.bind(sequence="<ButtonPress-1>", func=lambda event : self.pressFace("pressed"))
+        self.reset_button.bind(sequence="<ButtonRelease-1>", func=self.releaseFace)
 
     def buildGridFrame(self) :
         '''
         Creates the frame for the mine field.
         '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
+        theme = self.getTheme()
         
         # add grid frame to main frame
         frame_height = abs(self.main_frame.winfo_screenmmheight() - self.info_frame.winfo_screenheight()) # fill space not occupied by button_frame
         self.grid_frame = tk.Frame(master=self.main_frame, relief="ridge", borderwidth=7, height=frame_height, padx=5, pady=5, bg=theme["bg_frame"])
         self.grid_frame.pack(fill='both', anchor='s', expand=True)
+        # the grid covers are added with the board (see loadGame)
 
-        # add grid covers to grid frame
-        self.buildCovers()
-    
-    ########## MINEFIELD SETUP AND BINDINGS ##########
-    def buildCovers(self) :
-        '''
-        Creates the cell covers for the mine field.
-        '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
-        
-        for r in range(self.grid_rows) :
-            for c in range(self.grid_cols) :
-                # retrieve contents from integer grid
-                content = self.grid[r][c]
-                # use label for proper left- and right-click bindings
-                cell = tk.Label(master=self.grid_frame, name=f"[{r},{c}]", width=2, height=1, 
-                             relief="raised", borderwidth=4, highlightbackground="dimgray", 
-                             highlightthickness=1, bg=theme["bg_cell"])
-                if content == 0 :
-                    cell.config(text=content, font=self.font_dict["cell"], fg=theme["bg_cell"])
-                # configure text based on content (color blends with background until left-clicked)
-                elif content > 0 :
-                    cell.config(text=content, font=self.font_dict["cell"], fg=theme["bg_cell"])
-                # set bomb unicode character
-                else :
-                    cell.config(text=u"\U0001F4A3", font=self.font_dict["cell"], fg=theme["bg_cell"])
-
-                # make cell non-resizeable
-                cell.grid_propagate(False)
-                # place cell in grid (no padding between cells)
-                cell.grid(row=r, column=c)
-
-                # bind left-click
-                cell.bind(sequence="<Button-1>", func=self.uncoverCell)
-                # bind right-click
-                cell.bind(sequence="<Button-3>", func=self.addFlag)
-
-                # add flag container as a child widget
-                self.buildFlag(r, c)
-
-    def buildFlag(self, row, col) :
-        '''
-        Creates the flag labels.
-        '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
-        
-        # create flag label with flag unicode character
-        flag = tk.Label(master=self.grid_frame, text=u"\U0001F3F2", font=self.font_dict["bomb"], 
-                    fg="crimson", width=2, height=1, padx=0, pady=0, relief="flat", bg=theme["bg_cell"])
-        
-        # make label non-resizeable
-        flag.grid_propagate(False)
-        # place flag label in grid below cell
-        flag.grid(row=row, column=col)
-        flag.lower()
-
-        # bind right-click
-        flag.bind(sequence="<Button-3>", func=self.removeFlag)
-
-    def buildGrid(self) :
-        '''
-        Randomly places hidden bombs in the mine field.
-        '''
-        # initialize grid of zeros
-        grid = np.zeros(shape=(self.grid_rows, self.grid_cols), dtype=int)
-
-        # randomly place bombs
-        for bomb in range(self.bomb_count) :
-            while(True) :
-                row = np.random.randint(self.grid_rows)
-                col = np.random.randint(self.grid_cols)
-                # place the bomb if the cell is empty
-                if(grid[row][col] == 0) :
-                    grid[row][col] = -1 # signifies a bomb
-                    # append coordinates to bomb locations
-                    self.bomb_locations.append((row, col))
-                    break
-
-        # calculate number of adjacent bombs for each cell
-        for row in range(self.grid_rows) :
-            for col in range(self.grid_cols) :
-                if(grid[row][col] < 0) :
-                    grid = self.updateCounts(grid, row, col)
-
-        return grid
-    
-    def updateCounts(self, grid, row, col) :
-        '''
-        Calculates the number of neighboring cells that contain bombs.
-        '''
-        # northern cells
-        if row - 1 >= 0 :
-            # north cell
-            if grid[row - 1][col] >= 0 :
-                grid[row - 1][col] += 1
-            # north east cell
-            if (col + 1 < len(grid[0])) and grid[row - 1][col + 1] >= 0 :
-                grid[row - 1][col + 1] += 1
-            # north west cell
-            if (col - 1 >= 0) and grid[row - 1][col - 1] >= 0 :
-                grid[row - 1][col - 1] += 1
-
-        # southern cells
-        if row + 1 < len(grid) :
-            # south cell
-            if grid[row + 1][col] >= 0 :
-                grid[row + 1][col] += 1
-            # south east cell
-            if (col + 1 < len(grid[0])) and grid[row + 1][col + 1] >= 0 :
-                grid[row + 1][col + 1] += 1
-            # south west cell
-            if (col - 1 >= 0) and (grid[row + 1][col - 1] >= 0) :
-                grid[row + 1][col - 1] += 1
-    
-        # east cell
-        if (col + 1 < len(grid[0])) and (grid[row][col + 1] >= 0) :
-            grid[row][col + 1] += 1
-
-        # west cell 
-        if (col - 1 >= 0) and (grid[row][col - 1] >= 0) :
-            grid[row][col - 1] += 1
-        
-        # return the updated grid
-        return grid
+        # "oh" face while a mouse button is held down on the mine field (after the cell bindings)
+        self.master.bind(sequence="<ButtonPress-1>", func=self.onFieldPress, add="+")
+        self.master.bind(sequence="<ButtonRelease-1>", func=self.releaseFace, add="+")
     
+    ########## MINEFIELD BINDINGS ##########
     def uncoverCell(self, event=None, row=-1, col=-1) :
         '''
         Left-click binding for grid cells. Displays the contents (e.g., bomb, clue, nothing)
         '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
-        
-        # start timer on first click
-        if self.counter == None :
-            self.counter = 0 # init counter to 0
-            self.updateTimer()
+        from replay import REVEAL
+        # uncover the cell (and any surrounding 0s) on the board
+        self.recordAction(REVEAL, row, col)
+        self.showRevealed(self.board.uncoverCell(row, col))
 
-        # check if cell contains a bomb
-        if(event.widget.cget("text") == u"\U0001F4A3") :
-            # remove current coordinates from bomb locations array
-            self.bomb_locations.remove((event.widget.grid_info()['row'], event.widget.grid_info()['column']))
-            # update cell appearance
-            event.widget.configure(relief="flat", fg="black", highlightbackground="dimgray", highlightthickness=1, bg=theme["bg_bomb_cell_uncovered"])
-            # end the game
+    def chordCell(self, event=None, row=-1, col=-1) :
+        '''
+        Middle-click and double-click binding for uncovered clues. Uncovers every unflagged
+        neighbour (and any resulting open areas) once the clue's flags are all placed.
+        '''
+        from replay import CHORD
+        # the board resolves every reveal first, the mine field is then redrawn in one batch
+        self.recordAction(CHORD, row, col)
+        revealed = self.board.chordCell(row, col)
+        if revealed :
+            self.showRevealed(revealed)
+
+    def showRevealed(self, revealed) :
+        '''
+        Draws a batch of cells uncovered on the board and ends the game if needed.
+        '''
+        # clicks that uncover nothing (e.g. on a finished board) never end the game again
+        if not revealed :
+            return
+        self.renderer.drawUncovered(revealed)
+        # keep the hint solver's frontier up to date
+        if self.solver is not None :
+            self.solver.update(revealed)
+
+        # end the game if a bomb was uncovered or all non-bomb cells are uncovered
+        if self.board.lost :
             self.gameOver(win=False)
-
-        # cell does not contain a bomb
+        elif self.board.won :
+            self.gameOver(win=True)
         else :
-            # add current coordinates to uncovered cells array
-            self.uncovered.append((row, col))
-            # update text color
-            color = theme[event.widget.cget("text")]
-            event.widget.configure(relief="flat", fg=color, highlightbackground="dimgray", highlightthickness=1, bg=theme["bg_cell_uncovered"])
-            # disable function bindings
-            event.widget.unbind(sequence="<Button 1>")
-            event.widget.unbind(sequence="<Button 3>")
-
-            # if cell contains a 0, uncover surrounding 0s
-            if event.widget.cget("text") == "0" :
-                # retrieve row and column of clicked cell
-                row = event.widget.grid_info()['row']
-                col = event.widget.grid_info()['column']
-                for r in range(max(0, row - 1), min(len(self.grid) - 1, row + 1) + 1) :
-                    for c in range(max(0, col - 1), min(len(self.grid) - 1, col + 1) + 1) :
-                        # do not uncover a cell that is already uncovered
-                        if (r, c) in self.uncovered :
-                            continue
-                        # simulate left-click to uncover cell
-                        self.grid_frame.nametowidget(f"[{r},{c}]").event_generate("<Button-1>")
-
-            # end game if all non-bomb cells are uncovered
-            if ((len(self.uncovered) >= (self.grid_rows * self.grid_cols) - self.bomb_count)) :
-                self.gameOver(win=True)
-
-    def addFlag(self, event) :
+            self.updateHeatmap()
+
+    def addFlag(self, event, row=-1, col=-1) :
         '''
         Right-click binding for grid cells. Plants a flag over a suspected bomb.
         '''
-        # start timer on first click
-        if self.counter == None :
-            self.counter = 0 # init counter to 0
-            self.updateTimer()
-
-        # push cell to the back (reveals flag label)
-        event.widget.lower()
-        # disable cell bindings
-        event.widget.unbind(sequence="<Button-1>")
-        event.widget.unbind(sequence="<Button-3>")
+        from replay import FLAG
+        # place flag on the board
+        self.recordAction(FLAG, row, col)
+        self.renderer.drawFlag(row, col, self.board.toggleFlag(row, col))
 
-        # increment flag count by 1
-        self.flag_placements += 1
         # update the flag count label text of there are not more flags than bombs
-        if (self.bomb_count >= self.flag_placements) :
+        if (self.bomb_count >= self.board.flag_placements) :
             self.setFlagCount()
+        self.updateHeatmap()
     
-    def removeFlag(self, event) :
+    def removeFlag(self, event, row=-1, col=-1) :
         '''
         Right-click binding for flag labels. Removes a flag from a grid cell.
         '''
-        # push flag label under cell
-        event.widget.lower()
-        # get grid coordinates
-        flag_row = event.widget.grid_info()['row']
-        flag_col = event.widget.grid_info()['column']
-        # renable bindings
-        self.grid_frame.nametowidget(f"[{flag_row},{flag_col}]").bind(sequence="<Button-1>", func=self.uncoverCell)
-        self.grid_frame.nametowidget(f"[{flag_row},{flag_col}]").bind(sequence="<Button-3>", func=self.addFlag)
-        
-        # decrement flag count
-        self.flag_placements -= 1
+        from replay import FLAG
+        # remove flag from the board
+        self.recordAction(FLAG, row, col)
+        self.renderer.drawFlag(row, col, self.board.toggleFlag(row, col))
+
         # update flag count label text if there are not more flags than bombs
-        if (self.bomb_count >= self.flag_placements) :
+        if (self.bomb_count >= self.board.flag_placements) :
             self.setFlagCount()
+        self.updateHeatmap()
 
-    def gameReset(self) :
+    def gameReset(self, board=None, start=None) :
         '''
-        Left-click binding for the reset button. Reloads the game with the chosen difficulty setting.
+        Left-click binding for the reset button. Reloads the game with the chosen difficulty setting
+        (or with the given board, opened on the given start cell if any).
         '''
+        from board import Board
+        from replay import Recorder, REVEAL
+        # stop any replay and keep the abandoned game
+        self.stopReplay()
+        self.saveReplay()
+
         # change resest button image back to default
-        img = self.getButtonImage()
-        self.reset_button.configure(image=img)
-        self.reset_button.image = img # prevent garbage collection of image
+        self.setFace("default")
+        # clear the speed of the last game (only if it is shown, resets stay one Tcl call cheaper)
+        if self.speed_shown :
+            self.master.title("Minesweeper")
+            self.speed_shown = False
 
-        # remove all cells
-        for cell in self.grid_frame.winfo_children() :
-            cell.destroy()
-        
         # reset attributes
-        self.uncovered.clear()
-        self.bomb_locations.clear()
-        self.flag_placements = 0
-        self.counter = None
+        self.clock.reset()
+        self.stopTimer()
 
         # reset info labels
         self.timer.configure(text="000")
         self.flag_count.configure(text=f"{(self.bomb_count % 1000) // 100}{(self.bomb_count % 100) // 10}{self.bomb_count % 10}")
 
-        # create new grid and cell covers
-        self.grid = self.buildGrid()
-        self.buildCovers()
+        # create new board (a prepared no-guess board if one is ready) and reset the cell covers
+        prepared = None
+        if board is not None :
+            prepared = (board, start)
+        elif self.no_guess :
+            prepared = self.board_pool.pop({"rows" : self.grid_rows, "cols" : self.grid_cols, "bombs" : self.bomb_count})
+        if prepared is not None :
+            self.board, start = prepared
+        else :
+            # every board is dealt from its own seed (see codes.encodeBoard)
+            self.board = Board(self.grid_rows, self.grid_cols, self.bomb_count, rng=self.seeds.getrandbits(63))
+        self.solver = None
+        self.recorder = Recorder(self.board)
+        self.renderer.buildCovers()
+
+        # no-guess and shared boards open on their start cell
+        if prepared is not None and start is not None :
+            # opened before the clock starts (the player's first action starts it)
+            self.recorder.record(REVEAL, *start, elapsed=0)
+            # a small board may be cleared by its start cell alone, which ends the game
+            self.showRevealed(self.board.uncoverCell(*start))
+        else :
+            self.updateHeatmap()
 
     ########## MENU BAR SETUP AND BINDINGS ##########
     def buildMenu(self) :
@@ -437,6 +411,19 @@ class Minesweeper :
 
         # add high scores pop-up to game tab
         menu_game.add_command(label='High Scores', command=self.showHighScores)
+        # add hint to game tab
+        menu_game.add_command(label='Hint', command=self.showHint)
+        # add replay of the last game to game tab
+        menu_game.add_command(label='Watch Last Game', command=self.playLastReplay)
+        # add board sharing to game tab
+        menu_game.add_command(label='Copy Board Code', command=self.copyBoardCode)
+        menu_game.add_command(label='Load Board Code...', command=self.askBoardCode)
+
+        # add replay speed menu to game tab
+        menu_speed = tk.Menu(master=menu_game, tearoff=False)
+        menu_game.add_cascade(menu=menu_speed, label='Replay Speed')
+        for speed in (0.5, 1, 2, 4, 8) :
+            menu_speed.add_radiobutton(label=f"{speed}x", command=lambda speed=speed:self.setReplaySpeed(speed))
         # add directions pop-up to game tab
         menu_game.add_command(label='Help', command=self.showDirections)
 
@@ -449,11 +436,21 @@ class Minesweeper :
         menu_options.add_cascade(menu=menu_difficulty, label='Difficulty', command=None)
 
         # add difficulty settings to difficulty submenu
-        menu_difficulty.add_radiobutton(label='Easy', command=lambda:self.setDifficulty("easy"))
-        menu_difficulty.add_radiobutton(label='Hard', command=lambda:self.setDifficulty("hard"))
-
-        # add dark mode toggle to options tab
-        menu_options.add_checkbutton(label='Dark Mode', command=self.toggleDarkMode)
+        for name in DIFFICULTIES :
+            menu_difficulty.add_radiobutton(label=name.title(), command=lambda name=name:self.setDifficulty(name))
+        menu_difficulty.add_radiobutton(label='Custom...', command=self.askCustomDifficulty)
+
+        # add theme submenu to options tab
+        menu_theme = tk.Menu(master=menu_options, tearoff=False)
+        menu_options.add_cascade(menu=menu_theme, label='Theme')
+        self.theme_var = tk.StringVar(master=self.master, value=self.theme_name)
+        for name in self.themes :
+            menu_theme.add_radiobutton(label=name.title(), variable=self.theme_var, value=name,
+                                       command=lambda name=name : self.setTheme(name))
+        # add probability heatmap toggle to options tab
+        menu_options.add_checkbutton(label='Probability Heatmap', command=self.toggleHeatmap)
+        # add no guessing toggle to options tab
+        menu_options.add_checkbutton(label='No Guessing', command=self.toggleNoGuess)
 
         # display menu
         self.master.configure(menu=menu_bar)
@@ -463,95 +460,318 @@ class Minesweeper :
         '''
         Handles game completion for player wins and losses.
         '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
-        
-        # stop timer
-        player_time = self.counter
-        self.counter = None
+        # stop timer (the measured time, not the display, is the player's time)
+        self.clock.stop()
+        self.stopTimer()
+        elapsed = self.clock.getElapsed()
+        player_time = None if elapsed is None else elapsed / 1000
+        # keep the finished game and its record (replays that are watched are not archived)
+        recorder = self.recorder
+        offset = self.saveReplay()
+        value = None
+        if recorder is not None :
+            value = self.getBoardMetrics()["3bv"]
+            self.archiveGame(recorder, win, offset, value)
+            self.showSpeed(win, value, len(recorder.actions), elapsed or 0)
         # unbind all cells
-        for cell in self.grid_frame.winfo_children() :
-            try :
-                cell.unbind("<Button-1>")
-                cell.unbind("<Button-3>")
-            except tk.TclError:
-                pass
-        
+        self.renderer.disable()
+        # remove the probability heatmap
+        self.renderer.clearProbabilities()
+        # display all bomb locations
+        self.renderer.showBombs(win)
+
         # player won
         if win :
-            for coord in self.bomb_locations :
-                self.grid_frame.nametowidget(f"[{coord[0]},{coord[1]}]").configure(relief="flat", fg="black", highlightbackground="dimgray", highlightthickness=1, bg=theme["bg_bomb_win"])
-                self.grid_frame.nametowidget(f"[{coord[0]},{coord[1]}]").tkraise()
-            
-            # Check for high score
+            self.setFace("win")
+            # Check for high score (a game won by its pre-opened start cell was never timed)
             if player_time is not None:
-                self.checkHighScore(player_time)
+                self.checkHighScore(player_time, value)
 
         # player lost
         if not win :
             # change reset button image
-            img = self.getButtonImage("lose")
-            self.reset_button.configure(image=img)
-            self.reset_button.image = img # prevent garbage collection of image
-            # display all bomb locations
-            for bomb in self.bomb_locations :
-                self.grid_frame.nametowidget(f"[{bomb[0]},{bomb[1]}]").configure(relief="flat", fg="black", highlightbackground="dimgray", highlightthickness=1, bg=theme["bg_cell_uncovered"])
-                self.grid_frame.nametowidget(f"[{bomb[0]},{bomb[1]}]").tkraise()
+            self.setFace("lose")
 
     ########## SET METHODS ##########
+    def startTimer(self) :
+        '''
+        Starts the game clock on the first action of a game, and its display.
+        '''
+        if self.clock.started is None :
+            self.clock.start()
+            self.updateTimer()
+
     def updateTimer(self) :
         '''
-        Increments the timer label text once every second.
+        Shows the seconds measured by the game clock, refreshed on every new second.
         '''
-        # check if timer should be initiated
-        if self.counter != None :
-            # iterate second counter 
-            self.counter += 1
-            # configure display
-            self.timer.configure(text=f"{(self.counter % 1000) // 100}{(self.counter % 100) // 10}{self.counter % 10}")
-            # update every second
-            self.master.after(1000, self.updateTimer)
+        self.timer_tick = None
+        if not self.clock.isRunning() :
+            return
+        elapsed = self.clock.getElapsed()
+        seconds = elapsed // 1000
+        # configure display
+        self.timer.configure(text=f"{(seconds % 1000) // 100}{(seconds % 100) // 10}{seconds % 10}")
+        # update when the next second starts (late refreshes do not add up)
+        self.timer_tick = self.master.after(1000 - elapsed % 1000, self.updateTimer)
+
+    def stopTimer(self) :
+        '''
+        Cancels the pending refresh of the timer display, if any.
+        '''
+        if self.timer_tick is not None :
+            self.master.after_cancel(self.timer_tick)
+            self.timer_tick = None
 
     def setFlagCount(self) :
         '''
         Decrements the number of remaining bombs based on the number of flag placements.
         '''
-        updated_text = self.bomb_count - self.flag_placements
+        updated_text = self.board.remainingFlags()
         self.flag_count.configure(text=f"{(updated_text % 1000) // 100}{(updated_text % 100) // 10}{updated_text % 10}")
 
-    def setDifficulty(self, selected) :
+    def setDifficulty(self, selected, rows=None, cols=None, bombs=None) :
         '''
-        Resets the game with a chosen difficulty setting.
+        Resets the game with a chosen difficulty setting. Custom boards pass their
+        dimensions and number of bombs; invalid settings raise a ValueError.
         '''
-        # easy mode settings
-        if(selected == "easy") :
-            self.difficulty = "easy"
-            self.grid_rows = 9
-            self.grid_cols = 9
-            self.bomb_count = 10
-            self.master.geometry("330x405")
-        # hard mode settings
-        else :
-            self.difficulty = "hard"
-            self.grid_rows = 16
-            self.grid_cols = 16
-            self.bomb_count = 40
-            self.master.geometry("568x650")     
+        settings = getSettings(selected, rows, cols, bombs)
+        self.setBoardSize(settings["rows"], settings["cols"], settings["bombs"])
+        self.difficulty = selected
 
         # reset the game with the new difficulty setting
         self.gameReset()
 
-    def toggleDarkMode(self):
+    def setBoardSize(self, rows, cols, bombs) :
+        '''
+        Switches to a board configuration (under its preset difficulty if it matches one) without
+        resetting the game. Raises a ValueError if the renderer cannot draw boards that large.
+        '''
+        # widget-based renderers cannot draw arbitrarily large boards
+        max_cells = self.renderer.max_cells
+        if max_cells is not None and rows * cols > max_cells :
+            raise ValueError(f"boards larger than {max_cells} cells need the canvas renderer (main.py --renderer canvas)")
+
+        key = scoreKey(rows, cols, bombs)
+        self.difficulty = key if key in DIFFICULTIES else "custom"
+        self.grid_rows = rows
+        self.grid_cols = cols
+        self.bomb_count = bombs
+        self.master.geometry(self.getGeometry())
+
+    def askCustomDifficulty(self) :
+        '''
+        Left-click binding for the 'Custom...' difficulty. Prompts for the board size and number of bombs.
+        '''
+        from tkinter import simpledialog
+        rows = simpledialog.askinteger("Custom Board", "Number of rows:", initialvalue=self.grid_rows, minvalue=1)
+        cols = simpledialog.askinteger("Custom Board", "Number of columns:", initialvalue=self.grid_cols, minvalue=1) if rows else None
+        bombs = simpledialog.askinteger("Custom Board", "Number of bombs:", initialvalue=self.bomb_count, minvalue=1) if cols else None
+        # player cancelled
+        if not bombs :
+            return
+
+        try :
+            self.setDifficulty("custom", rows, cols, bombs)
+        except ValueError as e :
+            messagebox.showerror("Error", f"Unable to create board: {e}")
+
+    def setTheme(self, name) :
         '''
-        Toggles dark mode on and off and refreshes the UI.
+        Applies one of the color themes (built-in or loaded from JSON) to the whole UI.
         '''
-        self.dark_mode = not self.dark_mode
-        self.refreshUI()
+        previous = self.theme_name
+        self.theme_name = name
+        try :
+            self.refreshUI()
+        except tk.TclError as e :
+            # a user theme with an invalid color
+            messagebox.showerror("Error", f"Unable to apply theme '{name}': {e}")
+            self.theme_name = previous
+            self.theme_var.set(previous)
+            self.refreshUI()
+
+    def toggleHeatmap(self) :
+        '''
+        Toggles the probability heatmap on and off.
+        '''
+        self.show_heatmap = not self.show_heatmap
+        if self.show_heatmap :
+            self.updateHeatmap()
+        else :
+            self.renderer.clearProbabilities()
     
+    def toggleNoGuess(self) :
+        '''
+        Toggles the no guessing mode on and off. Boards that can be solved without guessing are
+        generated in the background and used from the next game on (while none is ready, a
+        regular board is dealt).
+        '''
+        self.no_guess = not self.no_guess
+        if self.no_guess :
+            # start preparing boards for the current difficulty
+            if self.board_pool is None :
+                from generator import BoardPool
+                self.board_pool = BoardPool()
+            self.board_pool.fill({"rows" : self.grid_rows, "cols" : self.grid_cols, "bombs" : self.bomb_count})
+
+    def shutdown(self) :
+        '''
+        Stops background work once the window is closed.
+        '''
+        if self.board_pool is not None :
+            self.board_pool.shutdown()
+        # keep the game that was being played
+        self.saveReplay()
+
+    ########## SHARE BOARDS ##########
+    def copyBoardCode(self) :
+        '''
+        Left-click binding for the 'Copy Board Code' command under the 'Game' tab.
+        Copies the code of the current board (see codes.encodeBoard) to the clipboard.
+        '''
+        if self.board is None or not self.board.placed :
+            messagebox.showinfo("Copy Board Code", "The bombs are placed on the first click: uncover a cell first.")
+            return
+        from codes import encodeBoard
+        code = encodeBoard(self.board)
+
+        self.master.clipboard_clear()
+        self.master.clipboard_append(code)
+        # codes of large boards are too long to be read
+        shown = code if len(code) <= 120 else f"({len(code)} characters)"
+        messagebox.showinfo("Copy Board Code", f"The board code was copied to the clipboard:\n\n{shown}")
+
+    def askBoardCode(self) :
+        '''
+        Left-click binding for the 'Load Board Code...' command under the 'Game' tab.
+        Prompts for a board code and starts a game on its board.
+        '''
+        from tkinter import simpledialog
+        from codes import decodeBoard
+        code = simpledialog.askstring("Load Board Code", "Board code:")
+        # player cancelled
+        if not code :
+            return
+
+        try :
+            board, start = decodeBoard(code)
+            self.setBoardSize(board.grid_rows, board.grid_cols, board.bomb_count)
+        except ValueError as e :
+            messagebox.showerror("Error", f"Unable to load board: {e}")
+            return
+        self.gameReset(board=board, start=start)
+
+    ########## RECORD AND PLAY BACK GAMES ##########
+    def recordAction(self, action, row, col) :
+        '''
+        Records a player action in the current game's replay. The first action of a game
+        starts the game clock, which timestamps every action.
+        '''
+        self.startTimer()
+        if self.recorder is not None :
+            self.recorder.record(action, row, col, self.clock.getElapsed())
+
+    def saveReplay(self) :
+        '''
+        Appends the current game to the replay file (once). Returns its offset in the file,
+        or None if it was not saved.
+        '''
+        if self.recorder is None :
+            return None
+        recorder, self.recorder = self.recorder, None
+        try :
+            return recorder.save(self.replays_file)
+        except OSError as e :
+            messagebox.showerror("Error", f"Unable to save replay: {e}")
+            return None
+
+    def archiveGame(self, recorder, win, offset, value) :
+        '''
+        Adds a finished game (and the 3BV of its board) to the archive of game records, timed by the game clock.
+        '''
+        try :
+            if self.archive is None :
+                from archive import Archive
+                self.archive = Archive(self.archive_dir)
+            self.archive.append(self.grid_rows, self.grid_cols, self.bomb_count, time=self.clock.getElapsed() or 0,
+                                won=win, value=value, clicks=len(recorder.actions),
+                                replay=-1 if offset is None else offset)
+        except OSError as e :
+            messagebox.showerror("Error", f"Unable to archive game: {e}")
+
+    def setReplaySpeed(self, speed) :
+        '''
+        Sets the playback speed multiplier of replays.
+        '''
+        self.replay_speed = speed
+
+    def playLastReplay(self) :
+        '''
+        Left-click binding for the 'Watch Last Game' command under the 'Game' tab.
+        Plays the last recorded game back on the mine field.
+        '''
+        from replay import readReplays
+        # the game being played is saved first, so it can be watched right away
+        self.saveReplay()
+        try :
+            replays = readReplays(self.replays_file)
+        except (OSError, ValueError) as e :
+            messagebox.showerror("Error", f"Unable to load replays: {e}")
+            return
+        if not replays :
+            messagebox.showinfo("Watch Last Game", "There is no recorded game yet.")
+            return
+        replay = replays[-1]
+
+        # switch to the recorded board size
+        rows, cols = replay.mines.shape
+        try :
+            self.setBoardSize(rows, cols, int(replay.mines.sum()))
+        except ValueError as e :
+            messagebox.showerror("Error", f"Unable to play the last game: {e}")
+            return
+
+        # replays are watched, not played or recorded
+        self.gameReset(board=replay.newBoard())
+        self.recorder = None
+        self.renderer.disable()
+        # games saved without any action only show their board
+        if len(replay.actions) :
+            self.stepReplay(replay.actions.tolist(), 0)
+
+    def stepReplay(self, actions, index) :
+        '''
+        Plays one action of a replay and schedules the next one at the replay speed.
+        '''
+        from replay import applyAction, FLAG
+        self.playback = None
+        action, row, col, timestamp = actions[index]
+
+        revealed = applyAction(self.board, action, row, col)
+        if action == FLAG :
+            self.renderer.drawFlag(row, col, self.board.isFlagged(row, col))
+            self.setFlagCount()
+        elif revealed :
+            self.showRevealed(revealed)
+
+        if index + 1 < len(actions) and not self.board.isOver() :
+            delay = (actions[index + 1][3] - timestamp) / self.replay_speed
+            self.playback = self.master.after(max(1, int(delay)), self.stepReplay, actions, index + 1)
+
+    def stopReplay(self) :
+        '''
+        Cancels the replay being played, if any.
+        '''
+        if self.playback is not None :
+            self.master.after_cancel(self.playback)
+            self.playback = None
+
     def refreshUI(self):
         '''
         Refreshes the entire UI to apply the current theme.
         '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
+        theme = self.getTheme()
         
         # Update main window background
         self.master.configure(bg=theme["bg_main"])
@@ -565,37 +785,39 @@ class Minesweeper :
         self.flag_count.configure(fg=theme["fg_counter"], bg=theme["bg_counter"])
         self.timer_frame.configure(bg=theme["bg_counter"])
         self.timer.configure(fg=theme["fg_counter"], bg=theme["bg_counter"])
-        self.reset_button.configure(bg=theme["bg_button"])
+        self.reset_button.configure(bg=theme["bg_button"], activebackground=theme["bg_button"])
+        self.setFace(self.face)
         
         # Update grid frame
         self.grid_frame.configure(bg=theme["bg_frame"])
         
-        # Update all cells and flags
-        for child in self.grid_frame.winfo_children():
-            if child.winfo_class() == 'Label':
-                # Check if it's a cell or flag by examining its text
-                text = child.cget("text")
-                if text == u"\U0001F3F2":  # Flag
-                    child.configure(bg=theme["bg_cell"])
-                else:  # Cell
-                    # Check if cell is uncovered (has flat relief)
-                    if child.cget("relief") == "flat":
-                        child.configure(bg=theme["bg_cell_uncovered"], fg=theme[child.cget("text")])
-                    else:
-                        child.configure(bg=theme["bg_cell"])
-                        # Update hidden text color to match background
-                        if text in ["0"] or text.isdigit():
-                            child.configure(fg=theme["bg_cell"])
-                        elif text == u"\U0001F4A3":
-                            child.configure(fg=theme["bg_cell"])
+        # Update all cells and flags (the heatmap is redrawn in the new theme's colors)
+        if self.board is not None :
+            self.renderer.clearProbabilities()
+            self.renderer.refresh()
+            self.updateHeatmap()
 
     ########## GET METHODS ##########
+    def getTheme(self) :
+        '''
+        Returns the colors of the current theme.
+        '''
+        return self.themes[self.theme_name]
+
+    def getPalette(self) :
+        '''
+        Returns the cell colors of the current theme, indexed by cell style (see themes.cellStyles).
+        '''
+        if self.theme_name not in self.palettes :
+            self.palettes[self.theme_name] = buildPalette(self.getTheme())
+        return self.palettes[self.theme_name]
+
     def showDirections(self) :
         '''
         Left-click binding for the 'Help' command under the 'Game' tab.
         Displays the game rules in a child window.
         '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
+        theme = self.getTheme()
         
         # create toplevel window
         self.help_window = tk.Toplevel()
@@ -635,6 +857,7 @@ class Minesweeper :
         controls_heading = "\n\nCONTROLS\n"
         controls = u"\U0001F4A3" + "  LEFT-CLICK on a cell to uncover it\n" \
                    u"\U0001F4A3" + "  RIGHT-CLICK on a cell suspected to contain a\n      bomb to place or remove a flag\n" \
+                   u"\U0001F4A3" + "  MIDDLE-CLICK or DOUBLE-CLICK a number whose\n      bombs are all flagged to uncover the rest of\n      its neighbours\n" \
                    u"\U0001F4A3" + "  LEFT-CLICK the button between the counter and\n      timer to reset the game"
         
         # insert headings and text blocks
@@ -652,117 +875,201 @@ class Minesweeper :
         # read only
         directions_text.configure(state="disabled")
 
-    def getButtonImage(self, img_name="default") :
+    def getGeometry(self) :
+        '''
+        Returns the root geometry that fits the current grid.
+        '''
+        width, height = self.renderer.fieldSize(self.grid_rows, self.grid_cols)
+        # leave room for the frame borders and the info frame
+        return f"{max(330, width + 24)}x{height + 90}"
+
+    def getBoardMetrics(self) :
+        '''
+        Returns the difficulty metrics of the current board (see metrics.boardMetrics), measured
+        once per bomb layout.
+        '''
+        if self.metrics_cache is None :
+            from metrics import MetricsCache
+            self.metrics_cache = MetricsCache()
+        return self.metrics_cache.get(self.board.mines)
+
+    def showSpeed(self, win, value, clicks, milliseconds) :
+        '''
+        Shows the speed of a finished game in the window title: the board's 3BV, clicks per second
+        and, for a win, 3BV per second and efficiency (3BV per click).
         '''
-        Loads, resizes, and returns an image.
+        from metrics import playerSpeed
+        speed = playerSpeed(value, clicks, milliseconds)
+        parts = [f"3BV {value}"]
+        if speed["clicks_per_second"] is not None :
+            parts.append(f"{speed['clicks_per_second']:.2f} clicks/s")
+        if win and speed["3bv_per_second"] is not None :
+            parts.append(f"{speed['3bv_per_second']:.2f} 3BV/s")
+        if win and speed["efficiency"] is not None :
+            parts.append(f"efficiency {speed['efficiency']:.0%}")
+        self.master.title("Minesweeper - " + " | ".join(parts))
+        self.speed_shown = True
+
+    def getScoreKey(self) :
         '''
-        # access resource directory
-        rdir_path = os.path.join(os.path.dirname(__file__), '..', 'resources')
-        im_path = os.path.join(rdir_path, self.img_dict[img_name])
-        # access image
-        img = Image.open(im_path)
-        # resize image
-        img = img.resize(size=(31, 31))
-        # add padding
-        new_img = Image.new(mode=img.mode, size=(37, 37))
-        new_img.paste(img, box=(3, 3))
+        Returns the key the current board configuration's high scores are stored under.
+        '''
+        return scoreKey(self.grid_rows, self.grid_cols, self.bomb_count)
+
+    def showHint(self) :
+        '''
+        Left-click binding for the 'Hint' command under the 'Game' tab.
+        Highlights a cell the solver knows is safe (or, failing that, a bomb that is not flagged yet).
+        '''
+        if self.board is None or self.board.isOver() :
+            return
+
+        # the solver tracks the frontier from here on
+        if self.solver is None :
+            from solver import Solver
+            self.solver = Solver(self.board)
+        safe, mines = self.solver.findMoves()
+
+        # skip cells the player has already flagged
+        safe = [cell for cell in safe if not self.board.isFlagged(*cell)]
+        mines = [cell for cell in mines if not self.board.isFlagged(*cell)]
+        if safe :
+            self.renderer.drawHint(*safe[0], mine=False)
+        elif mines :
+            self.renderer.drawHint(*mines[0], mine=True)
+        else :
+            messagebox.showinfo("Hint", "There is no certain move left. You will have to guess!")
+
+    def updateHeatmap(self) :
+        '''
+        Overlays every covered cell's exact mine probability while the heatmap is shown.
+        '''
+        if not self.show_heatmap or self.board is None or self.board.isOver() :
+            return
+
+        # the solver tracks the frontier from here on
+        if self.solver is None :
+            from solver import Solver
+            self.solver = Solver(self.board)
+        self.renderer.drawProbabilities(self.solver.probabilities())
 
-        return ImageTk.PhotoImage(new_img)
+    def setFace(self, face) :
+        '''
+        Shows one of the reset button faces (see assets.FACES) in the current theme.
+        '''
+        self.face = face
+        self.pressFace(face)
+
+    def pressFace(self, face) :
+        '''
+        Mouse-down binding for the reset button. Shows a face until the mouse button is released.
+        '''
+        theme = self.getTheme()
+        # cached image (no file access or resizing on clicks)
+        self.reset_button.configure(image=self.images.getFace(face, theme["bg_button"]))
+
+    def releaseFace(self, event=None) :
+        '''
+        Mouse-up binding for the reset button and the mine field. Shows the current face again.
+        '''
+        self.pressFace(self.face)
+
+    def onFieldPress(self, event) :
+        '''
+        Mouse-down binding for the window. Shows the "oh" face while a cell is held down
+        during a game.
+        '''
+        on_field = getattr(event.widget, "master", None) is self.grid_frame and not isinstance(event.widget, tk.Scrollbar)
+        if on_field and not self.board.isOver() and self.playback is None :
+            self.pressFace("oh")
     
     ########## HANDLE HIGH SCORES ##########
-    def getHighScores(self) :
+    def getScoreStore(self) :
         '''
-        Loads the high scores json file and returns its contents. 
-        If the file does not exist, one is created.
+        Returns the high score store, opened on first use (the scores dialog or a win).
         '''
-        default_scores = {"easy": [], "hard": []}
-        
-        # load json file if it exists
-        if os.path.exists(self.high_scores_file) :
-            try :
-                with open(self.high_scores_file, 'r') as file :
-                    return json.load(file)
-            except (json.JSONDecodeError, FileNotFoundError) :
-                return default_scores
-        
-        return default_scores
-    
-    def setHighScores(self) :
+        if self.score_store is None :
+            self.score_store = self.score_store_class(self.high_scores_file)
+        return self.score_store
+
+    def setHighScore(self, key, high_score) :
         '''
-        Attempts to save high scores to a json file.
+        Attempts to save a score. Returns its rank, or None if it could not be saved.
+        The store merges it with scores other games saved meanwhile.
         '''
         try :
-            with open(self.high_scores_file, 'w') as file :
-                json.dump(self.high_scores, file, indent=2)
+            return self.getScoreStore().addScore(key, high_score)
         except Exception as e :
             messagebox.showerror("Error", f"Unable to save high scores: {e}")
+            return None
     
-    def checkHighScore(self, player_time) :
+    def checkHighScore(self, player_time, value=None) :
         '''
-        Checks if the player finished the game with a time in the top three.
+        Records the time of a won game (and the 3BV of its board) on the leaderboard of its board
+        configuration. Players are asked for their name when the time makes the top of the leaderboard.
         '''
-        current_high_scores = self.high_scores[self.difficulty]
-
-        is_high_score = False
-        # if there are fewer than 3 entries, it is automatically a high score
-        if len(current_high_scores) < 3 :
-            is_high_score = True
-        else :
-            # check if the player's time is less than the 3rd place time
-            third_place_time = max(entry['time'] for entry in current_high_scores)
-            if player_time < third_place_time :
-                is_high_score = True
+        from datetime import datetime
+        from tkinter import simpledialog
+        key = self.getScoreKey()
+        try :
+            rank = self.getScoreStore().rank(key, player_time)
+        except Exception as e :
+            messagebox.showerror("Error", f"Unable to load high scores: {e}")
+            return
 
+        username = self.player_name
+        is_high_score = rank <= self.top_scores
         if is_high_score :
             # ask player for username
             username = simpledialog.askstring(
                 "New High Score!", 
-                f"Congratulations! You achieved a high score!\nTime: {player_time} seconds\nDifficulty: {self.difficulty.title()}\n\nEnter your name:",
-                initialvalue="Player"
+                f"Congratulations! You achieved a high score (#{rank})!\nTime: {player_time:.3f} seconds\nDifficulty: {scoreTitle(key).title()}\n\nEnter your name:",
+                initialvalue=self.player_name
             )
+            # player chose not to enter their username
+            if not username :
+                return
+            self.player_name = username.strip()
+
+        # add new score to the leaderboard
+        new_high_score = {
+            'name': self.player_name,
+            'time': player_time,
+            'date': datetime.now().strftime("%Y-%m-%d"),
+            '3bv': value
+        }
+        self.setHighScore(key, new_high_score)
+
+        # display updated leaderboard
+        if is_high_score :
+            self.showHighScores(key)
 
-            # player chose to enter their username 
-            if username :
-                # add new high score
-                new_high_score = {
-                    'name': username.strip(),
-                    'time': player_time,
-                    'date': datetime.now().strftime("%Y-%m-%d")
-                }
-            
-            # add new high score to current list of high scores
-            current_high_scores.append(new_high_score)
-            # sort from highest to lowest time
-            current_high_scores.sort(key=lambda x: x['time'])
-            # keep smallest 3 times
-            self.high_scores[self.difficulty] = current_high_scores[:3]
-
-            # update json file with new high scores
-            self.setHighScores()
-
-            # display updated high scores list
-            self.showHighScores()
-
-    def showHighScores(self) :
-        '''
-        Displays the top 3 high scores (best times) for both game difficulties 
-        in a custom message box.
-        '''
-        theme = self.dark_theme if self.dark_mode else self.light_theme
+    def showHighScores(self, key=None) :
+        '''
+        Displays the leaderboard (best times, with the 3BV of their boards and 3BV per second) of a board
+        configuration, the current one by default. Every preset difficulty and custom board played can be
+        selected, scores can be filtered by player, and only one page of scores is loaded and shown at a time.
+        '''
+        theme = self.getTheme()
         
         # create toplevel window
         self.high_scores_display = tk.Toplevel()
         self.high_scores_display.title("")
         self.high_scores_display.grab_set() # prevent interaction with main window when open
         # set dimensions
-        self.high_scores_display.geometry("250x300")
+        self.high_scores_display.geometry("440x420")
         # set background color
         self.high_scores_display.configure(bg=theme["bg_frame"])
 
         # create title frame
         title_frame = tk.Frame(master=self.high_scores_display, bg=theme["bg_frame"], padx=5, pady=5,
                                relief="ridge", borderwidth=7)
-        title_frame.pack(fill="both", expand=True)
+        title_frame.pack(fill="both")
+
+        # create selection frame
+        selection_frame = tk.Frame(master=self.high_scores_display, bg=theme["bg_frame"], padx=5, pady=5,
+                                   relief="ridge", borderwidth=7)
+        selection_frame.pack(fill="both")
 
         # create scores frame
         scores_frame = tk.Frame(master=self.high_scores_display, bg=theme["bg_frame"], padx=5, pady=5,
@@ -771,34 +1078,92 @@ class Minesweeper :
         # create title label
         title_label = tk.Label(master=title_frame, text="HIGH SCORES", font=self.font_dict["counter"],
                                    fg=theme["fg_counter"], bg=theme["bg_counter"], padx=3, pady=3, relief="sunken", borderwidth=5)
-        
-        # create text field for displaying high scores
-        scores_text = tk.Text(master=scores_frame, wrap="none", bg=theme["bg_scores"], relief="raised", borderwidth=4)
-        
-        title_label.pack(fill="x", expand=True)
-        scores_text.pack(fill="both", expand=True)
-
-        # customize scores text
-        for difficulty in ["easy", "hard"] :
-            scores_text.insert("end", f"\n{difficulty.upper()} MODE\n", f"{difficulty}_mode")
-            scores_text.tag_config(tagName=f"{difficulty}_mode", font=Font(size=10, weight="bold"), foreground=theme["fg_scores_text"])
+        title_label.pack(fill="x")
 
-            high_scores = self.high_scores[difficulty]
+        # board configuration selector (presets first, then every custom board played)
+        try :
+            played = self.getScoreStore().keys()
+        except Exception as e :
+            messagebox.showerror("Error", f"Unable to load high scores: {e}")
+            played = []
+        keys = list(DIFFICULTIES) + sorted(key for key in played if key not in DIFFICULTIES)
+        key = key or self.getScoreKey()
+        if key not in keys :
+            keys.append(key)
+        self.scores_keys = {scoreTitle(key) : key for key in keys}
+        self.scores_title = tk.StringVar(master=self.high_scores_display, value=scoreTitle(key))
+        key_menu = tk.OptionMenu(selection_frame, self.scores_title, *self.scores_keys, command=lambda title : self.showScoresPage(0))
+        key_menu.configure(bg=theme["bg_scores"], fg=theme["fg_scores_text"], highlightthickness=0)
+        key_menu.pack(fill="x")
+
+        # player filter (empty -> every player)
+        self.scores_player = tk.StringVar(master=self.high_scores_display)
+        player_entry = tk.Entry(master=selection_frame, textvariable=self.scores_player, bg=theme["bg_scores"], fg=theme["fg_scores_text"])
+        player_entry.pack(fill="x", pady=(5, 0))
+        player_entry.bind(sequence="<Return>", func=lambda event : self.showScoresPage(0))
+
+        # one page of scores
+        self.scores_list = tk.Listbox(master=scores_frame, height=self.scores_page_size, font=self.font_dict["scores"],
+                                      bg=theme["bg_scores"], fg=theme["fg_scores_text"], relief="raised", borderwidth=4,
+                                      activestyle="none")
+        self.scores_list.pack(fill="both", expand=True)
+
+        # page navigation
+        navigation_frame = tk.Frame(master=scores_frame, bg=theme["bg_frame"])
+        navigation_frame.pack(fill="x", pady=(5, 0))
+        self.scores_previous = tk.Button(master=navigation_frame, text="<", bg=theme["bg_button"], width=3)
+        self.scores_previous.pack(side="left")
+        self.scores_next = tk.Button(master=navigation_frame, text=">", bg=theme["bg_button"], width=3)
+        self.scores_next.pack(side="right")
+        self.scores_position = tk.Label(master=navigation_frame, bg=theme["bg_frame"], fg=theme["fg_scores_text"], font=self.font_dict["scores"])
+        self.scores_position.pack()
+
+        self.showScoresPage(0)
+
+    def showScoresPage(self, start) :
+        '''
+        Shows the page of the selected leaderboard starting at the start-th best score.
+        '''
+        key = self.scores_keys[self.scores_title.get()]
+        player = self.scores_player.get().strip() or None
 
-            if not high_scores :
-                scores_text.insert("end", "1.\n2.\n3.", "blank_scores")
-                scores_text.tag_config(tagName="blank_scores", font=Font(size=8, weight="bold"), 
-                                       foreground=theme["fg_scores_text"])
-            
+        try :
+            store = self.getScoreStore()
+            total = store.count(key, player)
+            high_scores = store.page(key, start, self.scores_page_size, player)
+            if player is None :
+                # ranks follow from the page's position (ties share the rank of their first score)
+                ranks, previous_time = [], None
+                for position, high_score in enumerate(high_scores, start + 1) :
+                    if ranks and high_score['time'] == previous_time :
+                        ranks.append(ranks[-1])
+                    elif ranks or start == 0 :
+                        ranks.append(position)
+                    else :
+                        # the first score of a later page may tie with the previous page
+                        ranks.append(store.rank(key, high_score['time']))
+                    previous_time = high_score['time']
             else :
-                for i, high_score in enumerate(high_scores, 1) :
-                    scores_text.insert("end", str(i) + ".  ", "place")
-                    scores_text.tag_config(tagName="place", font=Font(size=8, weight="bold"),
-                                           foreground=theme[str(i)])
-                    scores_text.insert("end", f"{high_score['name']} | {high_score['time']}s | {high_score['date']}\n", "player")
-                    scores_text.tag_config(tagName="player", foreground=theme["fg_scores_text"])
-                
-            scores_text.insert("end", "\n")
-
-        # read only
-        scores_text.configure(state="disabled")
+                # ranks on the whole leaderboard
+                ranks = [store.rank(key, high_score['time']) for high_score in high_scores]
+        except Exception as e :
+            messagebox.showerror("Error", f"Unable to load high scores: {e}")
+            return
+
+        self.scores_list.delete(0, "end")
+        if not high_scores :
+            self.scores_list.insert("end", "No scores yet.")
+        for rank, high_score in zip(ranks, high_scores) :
+            # scores saved before the 3BV was kept have none
+            value = high_score.get('3bv')
+            speed = f"3BV {value} ({value / high_score['time']:.2f}/s)" if value and high_score['time'] > 0 else "3BV -"
+            self.scores_list.insert("end", f"{rank:>4}.  {high_score['name']} | {high_score['time']:.3f}s | {speed} | {high_score['date']}")
+
+        # update page navigation
+        end = start + len(high_scores)
+        self.scores_position.configure(text=f"{start + 1 if high_scores else 0}-{end} of {total}")
+        previous_start = max(0, start - self.scores_page_size)
+        self.scores_previous.configure(state="normal" if start > 0 else "disabled",
+                                       command=lambda : self.showScoresPage(previous_start))
+        self.scores_next.configure(state="normal" if end < total else "disabled",
+                                   command=lambda : self.showScoresPage(end))
@@ -0,0 +1,601 @@
+import tkinter as tk
+from themes import cellStyles, COVERED, DETONATED, BOMB_LOST, BOMB_WON
+# numpy is imported where a board is read, so the window is painted before it loads
+
+# unicode characters drawn on the mine field
+BOMB = u"\U0001F4A3"
+FLAG = u"\U0001F3F2"
+
+def heatColor(widget, theme, percent) :
+    '''
+    Returns the heatmap color of a mine probability (in percent), blended from the
+    theme's safe hint color to its bomb hint color in steps of 10%.
+    '''
+    fraction = round(percent / 10) / 10
+    safe = widget.winfo_rgb(theme["bg_hint_safe"])
+    mine = widget.winfo_rgb(theme["bg_hint_mine"])
+    # winfo_rgb returns 16-bit channels
+    return "#" + "".join(f"{int(a + (b - a) * fraction) >> 8:02x}" for a, b in zip(safe, mine))
+
+def heatCells(board, probabilities) :
+    '''
+    Returns the covered, unflagged cells of a probability array and their probabilities.
+    '''
+    import numpy as np
+    shown = ~np.isnan(probabilities) & ~board.flagged
+    return [tuple(cell) for cell in np.argwhere(shown).tolist()], probabilities[shown].tolist()
+
+class LabelRenderer :
+    '''
+    Draws the mine field as a grid of Label widgets (one cell cover and one flag label per cell).
+    The widgets are pooled: a reset reconfigures the existing labels instead of rebuilding them.
+    '''
+    # size of a cell in pixels (width, height)
+    cell_size = (34, 35)
+    # largest board (in cells) drawn with widgets
+    max_cells = 2500
+
+    def __init__(self, game) :
+        '''
+        Attaches the renderer to a Minesweeper game.
+        '''
+        self.game = game
+        # pooled (cell, flag) label pairs keyed by grid coordinates
+        self.cells = {}
+        # flags currently shown above their cell
+        self.raised_flags = set()
+        # mine probability (in percent) currently shown on each covered cell
+        self.heat = {}
+        # cell uncovered by the latest left-click (its double-click does not chord)
+        self.opened = None
+        # ignore clicks once the game has ended
+        self.enabled = True
+
+    def fieldSize(self, rows, cols) :
+        '''
+        Returns the size of the mine field in pixels.
+        '''
+        return cols * self.cell_size[0], rows * self.cell_size[1]
+
+    ########## MINEFIELD SETUP AND BINDINGS ##########
+    def buildCovers(self) :
+        '''
+        Creates (or resets) the cell covers for the mine field. Existing labels are reused,
+        new ones are only created when the grid grows and extra ones are destroyed when it shrinks.
+        '''
+        game = self.game
+        bg, fg = game.getPalette()[COVERED]
+        rows, cols = game.board.grid_rows, game.board.grid_cols
+
+        # remove cells that fall outside of the new grid
+        for r, c in [coord for coord in self.cells if coord[0] >= rows or coord[1] >= cols] :
+            for widget in self.cells.pop((r, c)) :
+                widget.destroy()
+            self.raised_flags.discard((r, c))
+
+        # push any visible flags back under their cells
+        for r, c in self.raised_flags :
+            self.cells[(r, c)][1].lower()
+        self.raised_flags.clear()
+        self.heat.clear()
+
+        # covers are blank (bombs are only placed on the first click, contents are set when uncovered)
+        for r in range(rows) :
+            for c in range(cols) :
+                if (r, c) in self.cells :
+                    # reset pooled cell
+                    self.cells[(r, c)][0].configure(text="", relief="raised", fg=fg, bg=bg)
+                else :
+                    self.cells[(r, c)] = (self.buildCell(r, c, ""), self.buildFlag(r, c))
+
+        self.enabled = True
+
+    def buildCell(self, row, col, text) :
+        '''
+        Creates a cell cover label.
+        '''
+        game = self.game
+        theme = game.getTheme()
+
+        # use label for proper left- and right-click bindings
+        cell = tk.Label(master=game.grid_frame, name=f"[{row},{col}]", width=2, height=1,
+                     relief="raised", borderwidth=4, highlightbackground="dimgray",
+                     highlightthickness=1, bg=theme["bg_cell"], text=text,
+                     font=game.font_dict["cell"], fg=theme["bg_cell"])
+
+        # make cell non-resizeable
+        cell.grid_propagate(False)
+        # place cell in grid (no padding between cells)
+        cell.grid(row=row, column=col)
+
+        # bind left-click
+        cell.bind(sequence="<Button-1>", func=lambda event, r=row, c=col : self.onLeftClick(event, r, c))
+        # bind right-click
+        cell.bind(sequence="<Button-3>", func=lambda event, r=row, c=col : self.onRightClick(event, r, c))
+        # bind middle-click and double-click (chording)
+        cell.bind(sequence="<Button-2>", func=lambda event, r=row, c=col : self.onChord(event, r, c))
+        cell.bind(sequence="<Double-Button-1>", func=lambda event, r=row, c=col : self.onDoubleClick(event, r, c))
+
+        return cell
+
+    def buildFlag(self, row, col) :
+        '''
+        Creates the flag labels.
+        '''
+        game = self.game
+        theme = game.getTheme()
+
+        # create flag label with flag unicode character
+        flag = tk.Label(master=game.grid_frame, name=f"flag[{row},{col}]", text=FLAG, font=game.font_dict["bomb"],
+                    fg="crimson", width=2, height=1, padx=0, pady=0, relief="flat", bg=theme["bg_cell"])
+
+        # make label non-resizeable
+        flag.grid_propagate(False)
+        # place flag label in grid below cell
+        flag.grid(row=row, column=col)
+        flag.lower()
+
+        # bind right-click
+        flag.bind(sequence="<Button-3>", func=lambda event, r=row, c=col : self.onRightClick(event, r, c))
+
+        return flag
+
+    def onLeftClick(self, event, row, col) :
+        '''
+        Left-click binding for cell covers. Uncovers the cell.
+        '''
+        # flagged and uncovered cells ignore left-clicks
+        if not self.enabled or self.game.board.isFlagged(row, col) or self.game.board.isUncovered(row, col) :
+            self.opened = None
+            return
+        self.opened = (row, col)
+        self.game.uncoverCell(event, row, col)
+
+    def onChord(self, event, row, col) :
+        '''
+        Middle-click binding for cell covers. Chords an uncovered clue.
+        '''
+        if not self.enabled or not self.game.board.isUncovered(row, col) :
+            return
+        self.game.chordCell(event, row, col)
+
+    def onDoubleClick(self, event, row, col) :
+        '''
+        Double-click binding for cell covers. Chords an uncovered clue.
+        '''
+        # a double-click on a covered cell only uncovers it (its first click did)
+        opened, self.opened = self.opened, None
+        if (row, col) == opened :
+            return
+        self.onChord(event, row, col)
+
+    def onRightClick(self, event, row, col) :
+        '''
+        Right-click binding for cell covers and flags. Places or removes a flag.
+        '''
+        # uncovered cells cannot be flagged
+        if not self.enabled or self.game.board.isUncovered(row, col) :
+            return
+        if self.game.board.isFlagged(row, col) :
+            self.game.removeFlag(event, row, col)
+        else :
+            self.game.addFlag(event, row, col)
+
+    ########## DRAWING ##########
+    def drawUncovered(self, cells) :
+        '''
+        Updates the appearance of a batch of uncovered cells.
+        '''
+        game = self.game
+        palette = game.getPalette()
+
+        for row, col in cells :
+            self.heat.pop((row, col), None)
+            cell = self.cells[(row, col)][0]
+            content = game.board.getContent(row, col)
+            # cell contains a bomb
+            if content < 0 :
+                bg, fg = palette[DETONATED]
+                cell.configure(text=BOMB, relief="flat", fg=fg, bg=bg)
+            # cell does not contain a bomb (show the clue in its color)
+            else :
+                bg, fg = palette[content]
+                cell.configure(text=content, relief="flat", fg=fg, bg=bg)
+
+    def drawFlag(self, row, col, flagged) :
+        '''
+        Shows or hides the flag over a cell.
+        '''
+        cell, flag = self.cells[(row, col)]
+
+        if flagged :
+            # hidden flags are not kept in the current theme (see refresh)
+            flag.configure(bg=self.game.getTheme()["bg_cell"])
+            # push cell to the back (reveals flag label)
+            cell.lower()
+            self.raised_flags.add((row, col))
+        else :
+            # push flag label under cell
+            flag.lower()
+            self.raised_flags.discard((row, col))
+
+    def showBombs(self, win) :
+        '''
+        Displays every bomb location at the end of a game (except the detonated bomb).
+        '''
+        game = self.game
+        bg, fg = game.getPalette()[BOMB_WON if win else BOMB_LOST]
+
+        for row, col in game.board.bomb_locations :
+            if (row, col) == game.board.detonated :
+                continue
+            cell = self.cells[(row, col)][0]
+            cell.configure(text=BOMB, relief="flat", fg=fg, bg=bg)
+            cell.tkraise()
+
+    def drawHint(self, row, col, mine) :
+        '''
+        Highlights a covered cell the solver knows is safe (or a bomb).
+        '''
+        theme = self.game.getTheme()
+        color = theme["bg_hint_mine"] if mine else theme["bg_hint_safe"]
+
+        # hide the text in the highlight color
+        self.heat.pop((row, col), None)
+        self.cells[(row, col)][0].configure(fg=color, bg=color)
+
+    def drawProbabilities(self, probabilities) :
+        '''
+        Tints every covered, unflagged cell by its mine probability (a (rows, cols) array
+        with NaN for uncovered cells). Only cells whose tint changed are reconfigured.
+        '''
+        game = self.game
+        theme = game.getTheme()
+        colors = {}
+
+        for (row, col), probability in zip(*heatCells(game.board, probabilities)) :
+            percent = round(probability * 100)
+            if self.heat.get((row, col)) == percent :
+                continue
+            if percent not in colors :
+                colors[percent] = heatColor(game.master, theme, percent)
+            self.heat[(row, col)] = percent
+            # hide the text in the tint
+            self.cells[(row, col)][0].configure(fg=colors[percent], bg=colors[percent])
+
+    def clearProbabilities(self) :
+        '''
+        Removes the probability tint from every covered cell.
+        '''
+        bg, fg = self.game.getPalette()[COVERED]
+
+        for cell in self.heat :
+            self.cells[cell][0].configure(fg=fg, bg=bg)
+        self.heat.clear()
+
+    def disable(self) :
+        '''
+        Ignores all further clicks on the mine field.
+        '''
+        self.enabled = False
+
+    def refresh(self) :
+        '''
+        Applies the current theme to all cells and the flags shown. The colors of every cell
+        come from the board's cell states and the theme's palette (nothing is read back from
+        the widgets), so each cell costs a single configure call.
+        '''
+        game = self.game
+        palette = game.getPalette()
+        styles = cellStyles(game.board)
+
+        for row, line in enumerate(styles.tolist()) :
+            for col, style in enumerate(line) :
+                bg, fg = palette[style]
+                self.cells[(row, col)][0].configure(fg=fg, bg=bg)
+        # hidden flags are updated when they are shown
+        for row, col in self.raised_flags :
+            self.cells[(row, col)][1].configure(bg=game.getTheme()["bg_cell"])
+
+class CanvasRenderer :
+    '''
+    Draws the whole mine field on a single Canvas. Clicks are mapped to cells
+    arithmetically and only the cells that change are redrawn.
+    '''
+    # size of a cell in pixels
+    cell_size = 28
+    # largest visible area of the mine field before scrolling (in pixels)
+    max_view = (900, 700)
+    # width of a scrollbar in pixels
+    scroll_size = 17
+    # any board size can be drawn
+    max_cells = None
+
+    def __init__(self, game) :
+        '''
+        Attaches the renderer to a Minesweeper game.
+        '''
+        self.game = game
+        self.canvas = None
+        # canvas items drawn over each changed cell
+        self.items = {}
+        # mine probability (in percent) currently shown on each covered cell
+        self.heat = {}
+        # cell uncovered by the latest left-click (its double-click does not chord)
+        self.opened = None
+        # ignore clicks once the game has ended
+        self.enabled = True
+
+    def fieldSize(self, rows, cols) :
+        '''
+        Returns the size of the visible mine field (and its scrollbars) in pixels.
+        '''
+        width, height = cols * self.cell_size, rows * self.cell_size
+        view_width, view_height = min(width, self.max_view[0]), min(height, self.max_view[1])
+
+        # make room for the scrollbars
+        if width > self.max_view[0] :
+            view_height += self.scroll_size
+        if height > self.max_view[1] :
+            view_width += self.scroll_size
+
+        return view_width, view_height
+
+    ########## MINEFIELD SETUP AND BINDINGS ##########
+    def buildCovers(self) :
+        '''
+        Draws the covered mine field: one background rectangle and the grid lines.
+        '''
+        game = self.game
+        theme = game.getTheme()
+        rows, cols = game.board.grid_rows, game.board.grid_cols
+        width, height = cols * self.cell_size, rows * self.cell_size
+
+        if self.canvas is None :
+            self.buildCanvas()
+        # remove the previous game
+        self.clear()
+
+        self.canvas.configure(width=min(width, self.max_view[0]), height=min(height, self.max_view[1]),
+                              scrollregion=(0, 0, width, height), bg=theme["bg_frame"])
+        # only show scrollbars if the mine field does not fit
+        if width > self.max_view[0] :
+            self.x_scroll.grid(row=1, column=0, sticky="ew")
+        else :
+            self.x_scroll.grid_remove()
+        if height > self.max_view[1] :
+            self.y_scroll.grid(row=0, column=1, sticky="ns")
+        else :
+            self.y_scroll.grid_remove()
+
+        # covered cells
+        self.canvas.create_rectangle(0, 0, width, height, fill=theme["bg_cell"], outline="", tags="covers")
+        for r in range(rows + 1) :
+            self.canvas.create_line(0, r * self.cell_size, width, r * self.cell_size, fill="dimgray", tags="lines")
+        for c in range(cols + 1) :
+            self.canvas.create_line(c * self.cell_size, 0, c * self.cell_size, height, fill="dimgray", tags="lines")
+
+        self.enabled = True
+
+    def buildCanvas(self) :
+        '''
+        Creates the canvas, its scrollbars and its bindings.
+        '''
+        self.canvas = tk.Canvas(master=self.game.grid_frame, highlightthickness=0, borderwidth=0)
+        self.x_scroll = tk.Scrollbar(master=self.game.grid_frame, orient="horizontal", command=self.canvas.xview)
+        self.y_scroll = tk.Scrollbar(master=self.game.grid_frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(xscrollcommand=self.x_scroll.set, yscrollcommand=self.y_scroll.set)
+        self.canvas.grid(row=0, column=0)
+
+        # bind left-click
+        self.canvas.bind(sequence="<Button-1>", func=self.onLeftClick)
+        # bind right-click
+        self.canvas.bind(sequence="<Button-3>", func=self.onRightClick)
+        # bind middle-click and double-click (chording)
+        self.canvas.bind(sequence="<Button-2>", func=self.onChord)
+        self.canvas.bind(sequence="<Double-Button-1>", func=self.onDoubleClick)
+
+    def getCell(self, event) :
+        '''
+        Returns the (row, col) under the mouse pointer, or None outside the mine field.
+        '''
+        row = int(self.canvas.canvasy(event.y) // self.cell_size)
+        col = int(self.canvas.canvasx(event.x) // self.cell_size)
+
+        if 0 <= row < self.game.board.grid_rows and 0 <= col < self.game.board.grid_cols :
+            return row, col
+        return None
+
+    def onLeftClick(self, event) :
+        '''
+        Left-click binding for the canvas. Uncovers the clicked cell.
+        '''
+        cell = self.getCell(event)
+        if not self.enabled or cell is None :
+            return
+        row, col = cell
+
+        # flagged and uncovered cells ignore left-clicks
+        if self.game.board.isFlagged(row, col) or self.game.board.isUncovered(row, col) :
+            self.opened = None
+            return
+        self.opened = cell
+        self.game.uncoverCell(event, row, col)
+
+    def onChord(self, event) :
+        '''
+        Middle-click binding for the canvas. Chords the clicked clue.
+        '''
+        cell = self.getCell(event)
+        if not self.enabled or cell is None :
+            return
+        row, col = cell
+
+        if self.game.board.isUncovered(row, col) :
+            self.game.chordCell(event, row, col)
+
+    def onDoubleClick(self, event) :
+        '''
+        Double-click binding for the canvas. Chords the clicked clue.
+        '''
+        # a double-click on a covered cell only uncovers it (its first click did)
+        opened, self.opened = self.opened, None
+        if self.getCell(event) == opened :
+            return
+        self.onChord(event)
+
+    def onRightClick(self, event) :
+        '''
+        Right-click binding for the canvas. Places or removes a flag.
+        '''
+        cell = self.getCell(event)
+        if not self.enabled or cell is None :
+            return
+        row, col = cell
+
+        # uncovered cells cannot be flagged
+        if self.game.board.isUncovered(row, col) :
+            return
+        if self.game.board.isFlagged(row, col) :
+            self.game.removeFlag(event, row, col)
+        else :
+            self.game.addFlag(event, row, col)
+
+    def clear(self) :
+        '''
+        Removes every item from the canvas.
+        '''
+        if self.canvas is not None :
+            self.canvas.delete("all")
+        self.items.clear()
+        self.heat.clear()
+
+    ########## DRAWING ##########
+    def drawCell(self, row, col, bg, text=None, fg=None, tag=None, font=None) :
+        '''
+        Replaces the items drawn over a single cell.
+        '''
+        for item in self.items.pop((row, col), ()) :
+            self.canvas.delete(item)
+        self.heat.pop((row, col), None)
+
+        x, y = col * self.cell_size, row * self.cell_size
+        items = [self.canvas.create_rectangle(x, y, x + self.cell_size, y + self.cell_size,
+                                              fill=bg, outline="dimgray", tags=tag)]
+        if text :
+            if font is None :
+                font = self.game.font_dict["bomb"] if text == FLAG else self.game.font_dict["cell"]
+            items.append(self.canvas.create_text(x + self.cell_size // 2, y + self.cell_size // 2,
+                                                 text=text, fill=fg, font=font, tags=f"{tag}_text"))
+        self.items[(row, col)] = items
+
+    def drawUncovered(self, cells) :
+        '''
+        Draws a batch of uncovered cells.
+        '''
+        game = self.game
+        palette = game.getPalette()
+
+        for row, col in cells :
+            content = game.board.getContent(row, col)
+            # cell contains a bomb
+            if content < 0 :
+                bg, fg = palette[DETONATED]
+                self.drawCell(row, col, bg, BOMB, fg, f"style_{DETONATED}")
+            # 0s are drawn without text
+            else :
+                bg, fg = palette[content]
+                self.drawCell(row, col, bg, str(content) if content else None, fg, f"style_{content}")
+
+    def drawFlag(self, row, col, flagged) :
+        '''
+        Shows or hides the flag over a cell.
+        '''
+        theme = self.game.getTheme()
+
+        if flagged :
+            self.drawCell(row, col, theme["bg_cell"], FLAG, "crimson", "flag")
+        else :
+            for item in self.items.pop((row, col), ()) :
+                self.canvas.delete(item)
+
+    def showBombs(self, win) :
+        '''
+        Displays every bomb location at the end of a game (except the detonated bomb).
+        '''
+        game = self.game
+        style = BOMB_WON if win else BOMB_LOST
+        bg, fg = game.getPalette()[style]
+
+        for row, col in game.board.bomb_locations :
+            if (row, col) == game.board.detonated :
+                continue
+            self.drawCell(row, col, bg, BOMB, fg, f"style_{style}")
+
+    def drawHint(self, row, col, mine) :
+        '''
+        Highlights a covered cell the solver knows is safe (or a bomb).
+        '''
+        theme = self.game.getTheme()
+
+        if mine :
+            self.drawCell(row, col, theme["bg_hint_mine"], tag="hint_mine")
+        else :
+            self.drawCell(row, col, theme["bg_hint_safe"], tag="hint_safe")
+
+    def drawProbabilities(self, probabilities) :
+        '''
+        Tints every covered, unflagged cell by its mine probability (a (rows, cols) array
+        with NaN for uncovered cells) and writes the probability in percent on it.
+        Only cells whose probability changed are redrawn.
+        '''
+        game = self.game
+        theme = game.getTheme()
+        colors = {}
+
+        for (row, col), probability in zip(*heatCells(game.board, probabilities)) :
+            percent = round(probability * 100)
+            if self.heat.get((row, col)) == percent :
+                continue
+            if percent not in colors :
+                colors[percent] = heatColor(self.canvas, theme, percent)
+            self.drawCell(row, col, colors[percent], f"{percent}%", "black", "heat", game.font_dict["scores"])
+            self.heat[(row, col)] = percent
+
+    def clearProbabilities(self) :
+        '''
+        Removes the probability overlay from every covered cell.
+        '''
+        for cell in self.heat :
+            for item in self.items.pop(cell, ()) :
+                self.canvas.delete(item)
+        self.heat.clear()
+
+    def disable(self) :
+        '''
+        Ignores all further clicks on the mine field.
+        '''
+        self.enabled = False
+
+    def refresh(self) :
+        '''
+        Applies the current theme with one configure call per item tag. Cells are tagged by
+        their style (see themes.cellStyles), so their colors come straight from the palette.
+        '''
+        game = self.game
+        theme = game.getTheme()
+
+        self.canvas.configure(bg=theme["bg_frame"])
+        self.canvas.itemconfigure("covers", fill=theme["bg_cell"])
+        self.canvas.itemconfigure("flag", fill=theme["bg_cell"])
+        self.canvas.itemconfigure("hint_safe", fill=theme["bg_hint_safe"])
+        self.canvas.itemconfigure("hint_mine", fill=theme["bg_hint_mine"])
+        for style, (bg, fg) in enumerate(game.getPalette()) :
+            self.canvas.itemconfigure(f"style_{style}", fill=bg)
+            self.canvas.itemconfigure(f"style_{style}_text", fill=fg)
+
+# renderers selectable at startup
+RENDERERS = {
+    "labels" : LabelRenderer,
+    "canvas" : CanvasRenderer
+}
@@ -0,0 +1,228 @@
+########## IMPORTS ##########
+import argparse
+import os
+import struct
+import time
+import numpy as np
+from board import Board
+from locks import locked
+
+########## BINARY FORMAT ##########
+# a replay file is a sequence of games, appended one after the other:
+#   game header | bomb mask (one bit per cell) | one fixed-size record per action
+GAME = struct.Struct("<4sHHII")   # magic, rows, cols, bombs, number of actions
+ACTION = struct.Struct("<BHHI")   # action, row, col, milliseconds since the first action
+MAGIC = b"MSRP"
+
+# numpy view of the action records (same layout as ACTION)
+ACTION_DTYPE = np.dtype([("action", "u1"), ("row", "<u2"), ("col", "<u2"), ("time", "<u4")])
+
+# recorded actions
+REVEAL = 0
+FLAG = 1
+CHORD = 2
+
+# default replay file (next to the high scores)
+REPLAYS_FILE = os.path.join(os.path.dirname(__file__), '..', 'resources', 'replays.bin')
+
+# length of each replay file already known to hold complete games only, so saves only check
+# the games appended since (by this process or another one)
+complete_lengths = {}
+
+class Replay :
+    '''
+    A recorded game: its bomb layout and the actions played on it.
+    '''
+    __slots__ = ("mines", "actions")
+
+    def __init__(self, mines, actions) :
+        '''
+        Takes the boolean (rows, cols) bomb mask and a structured array of ACTION_DTYPE.
+        '''
+        self.mines = mines
+        self.actions = actions
+
+    def newBoard(self) :
+        '''
+        Returns a fresh board with the recorded bomb layout.
+        '''
+        return Board.fromMines(self.mines)
+
+    def toBytes(self) :
+        '''
+        Returns the binary record of the game.
+        '''
+        rows, cols = self.mines.shape
+        header = GAME.pack(MAGIC, rows, cols, int(np.count_nonzero(self.mines)), len(self.actions))
+        return header + np.packbits(self.mines, axis=None).tobytes() + self.actions.tobytes()
+
+class Recorder :
+    '''
+    Records the actions played on a board. The game is appended to a replay file once it
+    is saved (at the end of the game or when it is abandoned).
+    '''
+    def __init__(self, board) :
+        '''
+        Starts recording a board.
+        '''
+        self.board = board
+        self.actions = []
+        # time of the first action
+        self.start = None
+
+    def record(self, action, row, col, elapsed=None) :
+        '''
+        Records an action, timestamped in milliseconds since the first one (measured here
+        unless the caller's game clock gives it).
+        '''
+        if elapsed is None :
+            now = time.perf_counter()
+            if self.start is None :
+                self.start = now
+            elapsed = int((now - self.start) * 1000)
+        self.actions.append((action, row, col, elapsed))
+
+    def getReplay(self) :
+        '''
+        Returns the recorded game, or None if nothing has been played yet (no action, or no
+        bomb placed).
+        '''
+        if not self.board.placed or not self.actions :
+            return None
+        return Replay(self.board.mines, np.array(self.actions, dtype=ACTION_DTYPE))
+
+    def getDuration(self) :
+        '''
+        Returns the milliseconds between the first and the last recorded action.
+        '''
+        return self.actions[-1][3] if self.actions else 0
+
+    def save(self, path=REPLAYS_FILE) :
+        '''
+        Appends the recorded game to a replay file. Returns the byte offset of the game in the
+        file, or None for games without any action (which are not saved). The file is locked
+        while it is written, so games saved by several windows at once never interleave.
+        '''
+        replay = self.getReplay()
+        if replay is None :
+            return None
+        with locked(path + ".lock"), open(path, 'a+b') as file :
+            # a game left incomplete by a crash is dropped, so the new one can be read back
+            offset = completeLength(file, complete_lengths.get(path, 0))
+            if offset < file.seek(0, os.SEEK_END) :
+                file.truncate(offset)
+            file.write(replay.toBytes())
+            complete_lengths[path] = file.tell()
+
+        return offset
+
+########## READING AND PLAYBACK ##########
+def gameSize(rows, cols, count) :
+    '''
+    Returns the size in bytes of a recorded game (header, bomb mask and actions).
+    '''
+    return GAME.size + (rows * cols + 7) // 8 + count * ACTION.size
+
+def completeLength(file, offset=0) :
+    '''
+    Returns the length of an open replay file without the incomplete game a crash may have
+    left at its end (corrupt files are returned whole, for readReplays to report). Games
+    are only checked from the given offset, which must be the start of a game.
+    '''
+    end = file.seek(0, os.SEEK_END)
+    if offset > end :
+        offset = 0
+    while offset < end :
+        file.seek(offset)
+        header = file.read(GAME.size)
+        if len(header) < GAME.size :
+            break
+        magic, rows, cols, bombs, count = GAME.unpack(header)
+        if magic != MAGIC :
+            return end
+        if offset + gameSize(rows, cols, count) > end :
+            break
+        offset += gameSize(rows, cols, count)
+    return offset
+
+def readReplays(path=REPLAYS_FILE) :
+    '''
+    Returns every game of a replay file (an empty list if there is none). The action
+    arrays are zero-copy views over the file contents. An incomplete game at the end of the
+    file (left by a crash while it was written) is skipped.
+    '''
+    if not os.path.exists(path) :
+        return []
+    with open(path, 'rb') as file :
+        data = file.read()
+
+    replays = []
+    offset = 0
+    while offset + GAME.size <= len(data) :
+        magic, rows, cols, bombs, count = GAME.unpack_from(data, offset)
+        if magic != MAGIC :
+            raise ValueError(f"corrupt replay file at byte {offset}")
+        if offset + gameSize(rows, cols, count) > len(data) :
+            break
+        offset += GAME.size
+
+        # bomb mask
+        mask_size = (rows * cols + 7) // 8
+        bits = np.frombuffer(data, dtype=np.uint8, count=mask_size, offset=offset)
+        mines = np.unpackbits(bits, count=rows * cols).astype(bool).reshape(rows, cols)
+        offset += mask_size
+
+        actions = np.frombuffer(data, dtype=ACTION_DTYPE, count=count, offset=offset)
+        offset += count * ACTION.size
+        replays.append(Replay(mines, actions))
+
+    return replays
+
+def applyAction(board, action, row, col) :
+    '''
+    Plays one recorded action on a board. Returns the cells it uncovered.
+    '''
+    if action == REVEAL :
+        return board.uncoverCell(row, col)
+    if action == CHORD :
+        return board.chordCell(row, col)
+    board.toggleFlag(row, col)
+    return []
+
+def verifyReplay(replay) :
+    '''
+    Replays a game headlessly. Returns the finished board and the recorded duration
+    of the game in milliseconds.
+    '''
+    board = replay.newBoard()
+    for action, row, col in replay.actions[["action", "row", "col"]].tolist() :
+        applyAction(board, action, row, col)
+        if board.isOver() :
+            break
+
+    duration = int(replay.actions["time"][-1]) if len(replay.actions) else 0
+    return board, duration
+
+########## MAIN FUNCTION ##########
+def main() :
+    # parse command line options
+    parser = argparse.ArgumentParser(description="Verify recorded Minesweeper games headlessly.")
+    parser.add_argument("--file", default=REPLAYS_FILE, help="replay file to read")
+    parser.add_argument("--last", type=int, help="only verify the last N games")
+    args = parser.parse_args()
+
+    replays = readReplays(args.file)
+    if args.last is not None :
+        replays = replays[-args.last:]
+
+    start = time.perf_counter()
+    for i, replay in enumerate(replays) :
+        board, duration = verifyReplay(replay)
+        result = "won" if board.won else "lost" if board.lost else "unfinished"
+        print(f"{i:>6}  {board.grid_rows}x{board.grid_cols} ({board.bomb_count} bombs)  "
+              f"{len(replay.actions):>5} actions  {duration / 1000:8.3f}s  {result}")
+    elapsed = time.perf_counter() - start
+    print(f"verified {len(replays)} games in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,313 @@
+########## IMPORTS ##########
+import bisect
+import heapq
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from locks import locked
+
+########## HIGH SCORE STORES ##########
+# every store keeps the full history of scores of each score key (see difficulty.scoreKey):
+# {"name", "time", "date", "3bv"} entries ranked from best to worst time (ties by arrival);
+# the 3BV of the board is None (or missing) for scores saved before it was kept
+#
+# stores are duck-typed (see SCORE_STORES): each is created with the path of its backing file
+# and answers keys, count, page, rank and addScore
+
+class JsonScoreStore :
+    '''
+    High scores in a JSON file. Every update re-reads the file under an exclusive lock,
+    writes the result to a temporary file and renames it over the original, so a crash
+    never leaves a truncated file and concurrent games never overwrite each other's scores.
+
+    The scores are kept in memory, ranked, next to a sorted list of their times, so ranks
+    are found and new scores placed by bisection. The file is only re-read when it has
+    changed (by modification time and size). Every new score still rewrites the whole file,
+    which is O(n): large histories belong in SqliteScoreStore.
+    '''
+    def __init__(self, path) :
+        '''
+        Attaches the store to its JSON file.
+        '''
+        self.path = path
+        self.lock_file = path + ".lock"
+        # ranked scores and their sorted times by key, and the file stamp they were read at
+        self.scores = {}
+        self.times = {}
+        self.stamp = None
+
+    def getStamp(self) :
+        '''
+        Returns the modification time and size of the file (None if it does not exist).
+        '''
+        try :
+            stat = os.stat(self.path)
+        except FileNotFoundError :
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) :
+        '''
+        Returns every ranked score list keyed by score key (re-read only if the file changed).
+        The returned lists must not be modified.
+        '''
+        stamp = self.getStamp()
+        if stamp != self.stamp :
+            self.scores = self.read() if stamp is not None else {}
+            self.times = {key : [entry['time'] for entry in entries] for key, entries in self.scores.items()}
+            self.stamp = stamp
+        return self.scores
+
+    def read(self) :
+        '''
+        Reads and ranks every score list of the file.
+        '''
+        try :
+            with open(self.path, 'r') as file :
+                scores = json.load(file)
+        except (json.JSONDecodeError, FileNotFoundError) :
+            return {}
+        # files written by hand (or by older versions) may not be ranked
+        for entries in scores.values() :
+            entries.sort(key=lambda x : x['time'])
+        return scores
+
+    def keys(self) :
+        '''
+        Returns the score keys that have at least one score.
+        '''
+        return [key for key, entries in self.load().items() if entries]
+
+    def count(self, key, player=None) :
+        '''
+        Returns the number of scores of a key (or of one of its players).
+        '''
+        entries = self.load().get(key, [])
+        if player is None :
+            return len(entries)
+        return sum(1 for entry in entries if entry['name'] == player)
+
+    def page(self, key, start, size, player=None) :
+        '''
+        Returns up to size scores of a key (or of one of its players), from the start-th best.
+        '''
+        entries = self.load().get(key, [])
+        if player is not None :
+            entries = [entry for entry in entries if entry['name'] == player]
+        return entries[start:start + size]
+
+    def rank(self, key, time) :
+        '''
+        Returns the 1-based rank a time has (or would have) on a key's leaderboard.
+        '''
+        self.load()
+        return bisect.bisect_left(self.times.get(key, []), time) + 1
+
+    def addScore(self, key, entry) :
+        '''
+        Adds a score to a key's history. Returns its rank.
+        '''
+        with locked(self.lock_file) :
+            # start from the latest scores on disk (the cache is only re-read if another game wrote)
+            scores = self.load()
+            entries = scores.setdefault(key, [])
+            times = self.times.setdefault(key, [])
+            position = bisect.bisect_right(times, entry['time'])
+            times.insert(position, entry['time'])
+            entries.insert(position, entry)
+
+            # write a complete copy next to the file, then swap it in atomically
+            directory = os.path.dirname(os.path.abspath(self.path))
+            descriptor, temp_file = tempfile.mkstemp(dir=directory, prefix=".highscores-", suffix=".tmp")
+            try :
+                with os.fdopen(descriptor, 'w') as file :
+                    json.dump(scores, file)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_file, self.path)
+            except BaseException :
+                os.unlink(temp_file)
+                # the cache no longer matches the file
+                self.stamp = None
+                raise
+
+            self.stamp = self.getStamp()
+
+        return bisect.bisect_left(times, entry['time']) + 1
+
+# the SQLite rank tree counts scores by millisecond, up to 2^40 ms (about 35 years)
+RANK_LEVELS = 40
+RANK_SIZE = 1 << RANK_LEVELS
+# millisecond of a score's time, computed in SQL exactly as timeBucket computes it in Python
+BUCKET_SQL = f"MIN(MAX(CAST(time * 1000 AS INTEGER), 0), {RANK_SIZE - 1})"
+
+def timeBucket(time) :
+    '''
+    Returns the millisecond a time (in seconds) is counted in by the rank tree.
+    '''
+    return min(max(int(time * 1000), 0), RANK_SIZE - 1)
+
+class SqliteScoreStore :
+    '''
+    High scores in a local SQLite database. SQLite's own locking and transactions make
+    concurrent updates from several processes safe.
+
+    Next to the scores, a Fenwick tree (a "ranks" table of (key, node, count) rows) counts the
+    scores of every key by millisecond, so ranks and the first score of a page are found in
+    O(log n) instead of counting or skipping every better score. Pages filtered by player
+    still skip the player's better scores through the (key, name, time) index.
+    '''
+    def __init__(self, path) :
+        '''
+        Attaches the store to its database (created if needed).
+        '''
+        self.path = path
+        with closing(self.connect()) as db, db :
+            db.execute("CREATE TABLE IF NOT EXISTS scores (key TEXT, name TEXT, time NUMERIC, date TEXT, bbbv INTEGER)")
+            # databases created before the 3BV was kept get the column (NULL for their scores)
+            if "bbbv" not in [column[1] for column in db.execute("PRAGMA table_info(scores)")] :
+                db.execute("ALTER TABLE scores ADD COLUMN bbbv INTEGER")
+            db.execute("CREATE INDEX IF NOT EXISTS scores_by_time ON scores (key, time)")
+            db.execute("CREATE INDEX IF NOT EXISTS scores_by_player ON scores (key, name, time)")
+            # databases created before the rank tree was kept get it built from their scores
+            built = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ranks'").fetchone()
+            db.execute("CREATE TABLE IF NOT EXISTS ranks (key TEXT, node INTEGER, count INTEGER, "
+                       "PRIMARY KEY (key, node)) WITHOUT ROWID")
+            if not built :
+                self.buildRanks(db)
+
+    def connect(self) :
+        '''
+        Opens a connection that waits for other writers instead of failing.
+        '''
+        return sqlite3.connect(self.path, timeout=30)
+
+    ########## RANK TREE ##########
+    def buildRanks(self, db) :
+        '''
+        Rebuilds the rank tree from the scores table (after scores were inserted directly).
+        '''
+        db.execute("DELETE FROM ranks")
+        trees = {}
+        for key, bucket, count in db.execute(f"SELECT key, {BUCKET_SQL}, COUNT(*) FROM scores GROUP BY 1, 2") :
+            trees.setdefault(key, {})[bucket + 1] = count
+        for key, tree in trees.items() :
+            # every node adds its count to its parent, smallest nodes first
+            nodes = list(tree)
+            heapq.heapify(nodes)
+            while nodes :
+                node = heapq.heappop(nodes)
+                parent = node + (node & -node)
+                if parent <= RANK_SIZE :
+                    if parent not in tree :
+                        tree[parent] = 0
+                        heapq.heappush(nodes, parent)
+                    tree[parent] += tree[node]
+            db.executemany("INSERT INTO ranks (key, node, count) VALUES (?, ?, ?)",
+                           [(key, node, count) for node, count in tree.items()])
+
+    def countScore(self, db, key, time) :
+        '''
+        Counts a new score in the rank tree.
+        '''
+        node = timeBucket(time) + 1
+        nodes = []
+        while node <= RANK_SIZE :
+            nodes.append((key, node))
+            node += node & -node
+        db.executemany("INSERT INTO ranks (key, node, count) VALUES (?, ?, 1) "
+                       "ON CONFLICT (key, node) DO UPDATE SET count = count + 1", nodes)
+
+    def rankOf(self, db, key, time) :
+        '''
+        Returns the 1-based rank of a time: the scores of earlier milliseconds, summed over at
+        most RANK_LEVELS tree nodes, plus the better scores of its own millisecond.
+        '''
+        bucket = timeBucket(time)
+        nodes = []
+        node = bucket
+        while node :
+            nodes.append(node)
+            node -= node & -node
+        before = db.execute(f"SELECT COALESCE(SUM(count), 0) FROM ranks WHERE key = ? AND node IN ({', '.join('?' * len(nodes))})",
+                            (key, *nodes)).fetchone()[0] if nodes else 0
+        # the time range only narrows the index scan to the millisecond (its scores are told by their bucket)
+        same = db.execute(f"SELECT COUNT(*) FROM scores WHERE key = ? AND time > ? AND time < ? AND {BUCKET_SQL} = ?",
+                          (key, (bucket - 1) / 1000, time, bucket)).fetchone()[0]
+        return before + same + 1
+
+    def findScore(self, db, key, start) :
+        '''
+        Returns the millisecond holding the start-th best score (0-based) of a key, and how many
+        scores of that millisecond come before it, by descending the rank tree.
+        '''
+        position, remaining = 0, start
+        if not start :
+            return position, remaining
+        for level in range(RANK_LEVELS, -1, -1) :
+            node = position + (1 << level)
+            if node > RANK_SIZE :
+                continue
+            row = db.execute("SELECT count FROM ranks WHERE key = ? AND node = ?", (key, node)).fetchone()
+            count = row[0] if row else 0
+            # every score up to this node comes before the start-th one
+            if count <= remaining :
+                position, remaining = node, remaining - count
+        return position, remaining
+
+    ########## SCORES ##########
+    def keys(self) :
+        '''
+        Returns the score keys that have at least one score.
+        '''
+        with closing(self.connect()) as db :
+            return [key for key, in db.execute("SELECT DISTINCT key FROM scores")]
+
+    def count(self, key, player=None) :
+        '''
+        Returns the number of scores of a key (or of one of its players).
+        '''
+        with closing(self.connect()) as db :
+            if player is None :
+                return db.execute("SELECT COUNT(*) FROM scores WHERE key = ?", (key,)).fetchone()[0]
+            return db.execute("SELECT COUNT(*) FROM scores WHERE key = ? AND name = ?", (key, player)).fetchone()[0]
+
+    def page(self, key, start, size, player=None) :
+        '''
+        Returns up to size scores of a key (or of one of its players), from the start-th best.
+        '''
+        with closing(self.connect()) as db :
+            if player is None :
+                # start from the page's first millisecond instead of skipping every better score
+                bucket, skip = self.findScore(db, key, start)
+                rows = db.execute(f"SELECT name, time, date, bbbv FROM scores WHERE key = ? AND time > ? AND {BUCKET_SQL} >= ? "
+                                  "ORDER BY time, rowid LIMIT ? OFFSET ?", (key, (bucket - 1) / 1000, bucket, size, skip)).fetchall()
+            else :
+                rows = db.execute("SELECT name, time, date, bbbv FROM scores WHERE key = ? AND name = ? ORDER BY time, rowid "
+                                  "LIMIT ? OFFSET ?", (key, player, size, start)).fetchall()
+        return [{'name' : name, 'time' : time, 'date' : date, '3bv' : value} for name, time, date, value in rows]
+
+    def rank(self, key, time) :
+        '''
+        Returns the 1-based rank a time has (or would have) on a key's leaderboard.
+        '''
+        with closing(self.connect()) as db :
+            return self.rankOf(db, key, time)
+
+    def addScore(self, key, entry) :
+        '''
+        Adds a score to a key's history. Returns its rank.
+        '''
+        with closing(self.connect()) as db, db :
+            db.execute("INSERT INTO scores (key, name, time, date, bbbv) VALUES (?, ?, ?, ?, ?)",
+                       (key, entry['name'], entry['time'], entry['date'], entry.get('3bv')))
+            self.countScore(db, key, entry['time'])
+            return self.rankOf(db, key, entry['time'])
+
+# high score stores selectable at startup (backing file name, store class)
+SCORE_STORES = {
+      "json" : ("highscores.json", JsonScoreStore),
+    "sqlite" : ("highscores.db", SqliteScoreStore)
+}
@@ -0,0 +1,177 @@
+########## IMPORTS ##########
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from archive import Archive, today
+from board import Board
+from difficulty import DIFFICULTIES, getSettings
+from metrics import boardMetrics
+from strategies import STRATEGIES
+
+# cells of the boards measured in one vectorized batch (see metrics.boardMetrics)
+METRICS_BATCH = 1 << 20
+
+########## WORK UNITS ##########
+def runChunk(settings, strategy, seed, games, records=False) :
+    '''
+    Plays a chunk of games on boards generated from a seed and returns the chunk's statistics
+    (and, if records is set, the result and 3BV of every game under "records").
+    '''
+    rng = np.random.default_rng(seed)
+    play = STRATEGIES[strategy]
+    board = Board(settings["rows"], settings["cols"], settings["bombs"], rng=rng)
+
+    stats = newStats()
+    won = []
+    # bomb layouts waiting to be measured, and the metrics of the boards measured so far
+    layouts = []
+    metrics = {"3bv" : [], "openings" : [], "isolated" : []}
+    for game in range(games) :
+        if game :
+            board.reset()
+        stats["guesses"][play(board, rng)] += 1
+        won.append(board.won)
+        # bombs are only placed on the first reveal
+        layouts.append(board.mines)
+        if len(layouts) * board.cells.size >= METRICS_BATCH or game == games - 1 :
+            for name, values in boardMetrics(np.stack(layouts)).items() :
+                metrics[name].extend(values.tolist())
+            layouts = []
+
+    stats["games"] = len(won)
+    stats["wins"] = sum(won)
+    for name in ("3bv", "openings", "isolated") :
+        stats[name].update(metrics[name])
+    stats["3bv_wins"].update(value for value, win in zip(metrics["3bv"], won) if win)
+    if records :
+        stats["records"] = {"won" : won, "3bv" : metrics["3bv"]}
+
+    return stats
+
+def newStats() :
+    '''
+    Returns empty statistics: numbers of games and wins, and histograms of the guesses and
+    of the board metrics (of every board, and of the boards won for "3bv_wins").
+    '''
+    return {"games" : 0, "wins" : 0, "guesses" : Counter(), "3bv" : Counter(), "3bv_wins" : Counter(),
+            "openings" : Counter(), "isolated" : Counter()}
+
+def archiveChunk(archive, settings, records) :
+    '''
+    Stores the records of a chunk of simulated games in an archive.
+    '''
+    size = len(records["won"])
+    archive.extend(settings["rows"], settings["cols"], settings["bombs"],
+                   {"time" : np.zeros(size), "won" : records["won"], "3bv" : records["3bv"],
+                    "clicks" : np.zeros(size), "human" : np.zeros(size), "date" : np.full(shape=size, fill_value=today()),
+                    "replay" : np.full(shape=size, fill_value=-1)})
+
+def mergeStats(total, stats) :
+    '''
+    Adds the statistics of a chunk to the running totals.
+    '''
+    total["games"] += stats["games"]
+    total["wins"] += stats["wins"]
+    for key in ("guesses", "3bv", "3bv_wins", "openings", "isolated") :
+        total[key].update(stats[key])
+
+########## REPORTING ##########
+def percentile(histogram, fraction) :
+    '''
+    Returns the value below which the given fraction of a histogram's samples fall.
+    '''
+    target = fraction * sum(histogram.values())
+    seen = 0
+    for value in sorted(histogram) :
+        seen += histogram[value]
+        if seen >= target :
+            return value
+    return 0
+
+def formatStats(total, elapsed) :
+    '''
+    Returns a one-line summary of the running totals.
+    '''
+    games = max(total["games"], 1)
+    mean_guesses = sum(value * count for value, count in total["guesses"].items()) / games
+    mean_3bv = sum(value * count for value, count in total["3bv"].items()) / games
+
+    return (f"{total['games']} games | {total['games'] / max(elapsed, 1e-9):.0f} games/s | "
+            f"win rate {100 * total['wins'] / games:.2f}% | guesses mean {mean_guesses:.2f} | "
+            f"3BV mean {mean_3bv:.1f} (p10 {percentile(total['3bv'], 0.1)}, "
+            f"p50 {percentile(total['3bv'], 0.5)}, p90 {percentile(total['3bv'], 0.9)})")
+
+def printDistribution(title, histogram, file=sys.stdout) :
+    '''
+    Prints a histogram as a table of values, counts and shares.
+    '''
+    samples = max(sum(histogram.values()), 1)
+    print(f"\n{title}", file=file)
+    for value in sorted(histogram) :
+        print(f"  {value:>5}  {histogram[value]:>10}  {100 * histogram[value] / samples:6.2f}%", file=file)
+
+########## MAIN FUNCTION ##########
+def simulate(settings, strategy, games, workers=None, chunk_size=1000, seed=None, progress=1.0, file=sys.stdout, archive=None) :
+    '''
+    Plays a number of games across a process pool and streams the aggregate statistics.
+    Every chunk of games gets its own child seed, so a run is reproducible for a given seed.
+    Pass an Archive to also store every game's record (with no duration or clicks).
+    '''
+    chunks = [min(chunk_size, games - start) for start in range(0, games, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    total = newStats()
+    start = last_report = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor :
+        futures = [executor.submit(runChunk, settings, strategy, child, count, archive is not None)
+                   for child, count in zip(seeds, chunks)]
+        for future in as_completed(futures) :
+            stats = future.result()
+            mergeStats(total, stats)
+            if archive is not None :
+                archiveChunk(archive, settings, stats["records"])
+            # stream the running totals
+            now = time.perf_counter()
+            if now - last_report >= progress :
+                print(formatStats(total, now - start), file=file, flush=True)
+                last_report = now
+
+    print(formatStats(total, time.perf_counter() - start), file=file)
+    return total
+
+def main() :
+    # parse command line options
+    parser = argparse.ArgumentParser(description="Play Minesweeper games headlessly and report aggregate statistics.")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES) + ["custom"], default="easy")
+    parser.add_argument("--rows", type=int, help="rows of a custom board")
+    parser.add_argument("--cols", type=int, help="columns of a custom board")
+    parser.add_argument("--bombs", type=int, help="bombs on a custom board")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="simple")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="games per work unit")
+    parser.add_argument("--seed", type=int, help="seed for reproducible runs")
+    parser.add_argument("--distributions", action="store_true", help="print the guess, 3BV, opening and isolated number distributions")
+    parser.add_argument("--archive", help="store every game's record in the archive in this directory")
+    args = parser.parse_args()
+
+    try :
+        settings = getSettings(args.difficulty, args.rows, args.cols, args.bombs)
+    except (TypeError, ValueError) as e :
+        parser.error(f"invalid custom board: {e}")
+
+    archive = Archive(args.archive) if args.archive else None
+    total = simulate(settings, args.strategy, args.games, args.workers, args.chunk_size, args.seed, archive=archive)
+
+    if args.distributions :
+        printDistribution("GUESSES", total["guesses"])
+        printDistribution("3BV", total["3bv"])
+        printDistribution("OPENINGS", total["openings"])
+        printDistribution("ISOLATED NUMBERS", total["isolated"])
+
+if __name__ == "__main__" :
+    main()
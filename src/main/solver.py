@@ -0,0 +1,435 @@
+from math import comb
+import numpy as np
+from board import COUNT, MINE, UNCOVERED
+
+########## EXACT ENUMERATION ##########
+def enumerateComponent(size, constraints) :
+    '''
+    Counts every mine assignment of a frontier component that satisfies its constraints.
+
+    size is the number of variables (covered cells) and constraints is a list of
+    (variables, mines) pairs. Returns a dict mapping a number of mines k to
+    (solutions, shares): the exact number of consistent assignments with k mines and a
+    float array holding, for every variable, the fraction of those in which it is a mine
+    (exactly 0.0 or 1.0 when the variable is always safe or always a mine).
+
+    Variables seen by exactly the same constraints are interchangeable, so they are merged
+    into one group whose value is its number of mines (weighted by the binomial number of
+    ways to pick them). Groups are assigned breadth-first from one end of the component and
+    partial results are memoized on the state of the constraints that straddle the
+    assigned/unassigned boundary, so a long thin frontier costs roughly linear time
+    instead of 2 ** size.
+    '''
+    # merge variables seen by the same constraints
+    var_constraints = [[] for var in range(size)]
+    for c, (variables, mines) in enumerate(constraints) :
+        for var in variables :
+            var_constraints[var].append(c)
+    members = {}
+    for var in range(size) :
+        members.setdefault(tuple(var_constraints[var]), []).append(var)
+    groups = list(members.values())
+    group_constraints = [var_constraints[group[0]] for group in groups]
+    constraint_groups = [[] for c in constraints]
+    for g, cs in enumerate(group_constraints) :
+        for c in cs :
+            constraint_groups[c].append(g)
+
+    def breadthFirst(start, seen) :
+        # groups reachable from start, in breadth-first order
+        seen[start] = True
+        order = [start]
+        for g in order :
+            for c in group_constraints[g] :
+                for other in constraint_groups[c] :
+                    if not seen[other] :
+                        seen[other] = True
+                        order.append(other)
+        return order
+
+    # order groups breadth-first from the far end of each connected part, so constraints
+    # open and close quickly
+    order, seen = [], [False] * len(groups)
+    for start in range(len(groups)) :
+        if not seen[start] :
+            far = breadthFirst(start, [False] * len(groups))[-1]
+            order.extend(breadthFirst(far, seen))
+    count = len(order)
+    sizes = [len(groups[g]) for g in order]
+
+    # constraints touched at each position, closed at each position and straddling each position
+    position = {g : pos for pos, g in enumerate(order)}
+    first = [min(position[g] for g in gs) for gs in constraint_groups]
+    last = [max(position[g] for g in gs) for gs in constraint_groups]
+    touched = [group_constraints[g] for g in order]
+    closed = [[] for pos in range(count)]
+    boundary = [[] for pos in range(count)]
+    for c in range(len(constraints)) :
+        closed[last[c]].append(c)
+        for pos in range(first[c] + 1, last[c] + 1) :
+            boundary[pos].append(c)
+
+    need = [mines for variables, mines in constraints]
+    have = [0] * len(constraints)
+    memo = {}
+
+    def solve(pos) :
+        # shares cover the groups from pos onwards (in assignment order)
+        if pos == count :
+            return {0 : (1, np.zeros(shape=0))}
+        key = (pos, tuple(have[c] for c in boundary[pos]))
+        if key in memo :
+            return memo[key]
+
+        result = {}
+        size = sizes[pos]
+        for value in range(size + 1) :
+            for c in touched[pos] :
+                have[c] += value
+            # no constraint may exceed its mines, and closed constraints must be exact
+            over = any(have[c] > need[c] for c in touched[pos])
+            if not over and all(have[c] == need[c] for c in closed[pos]) :
+                ways = comb(size, value)
+                for k, (solutions, shares) in solve(pos + 1).items() :
+                    solutions *= ways
+                    shares = np.concatenate(((value / size,), shares))
+                    if k + value in result :
+                        # weighted average of both branches (stays exactly 0.0 or 1.0 when both are)
+                        total, other = result[k + value]
+                        a, b = float(total), float(solutions)
+                        result[k + value] = (total + solutions, (a * other + b * shares) / (a + b))
+                    else :
+                        result[k + value] = (solutions, shares)
+            for c in touched[pos] :
+                have[c] -= value
+            # larger values would only exceed the constraint further
+            if over :
+                break
+
+        memo[key] = result
+        return result
+
+    # spread the shares of each group back over its variables
+    variables = [var for g in order for var in groups[g]]
+    repeats = np.repeat(np.arange(count), sizes)
+    result = {}
+    for k, (solutions, shares) in solve(0).items() :
+        spread = np.empty(shape=size)
+        spread[variables] = shares[repeats]
+        result[k] = (solutions, spread)
+
+    return result
+
+def convolve(a, b) :
+    '''
+    Returns the convolution of two lists of exact counts (indexed by number of mines).
+    '''
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a) :
+        if x :
+            for j, y in enumerate(b) :
+                result[i + j] += x * y
+    return result
+
+########## SOLVER ##########
+class Solver :
+    '''
+    Constraint-propagation solver. Deduces safe cells and bombs from the uncovered clues
+    using the single-cell rules, then pairwise subset rules, then exact enumeration of
+    each independent frontier component.
+
+    The frontier (uncovered clues with unknown neighbours) is kept up to date from the
+    cells returned by each reveal, so the grid is only scanned once, when the solver is
+    created. Player flags are ignored: only bombs the solver deduced itself are trusted.
+    '''
+    # largest frontier component (in covered cells) solved by exact enumeration
+    max_component = 200
+
+    def __init__(self, board) :
+        '''
+        Attaches the solver to a board and indexes the cells uncovered so far.
+        '''
+        self.board = board
+        self.cols = board.grid_cols
+        # flat view over the board state (cells are addressed as row * cols + col)
+        self.cells = memoryview(board.cells.reshape(-1))
+        # cells known to contain a bomb and covered cells known to be safe
+        self.mines = set()
+        self.safe = set()
+        # uncovered clues that still have unknown neighbours
+        self.frontier = set()
+        # enumeration results keyed by component constraints
+        self.cache = {}
+        # neighbours of the cells visited so far
+        self.adjacent = {}
+
+        rows, cols = np.nonzero((board.cells & (UNCOVERED | MINE)) == UNCOVERED)
+        self.update(zip(rows.tolist(), cols.tolist()))
+
+    ########## FRONTIER TRACKING ##########
+    def neighbours(self, i) :
+        '''
+        Returns the flat indexes of the cells surrounding a cell (computed once per cell).
+        '''
+        if i not in self.adjacent :
+            row, col = divmod(i, self.cols)
+            self.adjacent[i] = [r * self.cols + c
+                                for r in range(max(0, row - 1), min(self.board.grid_rows, row + 2))
+                                for c in range(max(0, col - 1), min(self.cols, col + 2))
+                                if r != row or c != col]
+        return self.adjacent[i]
+
+    def constraint(self, i) :
+        '''
+        Returns the unknown neighbours of an uncovered clue and the number of bombs among them.
+        '''
+        unknown, mines = [], self.cells[i] & COUNT
+        for n in self.neighbours(i) :
+            if n in self.mines :
+                mines -= 1
+            elif not self.cells[n] & UNCOVERED and n not in self.safe :
+                unknown.append(n)
+
+        return unknown, mines
+
+    def update(self, revealed) :
+        '''
+        Updates the frontier after a reveal. Takes the (row, col) cells returned by the board.
+        '''
+        touched = set()
+        for row, col in revealed :
+            i = row * self.cols + col
+            self.safe.discard(i)
+            # a detonated bomb adds no information
+            if self.cells[i] & MINE :
+                continue
+            if self.cells[i] & COUNT :
+                self.frontier.add(i)
+                touched.add(i)
+            touched.update(n for n in self.neighbours(i) if n in self.frontier)
+
+        self.prune(touched)
+
+    def prune(self, candidates) :
+        '''
+        Removes clues without unknown neighbours from the frontier.
+        '''
+        for i in candidates :
+            if i in self.frontier and not self.constraint(i)[0] :
+                self.frontier.discard(i)
+
+    def learn(self, safe, mines) :
+        '''
+        Records newly deduced safe cells and bombs. Returns the frontier clues they touch.
+        '''
+        self.safe.update(safe)
+        self.mines.update(mines)
+
+        touched = set()
+        for i in list(safe) + list(mines) :
+            touched.update(n for n in self.neighbours(i) if n in self.frontier)
+        self.prune(touched)
+
+        return touched
+
+    ########## DEDUCTION ##########
+    def findMoves(self) :
+        '''
+        Returns the covered cells known to be safe and the cells known to contain bombs,
+        as sorted lists of (row, col). Cheaper rules are exhausted before costlier ones.
+        '''
+        self.safe = {i for i in self.safe if not self.cells[i] & UNCOVERED}
+
+        for rule in (self.applySingleRules, self.applySubsetRules, self.applyEnumeration) :
+            if rule() :
+                break
+
+        return ([divmod(i, self.cols) for i in sorted(self.safe)],
+                [divmod(i, self.cols) for i in sorted(self.mines)])
+
+    def applySingleRules(self) :
+        '''
+        Clues whose bombs are all found make their other neighbours safe; clues with as many
+        unknown neighbours as bombs left make them all bombs. Repeats until nothing changes.
+        '''
+        found = False
+        queue = set(self.frontier)
+        while queue :
+            i = queue.pop()
+            if i not in self.frontier :
+                continue
+            unknown, mines = self.constraint(i)
+            if not unknown :
+                continue
+            if mines == 0 :
+                queue.update(self.learn(unknown, []))
+                found = True
+            elif mines == len(unknown) :
+                queue.update(self.learn([], unknown))
+                found = True
+
+        return found
+
+    def applySubsetRules(self) :
+        '''
+        Compares every pair of clues sharing unknown cells. If the difference in their bombs
+        equals the number of cells only one of them sees, those cells are bombs and the
+        cells only the other sees are safe.
+        '''
+        constraints = {}
+        by_cell = {}
+        for i in self.frontier :
+            unknown, mines = self.constraint(i)
+            constraints[i] = (frozenset(unknown), mines)
+            for n in unknown :
+                by_cell.setdefault(n, []).append(i)
+
+        safe, mines = set(), set()
+        for a, (cells_a, mines_a) in constraints.items() :
+            others = {b for n in cells_a for b in by_cell[n] if b > a}
+            for b in others :
+                cells_b, mines_b = constraints[b]
+                only_a, only_b = cells_a - cells_b, cells_b - cells_a
+                difference = mines_b - mines_a
+                if difference == len(only_b) :
+                    mines.update(only_b)
+                    safe.update(only_a)
+                elif -difference == len(only_a) :
+                    mines.update(only_a)
+                    safe.update(only_b)
+
+        if safe or mines :
+            self.learn(safe, mines)
+            return True
+        return False
+
+    def components(self) :
+        '''
+        Splits the frontier into independent components. Returns a list of
+        (cells, constraints) pairs where each constraint is (cells, mines).
+        '''
+        parent = {}
+
+        def find(x) :
+            while parent[x] != x :
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        constraints = []
+        for i in sorted(self.frontier) :
+            unknown, mines = self.constraint(i)
+            if not unknown :
+                continue
+            constraints.append((tuple(unknown), mines))
+            for n in unknown :
+                parent.setdefault(n, n)
+            root = find(unknown[0])
+            for n in unknown[1:] :
+                parent[find(n)] = root
+
+        groups = {}
+        for cells, mines in constraints :
+            groups.setdefault(find(cells[0]), []).append((cells, mines))
+
+        return [(sorted({n for cells, mines in group for n in cells}), group) for group in groups.values()]
+
+    def enumerate(self, cells, constraints) :
+        '''
+        Returns the (cached) enumeration of a frontier component, see enumerateComponent.
+        '''
+        key = tuple(sorted((tuple(sorted(c)), mines) for c, mines in constraints))
+        if key not in self.cache :
+            index = {cell : var for var, cell in enumerate(cells)}
+            self.cache[key] = enumerateComponent(len(cells), [([index[n] for n in c], mines) for c, mines in constraints])
+
+        return self.cache[key]
+
+    def applyEnumeration(self) :
+        '''
+        Enumerates every consistent assignment of each frontier component. Cells that are
+        a bomb in none of them are safe; cells that are a bomb in all of them are bombs.
+        '''
+        safe, mines = set(), set()
+        for cells, constraints in self.components() :
+            if len(cells) > self.max_component :
+                continue
+            result = self.enumerate(cells, constraints)
+            if not result :
+                continue
+            shares = np.array([shares for solutions, shares in result.values()])
+            safe.update(cells[var] for var in np.flatnonzero((shares == 0.0).all(axis=0)).tolist())
+            mines.update(cells[var] for var in np.flatnonzero((shares == 1.0).all(axis=0)).tolist())
+
+        if safe or mines :
+            self.learn(safe, mines)
+            return True
+        return False
+
+    ########## PROBABILITIES ##########
+    def probabilities(self) :
+        '''
+        Returns the exact probability that each covered cell contains a bomb, as a
+        (rows, cols) float array with NaN for uncovered cells.
+
+        Every frontier component is enumerated independently (and cached). The components
+        are then combined with the cells that touch no clue: an assignment using k frontier
+        bombs is weighted by comb(interior cells, bombs left - k), the number of ways to
+        place the remaining bombs in the interior. Components too large to enumerate are
+        treated as interior cells.
+        '''
+        board = self.board
+        probabilities = np.full(shape=board.grid_rows * board.grid_cols, fill_value=np.nan)
+        covered = np.flatnonzero((board.cells.reshape(-1) & UNCOVERED) == 0)
+        probabilities[covered] = 0.0
+        probabilities[list(self.mines)] = 1.0
+
+        # enumerate every frontier component
+        components = []
+        frontier_cells = set()
+        for cells, constraints in self.components() :
+            if len(cells) > self.max_component :
+                continue
+            result = self.enumerate(cells, constraints)
+            components.append((cells, result))
+            frontier_cells.update(cells)
+
+        interior = [i for i in covered.tolist() if i not in self.mines and i not in self.safe and i not in frontier_cells]
+        remaining = board.bomb_count - len(self.mines)
+
+        def weight(k) :
+            # ways to place the bombs left over by k frontier bombs in the interior
+            return comb(len(interior), remaining - k) if 0 <= remaining - k <= len(interior) else 0
+
+        # solutions of each component by number of bombs, and their products over other components
+        polynomials = [[result[k][0] if k in result else 0 for k in range(max(result, default=0) + 1)] for cells, result in components]
+        prefix = [[1]]
+        for polynomial in polynomials :
+            prefix.append(convolve(prefix[-1], polynomial))
+        suffix = [[1]]
+        for polynomial in reversed(polynomials) :
+            suffix.append(convolve(suffix[-1], polynomial))
+        suffix.reverse()
+
+        everything = prefix[-1]
+        total = sum(count * weight(k) for k, count in enumerate(everything))
+        # inconsistent information (should not happen): fall back to the bomb density
+        if not total :
+            unknown = len(covered) - len(self.mines) - len(self.safe)
+            probabilities[[i for i in covered.tolist() if i not in self.mines and i not in self.safe]] = remaining / max(unknown, 1)
+            return probabilities.reshape(board.grid_rows, board.grid_cols)
+
+        for j, (cells, result) in enumerate(components) :
+            others = convolve(prefix[j], suffix[j + 1])
+            cell_probabilities = np.zeros(shape=len(cells))
+            for k, (solutions, shares) in result.items() :
+                ways = solutions * sum(count * weight(k + other) for other, count in enumerate(others))
+                if ways :
+                    cell_probabilities += shares * (ways / total)
+            probabilities[cells] = cell_probabilities
+
+        if interior :
+            interior_mines = sum(count * weight(k) * (remaining - k) for k, count in enumerate(everything))
+            probabilities[interior] = interior_mines / (total * len(interior))
+
+        return probabilities.reshape(board.grid_rows, board.grid_cols)
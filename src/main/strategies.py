@@ -0,0 +1,105 @@
+import numpy as np
+from board import countNeighbours, COUNT, MINE, UNCOVERED, FLAGGED
+from solver import Solver
+
+########## HEADLESS PLAYING STRATEGIES ##########
+# every strategy plays a fresh board until the game is over and returns the number of guesses it made
+
+def playRandom(board, rng) :
+    '''
+    Uncovers covered cells in a random order. Every click is a guess.
+    '''
+    guesses = 0
+
+    for i in rng.permutation(board.grid_rows * board.grid_cols).tolist() :
+        row, col = divmod(i, board.grid_cols)
+        if board.isUncovered(row, col) :
+            continue
+        board.uncoverCell(row, col)
+        guesses += 1
+        if board.isOver() :
+            break
+
+    return guesses
+
+def findSimpleMoves(board) :
+    '''
+    Applies the single-cell rules to every uncovered clue at once. Returns boolean masks of the
+    covered cells that are certainly safe and certainly bombs.
+    '''
+    cells = board.cells
+    uncovered = (cells & UNCOVERED) != 0
+    flagged = (cells & FLAGGED) != 0
+    unknown = ~uncovered & ~flagged
+    clues = np.where(uncovered & ((cells & MINE) == 0), cells & COUNT, 0)
+
+    flag_counts = countNeighbours(flagged)
+    covered_counts = countNeighbours(~uncovered)
+    # clues that are already satisfied by their flags, or that need every covered neighbour
+    satisfied = uncovered & (clues == flag_counts) & (covered_counts > flag_counts)
+    saturated = uncovered & (clues > flag_counts) & (clues == covered_counts)
+
+    safe = unknown & (countNeighbours(satisfied) > 0)
+    mines = unknown & (countNeighbours(saturated) > 0)
+
+    return safe, mines
+
+def playSimple(board, rng) :
+    '''
+    Deterministic solver using the single-cell rules only. Guesses a random covered cell
+    whenever no certain move is left.
+    '''
+    guesses = 0
+
+    while not board.isOver() :
+        safe, mines = findSimpleMoves(board)
+
+        for row, col in np.argwhere(mines).tolist() :
+            board.toggleFlag(row, col)
+        for row, col in np.argwhere(safe).tolist() :
+            board.uncoverCell(row, col)
+
+        # no certain move left
+        if not safe.any() and not mines.any() :
+            covered = np.flatnonzero((board.cells & (UNCOVERED | FLAGGED)) == 0)
+            board.uncoverCell(*divmod(int(rng.choice(covered)), board.grid_cols))
+            guesses += 1
+
+    return guesses
+
+def playSolver(board, rng) :
+    '''
+    Plays with the constraint-propagation solver (single-cell rules, subset rules and exact
+    enumeration). Guesses a random unknown cell whenever no certain move is left.
+    '''
+    solver = Solver(board)
+    guesses = 0
+
+    while not board.isOver() :
+        safe, mines = solver.findMoves()
+
+        # flag newly found bombs
+        new_mines = [(row, col) for row, col in mines if not board.isFlagged(row, col)]
+        for row, col in new_mines :
+            board.toggleFlag(row, col)
+
+        revealed = []
+        for row, col in safe :
+            revealed.extend(board.uncoverCell(row, col))
+
+        # no certain move left
+        if not safe and not new_mines :
+            covered = np.flatnonzero((board.cells & (UNCOVERED | FLAGGED)) == 0)
+            revealed = board.uncoverCell(*divmod(int(rng.choice(covered)), board.grid_cols))
+            guesses += 1
+
+        solver.update(revealed)
+
+    return guesses
+
+# strategies selectable from the simulator
+STRATEGIES = {
+    "random" : playRandom,
+    "simple" : playSimple,
+    "solver" : playSolver
+}
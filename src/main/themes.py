@@ -0,0 +1,73 @@
+########## IMPORTS ##########
+import json
+import os
+
+########## USER THEMES ##########
+# directory of the user themes (one JSON file per theme, named after the file)
+THEMES_DIR = os.path.join(os.path.dirname(__file__), '..', 'resources', 'themes')
+
+def loadThemes(themes, path=THEMES_DIR) :
+    '''
+    Returns the given built-in themes and every theme found in the JSON files of a directory.
+    A theme file maps color names to Tk colors and only needs the colors it changes from its
+    "base" theme (the first built-in theme by default).
+    '''
+    themes = dict(themes)
+    default = next(iter(themes))
+    if not os.path.isdir(path) :
+        return themes
+
+    for file_name in sorted(os.listdir(path)) :
+        name, extension = os.path.splitext(file_name)
+        if extension != ".json" :
+            continue
+        with open(os.path.join(path, file_name), 'r', encoding="utf-8") as file :
+            colors = json.load(file)
+
+        base = colors.pop("base", default)
+        if base not in themes :
+            raise ValueError(f"{file_name}: unknown base theme '{base}'")
+        unknown = set(colors) - set(themes[base])
+        if unknown :
+            raise ValueError(f"{file_name}: unknown colors {', '.join(sorted(unknown))}")
+        themes[name] = {**themes[base], **colors}
+
+    return themes
+
+########## CELL STYLES ##########
+# styles of the mine field cells: uncovered clues are styled by their number (0-8)
+COVERED = 9
+DETONATED = 10  # uncovered bomb
+BOMB_LOST = 11  # bomb shown at the end of a lost game
+BOMB_WON = 12   # bomb shown at the end of a won game
+
+# theme key of the bomb color (the bomb character)
+BOMB_COLOR = u"\U0001F4A3"
+
+def buildPalette(theme) :
+    '''
+    Returns the (background, text) colors of every cell style in a theme, indexed by style.
+    The text of covered cells is hidden in their background.
+    '''
+    palette = [(theme["bg_cell_uncovered"], theme[str(number)]) for number in range(9)]
+    palette.append((theme["bg_cell"], theme["bg_cell"]))
+    palette.append((theme["bg_bomb_cell_uncovered"], theme[BOMB_COLOR]))
+    palette.append((theme["bg_cell_uncovered"], theme[BOMB_COLOR]))
+    palette.append((theme["bg_bomb_win"], theme[BOMB_COLOR]))
+    return palette
+
+def cellStyles(board) :
+    '''
+    Returns the style of every cell as a (rows, cols) array, read from the board's cell states.
+    The bombs are shown once the game is over.
+    '''
+    # imported with the first board (the themes are loaded before the window is painted)
+    import numpy as np
+    from board import COUNT
+
+    uncovered, mines = board.uncovered, board.mines
+    styles = np.where(uncovered, board.cells & COUNT, COVERED).astype(np.uint8)
+    styles[uncovered & mines] = DETONATED
+    if board.isOver() :
+        styles[mines & ~uncovered] = BOMB_WON if board.won else BOMB_LOST
+    return styles
@@ -0,0 +1,8 @@
+########## IMPORTS ##########
+import os
+import sys
+
+# the game modules import each other by name (as when run from src/main)
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_DIR = os.path.join(TEST_DIR, '..', 'main')
+sys.path.insert(0, MAIN_DIR)
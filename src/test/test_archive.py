@@ -0,0 +1,68 @@
+########## IMPORTS ##########
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from archive import Archive, monthBounds
+
+########## HELPERS ##########
+def appendGames(path, worker, count) :
+    '''
+    Appends games one by one from an archive of its own (run in a separate process by the
+    concurrency test). A worker's games are told apart by their clicks.
+    '''
+    archive = Archive(path)
+    for i in range(count) :
+        # every worker plays its own board configuration, so the config table is shared too
+        archive.append(9 + worker, 9, 10, time=i, won=i % 2, value=5, clicks=worker, date=20000 + i % 40)
+
+########## TESTS ##########
+def test_queries(tmp_path) :
+    archive = Archive(str(tmp_path))
+    first, last = monthBounds("2026-10")
+    archive.extend(16, 30, 99, {"time" : [9000, 7000, 8000], "won" : [1, 1, 0], "3bv" : [120, 130, 140],
+                                "clicks" : [150, 160, 170], "human" : [1, 1, 1], "date" : [first, first + 3, last],
+                                "replay" : [0, 40, 80]})
+    archive.append(9, 9, 10, time=3000, won=1, value=20, clicks=25, date=first)
+
+    reopened = Archive(str(tmp_path))
+    assert len(reopened) == 4
+    # wins of the month, fastest first
+    best = reopened.bestTimes(16, 30, 99, month="2026-10")
+    assert reopened.column("time")[best].tolist() == [7000, 9000]
+    assert reopened.bestTimes(16, 16, 40).size == 0
+    assert reopened.winRateByDensity() == {0.123 : (1, 1), 0.206 : (3, 2)}
+
+def test_separate_archives_keep_every_record(tmp_path) :
+    # two games of one session each keep an archive open on the same directory
+    first, second = Archive(str(tmp_path)), Archive(str(tmp_path))
+    first.append(9, 9, 10, time=1000, won=1, value=5, clicks=7)
+    second.append(16, 16, 40, time=2000, won=0, value=30, clicks=9)
+    first.append(9, 9, 10, time=3000, won=1, value=5, clicks=7)
+
+    archive = Archive(str(tmp_path))
+    assert len(archive) == 3
+    assert archive.index["configs"] == [[9, 9, 10], [16, 16, 40]]
+    assert archive.column("time").tolist() == [1000, 2000, 3000]
+    assert archive.column("config").tolist() == [0, 1, 0]
+
+def test_concurrent_appends_keep_every_record(tmp_path) :
+    workers, count = 4, 30
+    with ProcessPoolExecutor(max_workers=workers) as pool :
+        futures = [pool.submit(appendGames, str(tmp_path), worker, count) for worker in range(workers)]
+        for future in futures :
+            future.result()
+
+    archive = Archive(str(tmp_path))
+    assert len(archive) == workers * count
+    configs = archive.index["configs"]
+    assert sorted(configs) == [[9 + worker, 9, 10] for worker in range(workers)]
+    for worker in range(workers) :
+        records = np.flatnonzero(archive.column("clicks") == worker)
+        # every game is there, in order, with its own configuration
+        assert archive.column("time")[records].tolist() == list(range(count))
+        assert {tuple(configs[code]) for code in archive.column("config")[records].tolist()} == {(9 + worker, 9, 10)}
+    # the month index still covers every record of its month
+    for month, (first, end) in archive.index["months"].items() :
+        start, stop = monthBounds(month)
+        dates = archive.column("date")
+        assert np.all((dates[:first] < start) | (dates[:first] >= stop))
+        assert np.all((dates[end:] < start) | (dates[end:] >= stop))
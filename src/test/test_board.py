@@ -0,0 +1,97 @@
+########## IMPORTS ##########
+from collections import deque
+import numpy as np
+import pytest
+from board import Board, countNeighbours, COUNT, MINE, UNCOVERED, FLAGGED
+
+########## HELPERS ##########
+def breadthFirstReveal(board, row, col) :
+    '''
+    Returns the cells a reveal of a safe cell uncovers, found with a plain breadth-first
+    search over the 0s (the reference the scanline fill is checked against).
+    '''
+    cells = board.cells
+    if cells[row, col] & COUNT :
+        return {(row, col)}
+
+    area = {(row, col)}
+    queue = deque(area)
+    while queue :
+        r, c = queue.popleft()
+        for n in board.neighbours(r, c) :
+            # the fill spreads through 0s that are not flagged (uncovered ones included)
+            if n not in area and not cells[n] & (COUNT | MINE | FLAGGED) :
+                area.add(n)
+                queue.append(n)
+
+    reveal = set(area)
+    for r, c in area :
+        reveal.update(board.neighbours(r, c))
+    return {cell for cell in reveal if not cells[cell] & (UNCOVERED | FLAGGED)}
+
+def randomMines(rng, rows, cols, density) :
+    '''
+    Returns a random bomb mask with at least one safe cell.
+    '''
+    mines = rng.random((rows, cols)) < density
+    mines[rng.integers(rows), rng.integers(cols)] = False
+    return mines
+
+########## TESTS ##########
+def test_count_neighbours() :
+    rng = np.random.default_rng(0)
+    mines = rng.random((7, 11)) < 0.3
+    padded = np.pad(mines, 1).astype(int)
+    expected = sum(padded[1 + dr:8 + dr, 1 + dc:12 + dc] for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                   if (dr, dc) != (0, 0))
+    assert np.array_equal(countNeighbours(mines), expected)
+    # stacks of boards are counted board by board
+    stack = np.stack([mines, ~mines])
+    assert np.array_equal(countNeighbours(stack)[1], countNeighbours(~mines))
+
+@pytest.mark.parametrize("seed", range(40))
+def test_flood_fill_matches_breadth_first_search(seed) :
+    rng = np.random.default_rng(seed)
+    rows, cols = rng.integers(1, 25, size=2).tolist()
+    board = Board.fromMines(randomMines(rng, rows, cols, rng.uniform(0.02, 0.25)))
+    # flags (even misplaced ones) stop the fill
+    safe = np.argwhere(~board.mines).tolist()
+    for r, c in rng.permutation(safe)[:len(safe) // 10].tolist() :
+        board.toggleFlag(r, c)
+
+    # reveal safe cells one after the other, so later fills meet uncovered areas
+    for r, c in rng.permutation(safe).tolist()[:5] :
+        if board.isOver() or board.cells[r, c] & (UNCOVERED | FLAGGED) :
+            continue
+        expected = breadthFirstReveal(board, r, c)
+        revealed = board.uncoverCell(r, c)
+        assert len(revealed) == len(set(revealed))
+        assert set(revealed) == expected
+
+def test_first_reveal_is_safe_and_opens() :
+    for seed in range(50) :
+        board = Board(16, 30, 99, rng=seed)
+        board.uncoverCell(5, 7)
+        assert board.placed and not board.lost
+        assert np.count_nonzero(board.mines) == 99
+        # the first cell and its neighbours are kept free of bombs
+        assert not board.mines[4:7, 6:9].any()
+        assert board.getContent(5, 7) == 0
+
+def test_same_seed_deals_same_board() :
+    first, second = Board(16, 30, 99, rng=123), Board(16, 30, 99, rng=123)
+    first.uncoverCell(8, 8)
+    second.uncoverCell(8, 8)
+    assert np.array_equal(first.mines, second.mines)
+
+def test_chord_uncovers_unflagged_neighbours() :
+    mines = np.zeros((3, 3), dtype=bool)
+    mines[0, 0] = mines[0, 2] = True
+    board = Board.fromMines(mines)
+    assert board.uncoverCell(0, 1) == [(0, 1)]
+    board.toggleFlag(0, 0)
+    # the clue (2) is not satisfied by one flag
+    assert board.chordCell(0, 1) == []
+    board.toggleFlag(0, 2)
+    assert set(board.chordCell(0, 1)) == {(1, 0), (1, 1), (1, 2)}
+    assert not board.lost
@@ -0,0 +1,75 @@
+########## IMPORTS ##########
+import base64
+import zlib
+import numpy as np
+import pytest
+from board import Board
+from codes import encodeBoard, decodeBoard, SEED_CODE, LAYOUT_CODE, SEED, LAYOUT
+from difficulty import DIFFICULTIES, MAX_ROWS
+
+########## HELPERS ##########
+def rawCode(data) :
+    '''
+    Returns the code of raw record bytes.
+    '''
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+########## TESTS ##########
+@pytest.mark.parametrize("difficulty", list(DIFFICULTIES))
+def test_seed_codes_round_trip(difficulty) :
+    settings = DIFFICULTIES[difficulty]
+    for seed in range(20) :
+        board = Board(settings["rows"], settings["cols"], settings["bombs"], rng=seed * 7919)
+        start = (seed % settings["rows"], seed % settings["cols"])
+        board.uncoverCell(*start)
+        code = encodeBoard(board)
+        assert len(code) == 28
+
+        decoded, decoded_start = decodeBoard(code)
+        assert decoded_start == start
+        assert np.array_equal(decoded.mines, board.mines)
+        # the decoded board opens the same way
+        assert set(decoded.uncoverCell(*start)) == set(zip(*np.nonzero(board.uncovered)))
+
+def test_layout_codes_round_trip() :
+    rng = np.random.default_rng(0)
+    for rows, cols in [(1, 2), (9, 9), (16, 30), (40, 7)] :
+        mines = rng.random((rows, cols)) < 0.2
+        mines[0, 0], mines[-1, -1] = False, True
+        # boards without a seed (no-guess boards, replays) are shared by their layout
+        board = Board.fromMines(mines)
+        decoded, start = decodeBoard(encodeBoard(board))
+        assert start is None and np.array_equal(decoded.mines, mines)
+
+        board.uncoverCell(0, 0)
+        decoded, start = decodeBoard(encodeBoard(board))
+        assert start == (0, 0) and np.array_equal(decoded.mines, mines)
+
+def test_boards_without_bombs_have_no_code() :
+    with pytest.raises(ValueError) :
+        encodeBoard(Board(9, 9, 10))
+
+@pytest.mark.parametrize("code", [
+    "",
+    "not a code!",
+    rawCode(b"\x07" + bytes(20)),
+    # start cell outside the board, more bombs than cells, oversized board
+    rawCode(SEED_CODE.pack(SEED, 9, 9, 10, 1, 9, 0)),
+    rawCode(SEED_CODE.pack(SEED, 9, 9, 81, 1, 0, 0)),
+    rawCode(SEED_CODE.pack(SEED, 65535, 65535, 10, 1, 0, 0)),
+    rawCode(SEED_CODE.pack(SEED, MAX_ROWS + 1, 9, 10, 1, 0, 0)),
+    # layouts that are corrupted, truncated, too long or too large to inflate
+    rawCode(LAYOUT_CODE.pack(LAYOUT, 9, 9, 0, 0) + b"garbage"),
+    rawCode(LAYOUT_CODE.pack(LAYOUT, 9, 9, 0, 0) + zlib.compress(bytes(11))[:-4]),
+    rawCode(LAYOUT_CODE.pack(LAYOUT, 9, 9, 0, 0) + zlib.compress(bytes(12))),
+    rawCode(LAYOUT_CODE.pack(LAYOUT, 9, 9, 0, 0) + zlib.compress(bytes(1 << 24))),
+    # boards without bombs
+    rawCode(SEED_CODE.pack(SEED, 9, 9, 0, 1, 0, 0)),
+    rawCode(LAYOUT_CODE.pack(LAYOUT, 2, 4, 0, 0) + zlib.compress(b"\x00")),
+    # every cell a bomb, start cell on a bomb
+    rawCode(LAYOUT_CODE.pack(LAYOUT, 2, 4, 0xFFFF, 0xFFFF) + zlib.compress(b"\xff")),
+    rawCode(LAYOUT_CODE.pack(LAYOUT, 2, 4, 0, 0) + zlib.compress(b"\x80")),
+])
+def test_invalid_codes_are_rejected(code) :
+    with pytest.raises(ValueError) :
+        decodeBoard(code)
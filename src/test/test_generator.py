@@ -0,0 +1,21 @@
+########## IMPORTS ##########
+from collections import deque
+from concurrent.futures import Future
+from generator import BoardPool, isSolvable
+
+########## TESTS ##########
+def test_failed_generations_fall_back_and_are_replaced() :
+    settings = {"rows" : 9, "cols" : 9, "bombs" : 10}
+    pool = BoardPool(workers=1)
+    try :
+        # a generation whose worker died
+        failed = Future()
+        failed.set_exception(RuntimeError("worker died"))
+        key = pool.getKey(settings)
+        pool.queues[key] = deque([failed])
+
+        board, start = pool.pop(settings)
+        assert isSolvable(board.copy(), start)
+        assert len(pool.queues[key]) == pool.size and failed not in pool.queues[key]
+    finally :
+        pool.shutdown()
@@ -0,0 +1,109 @@
+########## IMPORTS ##########
+import os
+import numpy as np
+import pytest
+from board import Board
+from replay import Recorder, Replay, readReplays, verifyReplay, applyAction, ACTION_DTYPE, REVEAL, FLAG, CHORD
+from strategies import STRATEGIES
+
+########## HELPERS ##########
+def recordGame(seed, strategy="solver") :
+    '''
+    Plays a seeded expert game with a strategy and returns its recorder (every action is
+    recorded by replaying the strategy's moves through a board that records them).
+    '''
+    played = Board(16, 30, 99, rng=seed)
+    STRATEGIES[strategy](played, np.random.default_rng(seed))
+
+    # play the finished game's reveals and flags again, in board order, on a recorded board
+    board = Board.fromMines(played.mines)
+    recorder = Recorder(board)
+    elapsed = 0
+    for row, col in np.argwhere(played.flagged).tolist() :
+        applyAction(board, FLAG, row, col)
+        recorder.record(FLAG, row, col, elapsed)
+        elapsed += 7
+    for row, col in np.argwhere(played.uncovered).tolist() :
+        if board.isOver() :
+            break
+        if applyAction(board, REVEAL, row, col) :
+            recorder.record(REVEAL, row, col, elapsed)
+            elapsed += 13
+    return played, board, recorder
+
+########## TESTS ##########
+@pytest.mark.parametrize("seed", range(5))
+def test_saved_games_read_back(tmp_path, seed) :
+    path = os.path.join(tmp_path, "replays.bin")
+    games = [recordGame(seed * 10 + i) for i in range(3)]
+    offsets = [recorder.save(path) for played, board, recorder in games]
+    assert offsets[0] == 0 and offsets == sorted(offsets)
+
+    replays = readReplays(path)
+    assert len(replays) == len(games)
+    for replay, (played, board, recorder) in zip(replays, games) :
+        assert np.array_equal(replay.mines, played.mines)
+        assert replay.actions.tolist() == recorder.actions
+        # playing the recording back ends the game the same way
+        replayed, duration = verifyReplay(replay)
+        assert np.array_equal(replayed.cells, board.cells)
+        assert (replayed.won, replayed.lost) == (board.won, board.lost)
+        assert duration == recorder.getDuration()
+
+def test_chords_and_losses_replay(tmp_path) :
+    path = os.path.join(tmp_path, "replays.bin")
+    mines = np.zeros((4, 4), dtype=bool)
+    mines[0, 0] = mines[3, 3] = True
+    board = Board.fromMines(mines)
+    recorder = Recorder(board)
+    # a misplaced flag makes the chord detonate the bomb next to the clue
+    for action, row, col in [(REVEAL, 0, 1), (FLAG, 1, 1), (CHORD, 0, 1), (REVEAL, 3, 3)] :
+        applyAction(board, action, row, col)
+        recorder.record(action, row, col)
+    assert board.lost and board.detonated == (0, 0)
+    recorder.save(path)
+
+    replayed, duration = verifyReplay(readReplays(path)[0])
+    assert replayed.lost and replayed.detonated == (0, 0)
+    assert np.array_equal(replayed.cells, board.cells)
+
+def test_games_without_actions_are_not_saved(tmp_path) :
+    path = os.path.join(tmp_path, "replays.bin")
+    # a board built from a layout has its bombs placed before any action
+    recorder = Recorder(Board.fromMines(np.eye(5, dtype=bool)))
+    assert recorder.save(path) is None
+    # neither are games that never placed their bombs
+    assert Recorder(Board(9, 9, 10)).save(path) is None
+    assert readReplays(path) == []
+
+def test_empty_games_of_older_files_read_back(tmp_path) :
+    path = os.path.join(tmp_path, "replays.bin")
+    mines = np.eye(5, dtype=bool)
+    with open(path, 'wb') as file :
+        file.write(Replay(mines, np.zeros(shape=0, dtype=ACTION_DTYPE)).toBytes())
+    replay, = readReplays(path)
+    assert np.array_equal(replay.mines, mines) and len(replay.actions) == 0
+    assert verifyReplay(replay)[1] == 0
+
+def test_corrupt_file_is_rejected(tmp_path) :
+    path = os.path.join(tmp_path, "replays.bin")
+    with open(path, 'wb') as file :
+        file.write(b"not a replay file at all")
+    with pytest.raises(ValueError) :
+        readReplays(path)
+
+@pytest.mark.parametrize("cut", [1, 10, 40])
+def test_incomplete_last_game_is_skipped_and_overwritten(tmp_path, cut) :
+    path = os.path.join(tmp_path, "replays.bin")
+    games = [recordGame(seed) for seed in range(3)]
+    offsets = [recorder.save(path) for played, board, recorder in games[:2]]
+    # a crash while the second game was written left only part of it
+    with open(path, 'r+b') as file :
+        file.truncate(offsets[1] + cut)
+    assert len(readReplays(path)) == 1
+
+    # the next game replaces the incomplete one
+    assert games[2][2].save(path) == offsets[1]
+    replays = readReplays(path)
+    assert len(replays) == 2
+    assert replays[1].actions.tolist() == games[2][2].actions
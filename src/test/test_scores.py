@@ -0,0 +1,102 @@
+########## IMPORTS ##########
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+import numpy as np
+import pytest
+from scores import SCORE_STORES
+
+# every store, by name
+BACKENDS = sorted(SCORE_STORES)
+
+########## HELPERS ##########
+def openStore(backend, directory) :
+    '''
+    Returns a store of a backend on a file of a directory.
+    '''
+    file_name, store = SCORE_STORES[backend]
+    return store(os.path.join(directory, file_name))
+
+def addScores(backend, directory, player, times) :
+    '''
+    Adds a player's times to the expert leaderboard from a store of its own (run in a
+    separate process by the concurrency tests).
+    '''
+    store = openStore(backend, directory)
+    for time in times :
+        store.addScore("expert", {"name" : player, "time" : time, "date" : "2026-01-01", "3bv" : 100})
+
+def expectedRank(times, time) :
+    '''
+    Returns the rank of a time among times (ties share the rank of their first score).
+    '''
+    return sum(1 for other in times if other < time) + 1
+
+########## TESTS ##########
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_ranks_and_pages(tmp_path, backend) :
+    store = openStore(backend, tmp_path)
+    rng = np.random.default_rng(0)
+    # many ties, integer times and times within the same millisecond
+    times = rng.choice([5, 7.5, 9.25, 12.3456, 12.3459, 30.0001], size=60).tolist() + rng.uniform(0, 60, size=60).tolist()
+    added = []
+    for i, time in enumerate(times) :
+        rank = store.addScore("expert", {"name" : f"player{i % 4}", "time" : time, "date" : "2026-01-01", "3bv" : i})
+        added.append((time, i))
+        assert rank == expectedRank(times[:i + 1], time)
+
+    ranked = sorted(added)
+    assert store.keys() == ["expert"]
+    assert store.count("expert") == len(times)
+    for start in (0, 1, 14, 15, 59, 100, 119, 120, 200) :
+        page = store.page("expert", start, 15)
+        # ties keep their arrival order
+        assert [(entry['time'], entry['3bv']) for entry in page] == ranked[start:start + 15]
+    for time in (0, 5, 6, 12.3456, 12.34575, 30.0001, 61) :
+        assert store.rank("expert", time) == expectedRank(times, time)
+
+    # pages of a player
+    player = [(time, i) for time, i in ranked if i % 4 == 1]
+    assert store.count("expert", "player1") == len(player)
+    assert [entry['3bv'] for entry in store.page("expert", 3, 10, "player1")] == [i for time, i in player[3:13]]
+    assert store.count("hard") == 0 and store.page("hard", 0, 15) == []
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_concurrent_scores_are_all_kept(tmp_path, backend) :
+    players = 4
+    times = [[round(0.5 + (player * 25 + i) * 0.37 % 40, 3) for i in range(25)] for player in range(players)]
+    with ProcessPoolExecutor(max_workers=players) as pool :
+        futures = [pool.submit(addScores, backend, str(tmp_path), f"player{player}", times[player]) for player in range(players)]
+        for future in futures :
+            future.result()
+
+    store = openStore(backend, tmp_path)
+    every_time = sorted(time for player_times in times for time in player_times)
+    assert store.count("expert") == len(every_time)
+    assert [entry['time'] for entry in store.page("expert", 0, 1000)] == every_time
+    for player in range(players) :
+        assert store.count("expert", f"player{player}") == len(times[player])
+    for time in every_time[::7] :
+        assert store.rank("expert", time) == expectedRank(every_time, time)
+
+def test_sqlite_rank_tree_is_built_for_older_databases(tmp_path) :
+    path = os.path.join(tmp_path, SCORE_STORES["sqlite"][0])
+    times = [12.5, 3.25, 3.25, 40.0, 7.001, 7.0005]
+    # a database saved before the 3BV and the rank tree were kept
+    with closing(sqlite3.connect(path)) as db, db :
+        db.execute("CREATE TABLE scores (key TEXT, name TEXT, time NUMERIC, date TEXT)")
+        db.executemany("INSERT INTO scores VALUES ('expert', 'old', ?, '2025-01-01')", [(time,) for time in times])
+
+    store = openStore("sqlite", tmp_path)
+    assert [entry['time'] for entry in store.page("expert", 2, 3)] == sorted(times)[2:5]
+    assert store.page("expert", 0, 1)[0]['3bv'] is None
+    assert store.addScore("expert", {"name" : "new", "time" : 7.0, "date" : "2026-01-01", "3bv" : 50}) == 3
+
+def test_json_store_reads_unranked_files(tmp_path) :
+    path = os.path.join(tmp_path, SCORE_STORES["json"][0])
+    with open(path, 'w') as file :
+        file.write('{"easy" : [{"name" : "b", "time" : 9, "date" : "d"}, {"name" : "a", "time" : 4, "date" : "d"}]}')
+    store = openStore("json", tmp_path)
+    assert [entry['name'] for entry in store.page("easy", 0, 15)] == ["a", "b"]
+    assert store.rank("easy", 5) == 2
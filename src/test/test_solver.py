@@ -0,0 +1,111 @@
+########## IMPORTS ##########
+from itertools import combinations
+import numpy as np
+import pytest
+from board import Board, COUNT, UNCOVERED
+from solver import Solver
+
+########## HELPERS ##########
+def bruteForce(board) :
+    '''
+    Returns the probability that each covered cell holds a bomb, by enumerating every bomb
+    layout of the covered cells that matches the uncovered clues and the number of bombs
+    (NaN on uncovered cells).
+    '''
+    rows, cols = board.grid_rows, board.grid_cols
+    uncovered = (board.cells & UNCOVERED) != 0
+    covered = [tuple(cell) for cell in np.argwhere(~uncovered).tolist()]
+    clues = [(r, c, int(board.cells[r, c] & COUNT)) for r, c in np.argwhere(uncovered).tolist()]
+
+    counts = np.zeros(shape=(rows, cols))
+    layouts = 0
+    for layout in combinations(covered, board.bomb_count) :
+        mines = set(layout)
+        if all(sum(n in mines for n in board.neighbours(r, c)) == clue for r, c, clue in clues) :
+            layouts += 1
+            for cell in layout :
+                counts[cell] += 1
+
+    probabilities = counts / layouts
+    probabilities[uncovered] = np.nan
+    return probabilities
+
+def playedBoards(count) :
+    '''
+    Yields small boards at every step of a game played with the solver's certain moves
+    (and random reveals of safe cells when there are none), with the solver following it.
+    '''
+    for seed in range(count) :
+        rng = np.random.default_rng(seed)
+        rows, cols = rng.integers(3, 6, size=2).tolist()
+        board = Board(rows, cols, int(rng.integers(2, rows * cols // 3)), rng=seed)
+        solver = Solver(board)
+        solver.update(board.uncoverCell(int(rng.integers(rows)), int(rng.integers(cols))))
+        while not board.isOver() :
+            yield board, solver
+            safe, mines = solver.findMoves()
+            if not safe :
+                # reveal a safe cell the solver does not know about yet
+                safe = [tuple(rng.choice(np.argwhere(~board.mines & ((board.cells & UNCOVERED) == 0))).tolist())]
+            revealed = []
+            for row, col in safe :
+                revealed.extend(board.uncoverCell(row, col))
+            solver.update(revealed)
+
+########## TESTS ##########
+def test_probabilities_match_brute_force() :
+    checked = 0
+    for board, solver in playedBoards(60) :
+        expected = bruteForce(board)
+        assert np.allclose(solver.probabilities(), expected, equal_nan=True)
+        checked += 1
+    assert checked > 100
+
+def test_moves_are_certain() :
+    found = 0
+    for board, solver in playedBoards(60) :
+        safe, mines = solver.findMoves()
+        # every move the solver is sure of holds on every layout matching the clues
+        expected = bruteForce(board)
+        for cell in safe :
+            assert expected[cell] == 0.0
+        for cell in mines :
+            assert expected[cell] == 1.0
+        assert all(board.mines[cell] for cell in mines)
+        found += len(safe) + len(mines)
+    assert found
+
+@pytest.mark.parametrize("rule", ["applySingleRules", "applySubsetRules", "applyEnumeration"])
+def test_every_rule_is_sound(rule) :
+    for board, solver in playedBoards(30) :
+        getattr(solver, rule)()
+        assert all(not board.mines[divmod(i, board.grid_cols)] for i in solver.safe)
+        assert all(board.mines[divmod(i, board.grid_cols)] for i in solver.mines)
+
+def test_subset_rule() :
+    # 1-2-1 on a wall: the 2 sees three covered cells, the 1s two of them each
+    mines = np.zeros((2, 3), dtype=bool)
+    mines[0, 0] = mines[0, 2] = True
+    board = Board.fromMines(mines)
+    solver = Solver(board)
+    for col in range(3) :
+        solver.update(board.uncoverCell(1, col))
+    # the subset rule finds both bombs, then the single-cell rules clear the cell between them
+    assert solver.findMoves() == ([], [(0, 0), (0, 2)])
+    assert solver.findMoves() == ([(0, 1)], [(0, 0), (0, 2)])
+
+def test_frontier_is_updated_incrementally() :
+    board = Board(16, 30, 99, rng=7)
+    solver = Solver(board)
+    solver.update(board.uncoverCell(8, 15))
+    for _ in range(5) :
+        safe, mines = solver.findMoves()
+        revealed = []
+        for row, col in safe :
+            revealed.extend(board.uncoverCell(row, col))
+        solver.update(revealed)
+        # the same frontier as a solver indexing the whole grid from scratch
+        fresh = Solver(board)
+        fresh.mines, fresh.safe = set(solver.mines), set(solver.safe)
+        fresh.prune(set(fresh.frontier))
+        assert solver.frontier == fresh.frontier